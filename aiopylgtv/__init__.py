@@ -1,12 +1,51 @@
-from .lut_tools import read_cal_file, read_cube_file, unity_lut_1d, unity_lut_3d
+import importlib
+
+from .fleet import WebOsFleet
+from .key_store import KeyStore
+from .metrics import ClientMetrics
+from .pointer import PointerChannel
 from .webos_client import PyLGTVCmdException, PyLGTVPairException, WebOsClient
 
+# names imported on first access, so that NumPy is only imported by users of
+# the calibration and LUT tools
+_LAZY_ATTRIBUTES = {
+    "LutCache": ".lut_cache",
+    "compose_lut_3d": ".lut_tools",
+    "curve_lut_1d": ".lut_tools",
+    "read_cal_file": ".lut_tools",
+    "read_cube_file": ".lut_tools",
+    "resample_lut_3d": ".lut_tools",
+    "unity_lut_1d": ".lut_tools",
+    "unity_lut_3d": ".lut_tools",
+}
+
 __all__ = [
+    "ClientMetrics",
+    "KeyStore",
+    "LutCache",
+    "compose_lut_3d",
+    "curve_lut_1d",
     "read_cal_file",
     "read_cube_file",
+    "resample_lut_3d",
     "unity_lut_1d",
     "unity_lut_3d",
+    "PointerChannel",
     "PyLGTVCmdException",
     "PyLGTVPairException",
     "WebOsClient",
+    "WebOsFleet",
 ]
+
+
+def __getattr__(name):
+    module_name = _LAZY_ATTRIBUTES.get(name)
+    if module_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(module_name, __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(_LAZY_ATTRIBUTES))
@@ -0,0 +1,117 @@
+import base64
+import collections
+import functools
+import hashlib
+import struct
+
+from .constants import CALIBRATION_STRUCT_FORMATS
+
+# NumPy is imported by the functions which need it, so that the scalar
+# calibration commands can be encoded without importing it
+
+# smaller arrays are cheaper to encode again than to hash and look up
+MIN_CACHED_BYTES = 4096
+DEFAULT_MAX_ENTRIES = 16
+
+
+def encode_data(data):
+    """Return the base64 encoding of the raw bytes of data, in C order."""
+    import numpy as np
+
+    return base64.b64encode(np.ascontiguousarray(data)).decode()
+
+
+def encode_values(values, dtype):
+    """Return the base64 encoding of a sequence of numbers as dtype, without NumPy."""
+    fmt = f"<{len(values)}{CALIBRATION_STRUCT_FORMATS[dtype]}"
+    return base64.b64encode(struct.pack(fmt, *values)).decode()
+
+
+class CalibrationPayloadCache:
+    """Memory cache of base64 encoded calibration data.
+
+    Entries are keyed by a hash of the array contents together with its dtype
+    and shape, so repeated uploads of the same LUT, from the same or an equal
+    array, skip the encoding.  The contents are hashed on every call, even for
+    read-only arrays, which can still change through a writable base or by
+    being made writable again.  The encoding does not depend on the calibration
+    command, so the same LUT uploaded to several targets shares one entry.  At
+    most max_entries encodings are kept, evicting the least recently used.
+    """
+
+    def __init__(self, max_entries=DEFAULT_MAX_ENTRIES):
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._entries = collections.OrderedDict()
+
+    def _key(self, data):
+        import numpy as np
+
+        digest = hashlib.sha256(np.ascontiguousarray(data)).digest()
+        return (data.dtype.name, data.shape, digest)
+
+    def encode(self, data):
+        """Return the base64 encoding of data, from the cache if possible."""
+        if data.nbytes < MIN_CACHED_BYTES:
+            return encode_data(data)
+
+        key = self._key(data)
+        dataenc = self._entries.get(key)
+        if dataenc is not None:
+            self.hits += 1
+            self._entries.move_to_end(key)
+            return dataenc
+
+        self.misses += 1
+        dataenc = encode_data(data)
+        self._entries[key] = dataenc
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+        return dataenc
+
+    def clear(self):
+        self._entries.clear()
+
+    def stats(self):
+        return {
+            "entries": len(self._entries),
+            "bytes": sum(len(dataenc) for dataenc in self._entries.values()),
+            "hits": self.hits,
+            "misses": self.misses,
+        }
+
+
+default_payload_cache = CalibrationPayloadCache()
+
+
+@functools.lru_cache(maxsize=None)
+def cached_unity_lut_1d():
+    """Return a shared read-only unity 1D LUT."""
+    from .lut_tools import unity_lut_1d
+
+    lut = unity_lut_1d()
+    lut.flags.writeable = False
+    return lut
+
+
+@functools.lru_cache(maxsize=None)
+def cached_unity_lut_3d(n=33):
+    """Return a shared read-only unity 3D LUT of size n."""
+    import numpy as np
+
+    from .lut_tools import unity_lut_3d
+
+    lut = np.ascontiguousarray(unity_lut_3d(n))
+    lut.flags.writeable = False
+    return lut
+
+
+@functools.lru_cache(maxsize=None)
+def encoded_unity_lut_1d():
+    return encode_data(cached_unity_lut_1d())
+
+
+@functools.lru_cache(maxsize=None)
+def encoded_unity_lut_3d(n=33):
+    return encode_data(cached_unity_lut_3d(n))
@@ -0,0 +1,162 @@
+import asyncio
+import contextvars
+import logging
+
+from . import cal_commands as cal
+from . import endpoints as ep
+from .constants import DEFAULT_CAL_VALUES
+
+logger = logging.getLogger(__name__)
+
+# steps in flight by default, enough to keep the connection busy while at most
+# one more step is sent after a failed one
+DEFAULT_MAX_IN_FLIGHT = 2
+
+# the transaction recording the calibration requests of the current task
+recording_transaction = contextvars.ContextVar(
+    "aiopylgtv_recording_transaction", default=None
+)
+
+
+class CalibrationTransaction:
+    """A batch of calibration steps for one picture mode, sent as a pipeline.
+
+    Steps are queued by passing client calibration methods to add(), which
+    validates and encodes the data without sending it.  commit() sends
+    CAL_START, then writes the queued steps to the connection in order with up
+    to max_in_flight of them awaiting a response, and sends CAL_END once every
+    step has been answered.  Once a step fails no further steps are sent,
+    CAL_END is still sent, and the first error is raised.  Steps written before
+    the failure was answered, at most max_in_flight - 1, still reach the tv.
+    max_in_flight=None writes all steps at once.  With bracket=False the steps are sent without CAL_START and
+    CAL_END.  Steps go through the same request path as request_many(), so
+    metrics apply to them, and each request expires after timeout seconds, or
+    the request_timeout of the client if None.
+
+    After commit(), timings holds one dict per request with the command, its
+    duration in seconds from send to response (None if it was not sent) and the
+    error if it failed.
+    """
+
+    def __init__(
+        self,
+        client,
+        picMode,
+        bracket=True,
+        max_in_flight=DEFAULT_MAX_IN_FLIGHT,
+        start_data=None,
+        end_data=None,
+        timeout=None,
+    ):
+        self.client = client
+        self.picMode = picMode
+        self.bracket = bracket
+        self.max_in_flight = max_in_flight
+        self.start_data = start_data
+        self.end_data = end_data
+        self.timeout = timeout
+        self.steps = []
+        self.timings = []
+        self.duration = None
+        self.committed = False
+
+    def queue(self, command, payload):
+        if self.committed:
+            raise RuntimeError("Calibration transaction was already committed.")
+        self.steps.append((command, payload))
+
+    async def add(self, method, *args, **kwargs):
+        """Queue the calibration requests made by a client method.
+
+        method is called with the picture mode of the transaction followed by
+        args and kwargs, e.g. add(client.upload_1d_lut, data).
+        """
+        token = recording_transaction.set(self)
+        try:
+            await method(self.picMode, *args, **kwargs)
+        finally:
+            recording_transaction.reset(token)
+
+    async def _send_one(self, command, payload):
+        loop = asyncio.get_running_loop()
+        start = loop.time()
+        error = None
+        try:
+            return await self.client.request(
+                ep.CALIBRATION, payload, timeout=self.timeout
+            )
+        except Exception as ex:
+            error = ex
+            raise
+        finally:
+            self.timings.append(
+                {"command": command, "duration": loop.time() - start, "error": error}
+            )
+
+    async def _send_pipelined(self, steps):
+        outcomes = await self.client._request_pipeline(
+            [(ep.CALIBRATION, payload) for _, payload in steps],
+            max_in_flight=self.max_in_flight,
+            timeout=self.timeout,
+            stop_on_error=True,
+        )
+
+        errors = []
+        results = []
+        for (command, _), (result, duration) in zip(steps, outcomes):
+            error = result if isinstance(result, BaseException) else None
+            self.timings.append(
+                {"command": command, "duration": duration, "error": error}
+            )
+            if error is None:
+                results.append(result)
+            else:
+                errors.append(error)
+        if errors:
+            raise errors[0]
+        return results
+
+    async def commit(self):
+        """Send all queued steps, returning the step responses in order."""
+        if self.committed:
+            raise RuntimeError("Calibration transaction was already committed.")
+        self.committed = True
+        loop = asyncio.get_running_loop()
+        start = loop.time()
+        try:
+            if not self.bracket:
+                return await self._send_pipelined(self.steps)
+
+            await self._send_one(cal.CAL_START, self._bracket_payload(cal.CAL_START))
+            try:
+                results = await self._send_pipelined(self.steps)
+            except BaseException:
+                # leave calibration mode even if a step failed
+                try:
+                    await self._send_one(
+                        cal.CAL_END, self._bracket_payload(cal.CAL_END)
+                    )
+                except Exception as ex:
+                    logger.warning(
+                        "unable to end calibration of %s: %r", self.client.ip, ex
+                    )
+                raise
+            await self._send_one(cal.CAL_END, self._bracket_payload(cal.CAL_END))
+            return results
+        finally:
+            self.duration = loop.time() - start
+
+    def _bracket_payload(self, command):
+        data = self.start_data if command == cal.CAL_START else self.end_data
+        if data is None:
+            return self.client.calibration_values_payload(
+                command, self.picMode, DEFAULT_CAL_VALUES, "float32"
+            )
+        return self.client.calibration_payload(command, self.picMode, data)
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        if exc_type is None and not self.committed:
+            await self.commit()
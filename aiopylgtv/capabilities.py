@@ -0,0 +1,75 @@
+import functools
+
+# Calibration capabilities by model family, model year code and series.
+# OLED model names look like OLED65C9PUA: family OLED, size 65, series C and
+# year 9.  LCD model names look like 65SM9900PUA: size 65, family S, year M and
+# series 99.  A row matches the longest series prefix given, an empty series
+# matches every model of that family and year.  New model years are supported
+# by adding rows.
+CALIBRATION_CAPABILITIES = (
+    # family, year, series, lut3d_size, custom_tone_mapping, dv_config_type
+    # 2018 OLED
+    ("OLED", "8", "", 33, False, 2018),
+    ("OLED", "8", "B", 17, False, 2018),
+    # 2019 OLED
+    ("OLED", "9", "", 33, True, 2019),
+    ("OLED", "9", "B", 17, True, 2019),
+    # 2018 Super UHD LCD, 8000 and higher
+    ("S", "K", "8", 17, False, 2018),
+    ("S", "K", "9", 17, False, 2018),
+    ("S", "K", "99", 33, False, 2018),
+    # 2019 NanoCell LCD, 8000 and higher
+    ("S", "M", "8", 17, True, 2019),
+    ("S", "M", "9", 17, True, 2019),
+    ("S", "M", "99", 33, True, 2019),
+)
+
+NO_CALIBRATION_SUPPORT = {
+    "lut1d": False,
+    "lut3d_size": None,
+    "custom_tone_mapping": False,
+    "dv_config_type": None,
+}
+
+
+def _compile_index(table):
+    index = {}
+    for family, year, series, lut3d_size, custom_tone_mapping, dv_config_type in table:
+        index[(family, year, series)] = {
+            "lut1d": True,
+            "lut3d_size": lut3d_size,
+            "custom_tone_mapping": custom_tone_mapping,
+            "dv_config_type": dv_config_type,
+        }
+    return index
+
+
+_CAPABILITY_INDEX = _compile_index(CALIBRATION_CAPABILITIES)
+_MAX_SERIES_LENGTH = max(len(row[2]) for row in CALIBRATION_CAPABILITIES)
+
+
+def parse_model_name(model_name):
+    """Return (family, year, series) from a tv model name, or None if unknown."""
+    if model_name.startswith("OLED"):
+        if len(model_name) > 7:
+            return ("OLED", model_name[7], model_name[6])
+    elif len(model_name) > 5 and model_name[0:2].isdigit():
+        return (model_name[2], model_name[3], model_name[4:6])
+    return None
+
+
+@functools.lru_cache(maxsize=None)
+def _calibration_support(model_name):
+    parsed = parse_model_name(model_name)
+    if parsed is not None:
+        family, year, series = parsed
+        for length in range(min(len(series), _MAX_SERIES_LENGTH), -1, -1):
+            info = _CAPABILITY_INDEX.get((family, year, series[:length]))
+            if info is not None:
+                return info
+    return NO_CALIBRATION_SUPPORT
+
+
+def calibration_support(model_name):
+    """Return the calibration capabilities of a tv model as a new dict."""
+    return dict(_calibration_support(model_name))
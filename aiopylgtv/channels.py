@@ -0,0 +1,135 @@
+class Channel:
+    """One entry of a ChannelTable, entry is the channelList item from the tv."""
+
+    __slots__ = ("channel_id", "number", "name", "entry")
+
+    def __init__(self, channel_id, number, name, entry=None):
+        self.channel_id = channel_id
+        self.number = number
+        self.name = name
+        self.entry = entry
+
+    def __repr__(self):
+        return f"Channel({self.channel_id!r}, {self.number!r}, {self.name!r})"
+
+
+def normalize_number(number):
+    """Return the lookup key of a channel number such as 7, "2-1" or "2.1"."""
+    return str(number).strip().replace(".", "-").replace(" ", "")
+
+
+def normalize_name(name):
+    """Return the lookup key of a channel name, ignoring case and outer spaces."""
+    return str(name).strip().casefold()
+
+
+class ChannelTable:
+    """Channel list indexed by channel id, number and name.
+
+    update() applies a channelList from the tv incrementally: unchanged
+    channels are kept, and only channels whose number or name changed touch the
+    indexes.  entries is the last channelList applied, in the order of the tv,
+    or None before the first update.  Each Channel refers to its item of that
+    list, so the full entries are kept once.  Numbers and names need not be
+    unique, lookups return the first channel indexed under the key.
+    """
+
+    def __init__(self, channels=None):
+        self._by_id = {}
+        self._by_number = {}
+        self._by_name = {}
+        self.entries = None
+        if channels:
+            self.update(channels)
+
+    def __len__(self):
+        return len(self._by_id)
+
+    def __iter__(self):
+        return iter(self._by_id.values())
+
+    def __contains__(self, channel_id):
+        return channel_id in self._by_id
+
+    def _index(self, channel):
+        if channel.number is not None:
+            key = normalize_number(channel.number)
+            self._by_number.setdefault(key, []).append(channel)
+        if channel.name is not None:
+            key = normalize_name(channel.name)
+            self._by_name.setdefault(key, []).append(channel)
+
+    @staticmethod
+    def _unindex_key(index, key, channel):
+        channels = index[key]
+        channels.remove(channel)
+        if not channels:
+            del index[key]
+
+    def _unindex(self, channel):
+        if channel.number is not None:
+            key = normalize_number(channel.number)
+            self._unindex_key(self._by_number, key, channel)
+        if channel.name is not None:
+            key = normalize_name(channel.name)
+            self._unindex_key(self._by_name, key, channel)
+
+    @property
+    def loaded(self):
+        return self.entries is not None
+
+    def update(self, channels):
+        """Apply a channelList, returning the counts of added, removed and changed channels.
+
+        A channel counts as changed if its item differs from the previous one,
+        reordering the list alone changes nothing.
+        """
+        by_id = self._by_id
+        seen = set()
+        added = 0
+        changed = 0
+        for item in channels:
+            channel_id = item.get("channelId")
+            number = item.get("channelNumber")
+            name = item.get("channelName")
+            seen.add(channel_id)
+            channel = by_id.get(channel_id)
+            if channel is None:
+                channel = Channel(channel_id, number, name, item)
+                by_id[channel_id] = channel
+                self._index(channel)
+                added += 1
+            elif channel.entry != item:
+                if channel.number != number or channel.name != name:
+                    self._unindex(channel)
+                    channel.number = number
+                    channel.name = name
+                    self._index(channel)
+                changed += 1
+            channel.entry = item
+
+        removed = [
+            channel for channel_id, channel in by_id.items() if channel_id not in seen
+        ]
+        for channel in removed:
+            self._unindex(channel)
+            del by_id[channel.channel_id]
+        self.entries = channels
+        return added, len(removed), changed
+
+    def clear(self):
+        self._by_id = {}
+        self._by_number = {}
+        self._by_name = {}
+        self.entries = None
+
+    def by_id(self, channel_id):
+        return self._by_id.get(channel_id)
+
+    def by_number(self, number):
+        channels = self._by_number.get(normalize_number(number))
+        return channels[0] if channels else None
+
+    def by_name(self, name):
+        channels = self._by_name.get(normalize_name(name))
+        return channels[0] if channels else None
@@ -1,10 +1,49 @@
-import numpy as np
-
 CALIBRATION_TYPE_MAP = {
     "uint8": "unsigned char",
     "uint16": "unsigned integer16",
     "float32": "float",
 }
-DEFAULT_CAL_DATA = np.array(
-    [0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0044, -0.0453, 1.041], dtype=np.float32
+# struct formats of the calibration data types, for encoding without NumPy
+CALIBRATION_STRUCT_FORMATS = {"uint8": "B", "uint16": "H", "float32": "f"}
+DEFAULT_CAL_VALUES = (0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0044, -0.0453, 1.041)
+IDENTITY_3BY3_VALUES = (1.0, 0.0, 0.0, 0.0, 1.0, 0.0, 0.0, 0.0, 1.0)
+STATE_FIELDS = frozenset(
+    [
+        "power_state",
+        "current_appId",
+        "muted",
+        "volume",
+        "current_channel",
+        "channel_info",
+        "channels",
+        "apps",
+        "inputs",
+        "system_info",
+        "software_info",
+        "sound_output",
+    ]
 )
+
+# subscription profiles for the subscriptions argument of WebOsClient
+SUBSCRIPTIONS_ALL = STATE_FIELDS
+SUBSCRIPTIONS_MINIMAL = frozenset(["power_state", "current_appId"])
+CHANNEL_FIELDS = frozenset(["current_channel", "channel_info", "channels"])
+STATIC_FIELDS = frozenset(["system_info", "software_info"])
+
+CONNECTION_DISCONNECTED = "disconnected"
+CONNECTION_CONNECTING = "connecting"
+CONNECTION_CONNECTED = "connected"
+CONNECTION_BACKOFF = "backoff"
+
+
+def __getattr__(name):
+    # DEFAULT_CAL_DATA is built on first use so that importing the package does
+    # not import NumPy
+    if name == "DEFAULT_CAL_DATA":
+        import numpy as np
+
+        data = np.array(DEFAULT_CAL_VALUES, dtype=np.float32)
+        data.flags.writeable = False
+        globals()[name] = data
+        return data
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -0,0 +1,288 @@
+import argparse
+import asyncio
+import inspect
+import json
+import logging
+import os
+import socket
+import stat
+import tempfile
+
+from .fleet import WebOsFleet
+
+logger = logging.getLogger(__name__)
+
+DAEMON_COMMANDS = ("status", "shutdown")
+
+
+def daemon_supported():
+    """Return whether the platform has the Unix sockets and user ids the daemon needs."""
+    return hasattr(socket, "AF_UNIX") and hasattr(os, "getuid")
+
+
+def default_socket_path():
+    """Return the default path of the daemon socket for the current user."""
+    runtime_dir = os.getenv("XDG_RUNTIME_DIR") or tempfile.gettempdir()
+    return os.path.join(runtime_dir, f"aiopylgtv-{os.getuid()}.sock")
+
+
+def encode_result(result):
+    """Serialise a command result to one line of json."""
+    return json.dumps(result, default=str) + "\n"
+
+
+async def call_client_method(client, command, parameters=()):
+    """Call the public client method named command and return its result."""
+    if command.startswith("_"):
+        raise ValueError(f"Invalid command {command}.")
+    method = getattr(client, command, None)
+    if method is None or not callable(method):
+        raise ValueError(f"Unknown command {command}.")
+    result = method(*parameters)
+    if inspect.isawaitable(result):
+        result = await result
+    return result
+
+
+class CommandDaemon:
+    """Serve WebOsClient commands over a Unix socket using warm connections.
+
+    Clients connect to the socket and send one json object per line, of the
+    form {"host": ..., "command": ..., "parameters": [...]}, and receive one
+    json line per request in the same order, either {"result": ...} or
+    {"error": ..., "exception": ...}.  Any "id" in a request is echoed back.
+    A connection to each tv is opened on its first command and kept open, and
+    reconnected when it drops.  A host whose first connection fails is
+    forgotten again, so that a mistyped address does not leave a reconnect loop
+    behind.  Requests without a host run daemon commands, "status" and
+    "shutdown".
+    """
+
+    def __init__(self, socket_path=None, hosts=(), **client_kwargs):
+        self.socket_path = socket_path or default_socket_path()
+        client_kwargs.setdefault("auto_reconnect", True)
+        self.fleet = WebOsFleet(hosts, **client_kwargs)
+        # hosts which are kept reconnecting, those given at startup and those
+        # which connected at least once
+        self.supervised_hosts = set(hosts)
+        self.commands_served = 0
+        self._server = None
+        self._stopped = None
+
+    async def start(self):
+        """Listen on the socket and connect to the tvs.
+
+        Raises RuntimeError if a daemon is already listening on the socket, or
+        if the socket path exists and is not a socket.
+        """
+        self._stopped = asyncio.Event()
+        if os.path.exists(self.socket_path):
+            if not stat.S_ISSOCK(os.stat(self.socket_path).st_mode):
+                raise RuntimeError(f"{self.socket_path} exists and is not a socket.")
+            if await daemon_listening(self.socket_path):
+                raise RuntimeError(
+                    f"A daemon is already listening on {self.socket_path}."
+                )
+            # remove the socket of a daemon which did not shut down cleanly
+            os.remove(self.socket_path)
+        # bind under a umask, so that the socket is created accessible to the
+        # current user only rather than changing its mode once it is reachable
+        umask = os.umask(0o177)
+        try:
+            self._server = await asyncio.start_unix_server(
+                self.handle_connection, path=self.socket_path
+            )
+        finally:
+            os.umask(umask)
+        if len(self.fleet):
+            await self.fleet.connect_all()
+        logger.debug("listening on %s", self.socket_path)
+
+    async def stop(self):
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+            self._server = None
+            if os.path.exists(self.socket_path):
+                os.remove(self.socket_path)
+        await self.fleet.stop()
+        if self._stopped is not None:
+            self._stopped.set()
+
+    async def serve_forever(self):
+        await self.start()
+        try:
+            await self._stopped.wait()
+        finally:
+            await self.stop()
+
+    async def __aenter__(self):
+        await self.start()
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.stop()
+
+    async def client(self, host):
+        """Return a connected client for host."""
+        client = self.fleet.add(host)
+        if not client.is_connected():
+            try:
+                await client.connect()
+            except Exception:
+                if host not in self.supervised_hosts:
+                    await self.fleet.remove(host)
+                raise
+            self.supervised_hosts.add(host)
+        return client
+
+    async def run_command(self, host, command, parameters=()):
+        if host is None:
+            if command == "status":
+                return self.status()
+            elif command == "shutdown":
+                asyncio.get_running_loop().call_soon(self._stopped.set)
+                return True
+            raise ValueError(
+                f"Unknown daemon command {command}, daemon commands are {list(DAEMON_COMMANDS)}."
+            )
+
+        client = await self.client(host)
+        return await call_client_method(client, command, parameters)
+
+    async def handle_request(self, line):
+        response = {}
+        try:
+            request = json.loads(line)
+            if "id" in request:
+                response["id"] = request["id"]
+            result = await self.run_command(
+                request.get("host"), request["command"], request.get("parameters", ())
+            )
+            response["result"] = result
+        except Exception as ex:
+            response["error"] = str(ex)
+            response["exception"] = type(ex).__name__
+        self.commands_served += 1
+        return encode_result(response)
+
+    async def handle_connection(self, reader, writer):
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                if not line.strip():
+                    continue
+                writer.write((await self.handle_request(line)).encode())
+                await writer.drain()
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+    def status(self):
+        summary = self.fleet.summary()
+        summary["socket_path"] = self.socket_path
+        summary["commands_served"] = self.commands_served
+        return summary
+
+
+async def open_daemon_connection(socket_path=None):
+    """Connect to a running daemon, returning the (reader, writer) pair.
+
+    Returns None if no daemon is listening on socket_path, or if the platform
+    does not support the daemon.
+    """
+    if not daemon_supported():
+        return None
+    try:
+        return await asyncio.open_unix_connection(socket_path or default_socket_path())
+    except (OSError, AttributeError, NotImplementedError):
+        return None
+
+
+async def daemon_listening(socket_path=None):
+    """Return whether a daemon accepts connections on socket_path."""
+    connection = await open_daemon_connection(socket_path)
+    if connection is None:
+        return False
+    connection[1].close()
+    return True
+
+
+async def iter_responses(requests, socket_path=None, connection=None):
+    """Send requests to a running daemon over one connection, yielding the responses.
+
+    The requests are written while the responses are read, and the responses
+    are yielded as they arrive.  connection is a (reader, writer) pair from
+    open_daemon_connection(), or None to connect to socket_path.  Raises
+    ConnectionError if no daemon is listening or if the daemon closes the
+    connection early.
+    """
+    if connection is None:
+        connection = await open_daemon_connection(socket_path)
+        if connection is None:
+            raise ConnectionRefusedError("No daemon is listening.")
+    reader, writer = connection
+
+    async def send():
+        for request in requests:
+            writer.write(encode_result(request).encode())
+            await writer.drain()
+
+    sender = asyncio.create_task(send())
+    try:
+        for _ in requests:
+            line = await reader.readline()
+            if not line:
+                raise ConnectionError("Daemon closed the connection.")
+            yield json.loads(line)
+    finally:
+        sender.cancel()
+        await asyncio.gather(sender, return_exceptions=True)
+        writer.close()
+
+
+async def send_commands(requests, socket_path=None):
+    """Send requests to a running daemon, returning the responses.
+
+    Returns None if no daemon is listening on socket_path.
+    """
+    connection = await open_daemon_connection(socket_path)
+    if connection is None:
+        return None
+    responses = iter_responses(requests, connection=connection)
+    return [response async for response in responses]
+
+
+def aiopylgtvdaemon():
+    parser = argparse.ArgumentParser(
+        description="Keep connections to LG WebOs TVs open for aiopylgtvcommand."
+    )
+    parser.add_argument(
+        "hosts",
+        type=str,
+        nargs="*",
+        help="hostnames or ip addresses of TVs to connect to at startup",
+    )
+    parser.add_argument(
+        "--socket",
+        type=str,
+        default=None,
+        help="path of the Unix socket to listen on (default in XDG_RUNTIME_DIR or the temporary directory)",
+    )
+
+    args = parser.parse_args()
+    if not daemon_supported():
+        parser.exit(
+            1, "aiopylgtvdaemon needs Unix sockets, which this platform lacks.\n"
+        )
+
+    daemon = CommandDaemon(args.socket, args.hosts, timeout_connect=2)
+    try:
+        asyncio.run(daemon.serve_forever())
+    except RuntimeError as ex:
+        parser.exit(1, f"{ex}\n")
+    except KeyboardInterrupt:
+        pass
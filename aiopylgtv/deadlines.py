@@ -0,0 +1,66 @@
+import asyncio
+import heapq
+import itertools
+
+MIN_COMPACT_SIZE = 1024
+
+
+class DeadlineQueue:
+    """Expire futures at their deadlines using one heap and one timer.
+
+    Futures which complete before their deadline are not removed right away,
+    they are skipped when they reach the top of the heap, and the heap is
+    compacted whenever it has grown to twice its size after the last
+    compaction.  on_expire is called with the future for every future still
+    pending at its deadline.
+    """
+
+    def __init__(self):
+        self.expired = 0
+        self._heap = []
+        self._counter = itertools.count()
+        self._handle = None
+        self._handle_when = None
+        self._compact_size = MIN_COMPACT_SIZE
+
+    def __len__(self):
+        return len(self._heap)
+
+    def add(self, future, timeout, on_expire):
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + timeout
+        heap = self._heap
+        heapq.heappush(heap, (deadline, next(self._counter), future, on_expire))
+
+        if len(heap) > self._compact_size:
+            heap[:] = [entry for entry in heap if not entry[2].done()]
+            heapq.heapify(heap)
+            self._compact_size = max(MIN_COMPACT_SIZE, 2 * len(heap))
+
+        if self._handle is None or deadline < self._handle_when:
+            self._schedule(loop, deadline)
+
+    def _schedule(self, loop, when):
+        if self._handle is not None:
+            self._handle.cancel()
+        self._handle_when = when
+        self._handle = loop.call_at(when, self._expire, loop)
+
+    def _expire(self, loop):
+        self._handle = None
+        now = loop.time()
+        heap = self._heap
+        while heap and (heap[0][0] <= now or heap[0][2].done()):
+            _, _, future, on_expire = heapq.heappop(heap)
+            if not future.done():
+                self.expired += 1
+                on_expire(future)
+        if heap:
+            self._schedule(loop, heap[0][0])
+
+    def clear(self):
+        if self._handle is not None:
+            self._handle.cancel()
+            self._handle = None
+        self._heap = []
+        self._compact_size = MIN_COMPACT_SIZE
@@ -0,0 +1,184 @@
+import asyncio
+import collections
+import logging
+import random
+
+from .key_store import KeyStore
+from .webos_client import WebOsClient
+
+logger = logging.getLogger(__name__)
+
+
+class WebOsFleet:
+    """Manage the connections of many WebOsClient instances in one event loop.
+
+    All clients share one KeyStore, so the key file is read once for the whole
+    fleet.  At most max_concurrent_connects handshakes run at the same time.  If
+    reconnect_interval is set, start() runs a maintenance task which checks for
+    disconnected clients every reconnect_interval seconds and reconnects each of
+    them after a random delay of up to reconnect_spread seconds, so that a group
+    of tvs dropping off at once does not come back as a burst of handshakes.
+    """
+
+    def __init__(
+        self,
+        hosts=(),
+        key_file_path=None,
+        key_store=None,
+        max_concurrent_connects=10,
+        reconnect_interval=None,
+        reconnect_spread=10.0,
+        **client_kwargs,
+    ):
+        if key_store is None:
+            key_store = KeyStore.shared(key_file_path)
+        self.key_store = key_store
+        self.max_concurrent_connects = max_concurrent_connects
+        self.reconnect_interval = reconnect_interval
+        self.reconnect_spread = reconnect_spread
+        self.client_kwargs = client_kwargs
+        self.clients = {}
+        self.connect_failures = collections.Counter()
+        self._connect_semaphore = None
+        self._connect_tasks = {}
+        self._maintenance_task = None
+
+        for host in hosts:
+            self.add(host)
+
+    def add(self, ip, **kwargs):
+        """Create and return a client for ip, sharing the fleet settings."""
+        if ip in self.clients:
+            return self.clients[ip]
+        client_kwargs = dict(self.client_kwargs)
+        client_kwargs.update(kwargs)
+        client_kwargs.setdefault("key_store", self.key_store)
+        client = WebOsClient(ip, **client_kwargs)
+        self.clients[ip] = client
+        return client
+
+    async def remove(self, ip):
+        """Disconnect and forget the client for ip."""
+        task = self._connect_tasks.pop(ip, None)
+        if task is not None:
+            task.cancel()
+        client = self.clients.pop(ip, None)
+        if client is not None:
+            await client.disconnect()
+
+    def __getitem__(self, ip):
+        return self.clients[ip]
+
+    def __iter__(self):
+        return iter(self.clients.values())
+
+    def __len__(self):
+        return len(self.clients)
+
+    async def _connect(self, client, delay=0.0):
+        if delay:
+            await asyncio.sleep(delay)
+        if self._connect_semaphore is None:
+            self._connect_semaphore = asyncio.Semaphore(self.max_concurrent_connects)
+        async with self._connect_semaphore:
+            try:
+                await client.connect()
+            except asyncio.CancelledError:
+                raise
+            except Exception as ex:
+                self.connect_failures[client.ip] += 1
+                logger.debug("unable to connect to %s: %r", client.ip, ex)
+                return ex
+        self.connect_failures.pop(client.ip, None)
+        return True
+
+    def _schedule_connect(self, client, delay=0.0):
+        task = self._connect_tasks.get(client.ip)
+        if task is None or task.done():
+            task = asyncio.create_task(self._connect(client, delay))
+            self._connect_tasks[client.ip] = task
+        return task
+
+    async def connect_all(self):
+        """Connect all clients, returning a dict of ip to True or the exception raised."""
+        tasks = {
+            ip: self._schedule_connect(client)
+            for ip, client in self.clients.items()
+            if not client.is_connected()
+        }
+        results = dict.fromkeys(self.clients, True)
+        if tasks:
+            done = await asyncio.gather(*tasks.values())
+            results.update(zip(tasks, done))
+        return results
+
+    async def disconnect_all(self):
+        for task in self._connect_tasks.values():
+            task.cancel()
+        self._connect_tasks = {}
+        await asyncio.gather(*(client.disconnect() for client in self))
+        self.key_store.flush()
+
+    async def maintenance_handler(self):
+        while True:
+            await asyncio.sleep(self.reconnect_interval)
+            for client in self:
+                if not client.is_connected():
+                    delay = random.uniform(0.0, self.reconnect_spread)
+                    self._schedule_connect(client, delay)
+
+    async def start(self):
+        """Connect all clients and start reconnecting dropped ones if configured."""
+        results = await self.connect_all()
+        if self.reconnect_interval is not None and self._maintenance_task is None:
+            self._maintenance_task = asyncio.create_task(self.maintenance_handler())
+        return results
+
+    async def stop(self):
+        if self._maintenance_task is not None:
+            self._maintenance_task.cancel()
+            try:
+                await self._maintenance_task
+            except asyncio.CancelledError:
+                pass
+            self._maintenance_task = None
+        await self.disconnect_all()
+
+    async def __aenter__(self):
+        await self.start()
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.stop()
+
+    def connected(self):
+        """Return the ips of all connected clients."""
+        return [ip for ip, client in self.clients.items() if client.is_connected()]
+
+    def calibration_support(self):
+        """Return the calibration capabilities of each client with known system info."""
+        return {
+            ip: client.calibration_support_info()
+            for ip, client in self.clients.items()
+            if client._system_info is not None
+        }
+
+    def summary(self):
+        """Return aggregate connection and power state counts for the fleet."""
+        connected = 0
+        power_states = collections.Counter()
+        for client in self:
+            if client.is_connected():
+                connected += 1
+            power_states[client._power_state] += 1
+        return {
+            "clients": len(self.clients),
+            "connected": connected,
+            "disconnected": len(self.clients) - connected,
+            "connecting": sum(
+                1 for task in self._connect_tasks.values() if not task.done()
+            ),
+            "power_states": dict(power_states),
+            "connect_failures": sum(self.connect_failures.values()),
+            "expired_requests": sum(client.expired_requests for client in self),
+        }
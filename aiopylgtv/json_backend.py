@@ -0,0 +1,81 @@
+import json
+import re
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import ujson
+except ImportError:
+    ujson = None
+
+
+NO_ID = object()
+
+# top level message id, either a json string without escapes or an integer
+_ID_RE = re.compile(r'"id"\s*:\s*(?:"([^"\\]*)"|(-?\d+)\s*[,}])')
+
+
+def _orjson_dumps(obj):
+    # text frames are required, so return str rather than bytes
+    return orjson.dumps(obj).decode()
+
+
+def available_backends():
+    """Return the names of the json backends which can be used."""
+    backends = ["json"]
+    if orjson is not None:
+        backends.append("orjson")
+    if ujson is not None:
+        backends.append("ujson")
+    return backends
+
+
+def get_backend(name=None):
+    """Return (loads, dumps) for the named json backend.
+
+    If name is None the fastest installed backend is used, in order of
+    preference orjson, ujson and the standard library json module.
+    """
+    if name is None:
+        if orjson is not None:
+            name = "orjson"
+        elif ujson is not None:
+            name = "ujson"
+        else:
+            name = "json"
+
+    if name == "json":
+        return json.loads, json.dumps
+    elif name == "orjson" and orjson is not None:
+        return orjson.loads, _orjson_dumps
+    elif name == "ujson" and ujson is not None:
+        return ujson.loads, ujson.dumps
+
+    raise ValueError(
+        f"Json backend {name} is not available, available backends are {available_backends()}."
+    )
+
+
+def peek_message_id(raw_msg):
+    """Return the id of a raw SSAP message without decoding all of it.
+
+    Only the part of the message before the payload is scanned.  NO_ID is
+    returned if the id can't be determined this way, in which case the message
+    has to be decoded in full.
+    """
+    if not isinstance(raw_msg, str):
+        return NO_ID
+    end = raw_msg.find('"payload"')
+    if end < 0:
+        end = len(raw_msg)
+    match = _ID_RE.search(raw_msg, 0, end)
+    # make sure the match is not inside a nested object
+    if match is None or raw_msg.count("{", 0, match.start()) != 1:
+        return NO_ID
+    string_id, int_id = match.groups()
+    if string_id is not None:
+        return string_id
+    return int(int_id)
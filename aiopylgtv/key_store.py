@@ -0,0 +1,160 @@
+import asyncio
+import atexit
+import json
+import logging
+import os
+import shutil
+import tempfile
+import weakref
+
+logger = logging.getLogger(__name__)
+
+
+KEY_FILE_NAME = ".aiopylgtv"
+USER_HOME = "HOME"
+
+# stores which may hold unwritten keys, flushed at exit
+_open_stores = weakref.WeakSet()
+
+
+def _flush_open_stores():
+    for store in list(_open_stores):
+        try:
+            store.flush()
+        except Exception:
+            logger.exception("unable to save keyfile %s", store.path)
+
+
+atexit.register(_flush_open_stores)
+
+
+def default_key_file_path():
+    """Return the default key file path."""
+    if os.getenv(USER_HOME) is not None and os.access(os.getenv(USER_HOME), os.W_OK):
+        return os.path.join(os.getenv(USER_HOME), KEY_FILE_NAME)
+
+    return os.path.join(os.getcwd(), KEY_FILE_NAME)
+
+
+class KeyStore:
+    """Client keys for all paired tvs, indexed in memory by ip.
+
+    The key file is read once on first use.  Updates are written back after
+    save_delay seconds so that several pairings are batched into one write, or
+    immediately if save_delay is None or no event loop is running.  Writes go to
+    a temporary file which is then renamed over the key file, and keys written
+    to the file by other processes in the meantime are preserved.  Pending
+    updates are written at exit, or by close().
+    """
+
+    _shared = {}
+
+    def __init__(self, path=None, save_delay=1.0):
+        self.path = path or default_key_file_path()
+        self.save_delay = save_delay
+        self.reads = 0
+        self.writes = 0
+        self._keys = None
+        self._dirty = set()
+        self._save_handle = None
+        self._save_loop = None
+        _open_stores.add(self)
+
+    @classmethod
+    def shared(cls, path=None):
+        """Return the store for path, creating it on first use."""
+        path = os.path.abspath(path or default_key_file_path())
+        store = cls._shared.get(path)
+        if store is None:
+            store = cls(path)
+            cls._shared[path] = store
+        return store
+
+    def _read(self):
+        self.reads += 1
+        logger.debug("load keyfile from %s", self.path)
+        if os.path.isfile(self.path):
+            with open(self.path, "r") as f:
+                raw_data = f.read()
+                if raw_data:
+                    return json.loads(raw_data)
+        return {}
+
+    def reload(self):
+        """Reread the key file, keeping keys which are not yet written."""
+        keys = self._read()
+        if self._keys is not None:
+            keys.update({ip: self._keys[ip] for ip in self._dirty})
+        self._keys = keys
+
+    def get(self, ip):
+        if self._keys is None:
+            self.reload()
+        return self._keys.get(ip)
+
+    def set(self, ip, client_key):
+        if self._keys is None:
+            self.reload()
+        if self._keys.get(ip) == client_key:
+            return
+        self._keys[ip] = client_key
+        self._dirty.add(ip)
+        self._schedule_save()
+
+    def __contains__(self, ip):
+        return self.get(ip) is not None
+
+    def _schedule_save(self):
+        if self.save_delay is None:
+            self.save()
+            return
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            self.save()
+            return
+        if self._save_handle is not None and self._save_loop is not loop:
+            # the save was scheduled on a loop which is gone or no longer runs
+            self._save_handle.cancel()
+            self._save_handle = None
+        if self._save_handle is None:
+            self._save_loop = loop
+            self._save_handle = loop.call_later(self.save_delay, self.save)
+
+    def save(self):
+        """Write all keys to the key file."""
+        if self._save_handle is not None:
+            self._save_handle.cancel()
+            self._save_handle = None
+            self._save_loop = None
+
+        keys = self._read()
+        if self._keys is not None:
+            keys.update({ip: self._keys[ip] for ip in self._dirty})
+
+        logger.debug("save keyfile to %s", self.path)
+        directory = os.path.dirname(os.path.abspath(self.path))
+        fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=".aiopylgtv-")
+        try:
+            with os.fdopen(fd, "w") as f:
+                f.write(json.dumps(keys))
+            if os.path.exists(self.path):
+                shutil.copymode(self.path, tmp_path)
+            os.replace(tmp_path, self.path)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+        self.writes += 1
+        self._keys = keys
+        self._dirty = set()
+
+    def flush(self):
+        """Write pending updates, if any."""
+        if self._dirty:
+            self.save()
+
+    def close(self):
+        """Write pending updates and stop tracking the store for the exit flush."""
+        self.flush()
+        _open_stores.discard(self)
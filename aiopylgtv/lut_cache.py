@@ -0,0 +1,136 @@
+import hashlib
+import logging
+import os
+import tempfile
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+
+# bump whenever the output of the LUT readers changes
+CACHE_VERSION = 1
+DEFAULT_MAX_BYTES = 256 * 1024 * 1024
+
+
+def _default_cache_dir():
+    cache_home = os.getenv("XDG_CACHE_HOME") or os.path.join(
+        os.path.expanduser("~"), ".cache"
+    )
+    return os.path.join(cache_home, "aiopylgtv", "luts")
+
+
+class LutCache:
+    """Persistent cache of parsed LUT files.
+
+    Converted LUTs are stored as .npy files named after the content hash of the
+    source file and the reader used, and are returned memory-mapped read-only.
+    Files are identified by path, mtime and size so that unchanged files are
+    only hashed once per process.  The cache directory is kept below max_bytes
+    by evicting the least recently used entries.
+    """
+
+    def __init__(self, cache_dir=None, max_bytes=DEFAULT_MAX_BYTES):
+        self.cache_dir = cache_dir or _default_cache_dir()
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._digests = {}
+        os.makedirs(self.cache_dir, exist_ok=True)
+
+    @staticmethod
+    def _hash_file(path):
+        digest = hashlib.sha256()
+        with open(path, "rb") as f:
+            for chunk in iter(lambda: f.read(1 << 20), b""):
+                digest.update(chunk)
+        return digest.hexdigest()
+
+    def _entry_path(self, filename, reader):
+        path = os.path.abspath(filename)
+        stat = os.stat(path)
+        stat_key = (path, stat.st_mtime_ns, stat.st_size)
+        digest = self._digests.get(stat_key)
+        if digest is None:
+            digest = self._hash_file(path)
+            self._digests[stat_key] = digest
+        entry_name = f"{digest}-{reader.__name__}-v{CACHE_VERSION}.npy"
+        return os.path.join(self.cache_dir, entry_name)
+
+    def load(self, filename, reader):
+        """Return the LUT in filename as converted by reader, using the cache."""
+        entry = self._entry_path(filename, reader)
+        try:
+            lut = np.load(entry, mmap_mode="r")
+        except (OSError, ValueError):
+            self.misses += 1
+            lut = reader(filename)
+            self._store(entry, lut)
+            return lut
+
+        self.hits += 1
+        # the modification time of an entry doubles as its last use for eviction
+        try:
+            os.utime(entry)
+        except OSError:
+            pass
+        return lut
+
+    def _store(self, entry, lut):
+        fd, tmp_path = tempfile.mkstemp(dir=self.cache_dir, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                np.save(f, lut)
+            os.replace(tmp_path, entry)
+        except OSError as ex:
+            logger.warning("unable to store %s in lut cache: %s", entry, ex)
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            return
+        self.evict(keep=entry)
+
+    def _entries(self):
+        entries = []
+        with os.scandir(self.cache_dir) as it:
+            for dir_entry in it:
+                if dir_entry.name.endswith(".npy") and dir_entry.is_file():
+                    stat = dir_entry.stat()
+                    entries.append((stat.st_mtime, stat.st_size, dir_entry.path))
+        return entries
+
+    def evict(self, keep=None):
+        """Remove least recently used entries until the cache fits in max_bytes."""
+        entries = sorted(self._entries())
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in entries:
+            if total <= self.max_bytes:
+                break
+            if path == keep:
+                continue
+            try:
+                os.remove(path)
+            except OSError:
+                continue
+            total -= size
+            self.evictions += 1
+
+    def clear(self):
+        """Remove all entries from the cache."""
+        for _, _, path in self._entries():
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+        self._digests = {}
+
+    def stats(self):
+        entries = self._entries()
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "entries": len(entries),
+            "bytes": sum(size for _, size, _ in entries),
+            "max_bytes": self.max_bytes,
+        }
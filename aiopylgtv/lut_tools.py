@@ -1,5 +1,11 @@
+import functools
+import re
+import warnings
+
 import numpy as np
 
+_COMMENT_RE = re.compile(r"#[^\n]*")
+
 
 def unity_lut_1d():
     lutmono = np.linspace(0.0, 32767.0, 1024, dtype=np.float64)
@@ -19,18 +25,31 @@ def unity_lut_3d(n=33):
     return lut
 
 
+def _parse_floats(text, what):
+    """Convert whitespace separated numbers to a flat float64 array in bulk."""
+    with warnings.catch_warnings():
+        # depending on the numpy version unparseable text is signalled either
+        # with a DeprecationWarning or a ValueError
+        warnings.simplefilter("error", DeprecationWarning)
+        try:
+            return np.fromstring(text, dtype=np.float64, sep=" ")
+        except (DeprecationWarning, ValueError):
+            raise ValueError(f"Invalid numerical data in {what}.")
+
+
 def read_cube_file(filename):  # noqa: C901
-    nheader = 0
     lut_1d_size = None
     lut_3d_size = None
     domain_min = None
     domain_max = None
 
     with open(filename) as f:
-        lines = f.readlines()
+        text = f.read()
 
-    def domain_check(line, which):
-        domain_limit = np.genfromtxt([line], usecols=(1, 2, 3), dtype=np.float64)
+    def domain_check(splitline, which):
+        if len(splitline) < 4:
+            raise ValueError(f"DOMAIN_{which} must provide exactly 3 values.")
+        domain_limit = _parse_floats(" ".join(splitline[1:4]), f"DOMAIN_{which}")
         if domain_limit.shape != (3,):
             raise ValueError(f"DOMAIN_{which} must provide exactly 3 values.")
         if np.amin(domain_limit) < -1e37 or np.amax(domain_limit) > 1e37:
@@ -49,7 +68,14 @@ def read_cube_file(filename):  # noqa: C901
             )
         return lut_size
 
-    for line in lines:
+    # only the header is processed line by line, the table itself is handed to
+    # numpy as a single block of text
+    pos = 0
+    while pos < len(text):
+        eol = text.find("\n", pos)
+        if eol < 0:
+            eol = len(text)
+        line = text[pos:eol]
         icomment = line.find("#")
         if icomment >= 0:
             line = line[:icomment]
@@ -69,13 +95,13 @@ def read_cube_file(filename):  # noqa: C901
         elif keyword == "LUT_3D_SIZE":
             lut_3d_size = lut_size(splitline, dim=3)
         elif keyword == "DOMAIN_MIN":
-            domain_min = domain_check(line, "MIN")
+            domain_min = domain_check(splitline, "MIN")
         elif keyword == "DOMAIN_MAX":
-            domain_max = domain_check(line, "MAX")
+            domain_max = domain_check(splitline, "MAX")
         else:
             break
 
-        nheader += 1
+        pos = eol + 1
 
     if lut_1d_size and lut_3d_size:
         raise ValueError("Cannot specify both LUT_1D_SIZE and LUT_3D_SIZE.")
@@ -89,8 +115,18 @@ def read_cube_file(filename):  # noqa: C901
     if domain_max is None:
         domain_max = np.ones((1, 3), dtype=np.float64)
 
-    lut = np.genfromtxt(lines[nheader:], comments="#", dtype=np.float64)
-    if np.amin(lut) < -1e37 or np.amax(lut) > 1e37:
+    body = text[pos:]
+    if "#" in body:
+        body = _COMMENT_RE.sub("", body)
+    # line breaks are parsed as nan, so that the number of values on each row
+    # can be checked without splitting the text into lines
+    values = _parse_floats(body.replace("\n", " nan ") + " nan", "LUT data")
+    breaks = np.isnan(values)
+    row_lengths = np.diff(np.flatnonzero(breaks), prepend=-1) - 1
+    if np.any((row_lengths != 0) & (row_lengths != 3)):
+        raise ValueError("Expected 3 values on every row of LUT data.")
+    lut = np.reshape(values[~breaks], (-1, 3))
+    if lut.size and (np.amin(lut) < -1e37 or np.amax(lut) > 1e37):
         raise ValueError("Invalid value in DOMAIN_MAX, must be in range [-1e37,1e37].")
 
     # shift and scale lut to range [0.,1.]
@@ -148,3 +184,251 @@ def read_cal_file(filename):
     lut = np.transpose(lut)
 
     return lut
+
+
+# SMPTE ST 2084 constants
+PQ_M1 = 2610.0 / 16384.0
+PQ_M2 = 2523.0 / 4096.0 * 128.0
+PQ_C1 = 3424.0 / 4096.0
+PQ_C2 = 2413.0 / 4096.0 * 32.0
+PQ_C3 = 2392.0 / 4096.0 * 32.0
+PQ_PEAK = 10000.0
+
+# ARIB STD-B67 / BT.2100 HLG constants
+HLG_A = 0.17883277
+HLG_B = 1.0 - 4.0 * HLG_A
+HLG_C = 0.5 - HLG_A * np.log(4.0 * HLG_A)
+
+LUT_1D_SIZE = 1024
+
+
+def gamma_curve(x, gamma=2.2):
+    """Power law curve, x ** gamma."""
+    if gamma <= 0.0:
+        raise ValueError(f"Invalid gamma {gamma}, must be positive.")
+    return np.power(np.clip(x, 0.0, 1.0), gamma)
+
+
+def bt1886_curve(x, gamma=2.4, black=0.0, white=100.0):
+    """BT.1886 EOTF for black and white levels in cd/m2, normalized to white."""
+    if not 0.0 <= black < white:
+        raise ValueError(
+            f"Invalid black {black} and white {white} levels, must be 0 <= black < white."
+        )
+    if gamma <= 0.0:
+        raise ValueError(f"Invalid gamma {gamma}, must be positive.")
+    white_root = white ** (1.0 / gamma)
+    black_root = black ** (1.0 / gamma)
+    a = (white_root - black_root) ** gamma
+    b = black_root / (white_root - black_root)
+    return a * np.power(np.clip(x, 0.0, 1.0) + b, gamma) / white
+
+
+def pq_eotf(x):
+    """ST 2084 EOTF, signal in [0, 1] to luminance in cd/m2."""
+    p = np.power(np.clip(x, 0.0, 1.0), 1.0 / PQ_M2)
+    return PQ_PEAK * np.power(
+        np.maximum(p - PQ_C1, 0.0) / (PQ_C2 - PQ_C3 * p), 1.0 / PQ_M1
+    )
+
+
+def pq_inverse_eotf(luminance):
+    """ST 2084 inverse EOTF, luminance in cd/m2 to signal in [0, 1]."""
+    y = np.power(np.clip(np.asarray(luminance) / PQ_PEAK, 0.0, 1.0), PQ_M1)
+    return np.power((PQ_C1 + PQ_C2 * y) / (1.0 + PQ_C3 * y), PQ_M2)
+
+
+def pq_curve(x, peak=1000.0, source_peak=PQ_PEAK, rolloff=True):
+    """ST 2084 EOTF for a display of the given peak, normalized to the peak.
+
+    Content mastered up to source_peak is compressed into the display range
+    with the BT.2390 hermite spline roll-off, or clipped at the peak if
+    rolloff is False.
+    """
+    if not 0.0 < peak <= PQ_PEAK or not 0.0 < source_peak <= PQ_PEAK:
+        raise ValueError(
+            f"Invalid peak {peak} or source_peak {source_peak}, must be in range (0, {PQ_PEAK}]."
+        )
+    x = np.clip(x, 0.0, 1.0)
+    if not rolloff or peak >= source_peak:
+        return np.minimum(pq_eotf(x), peak) / peak
+
+    # BT.2390 EETF in the pq domain, normalized to the source peak
+    source_max = pq_inverse_eotf(source_peak)
+    e1 = np.minimum(x / source_max, 1.0)
+    max_lum = pq_inverse_eotf(peak) / source_max
+    knee = 1.5 * max_lum - 0.5
+    t = np.clip((e1 - knee) / (1.0 - knee), 0.0, 1.0)
+    t2 = t * t
+    t3 = t2 * t
+    spline = (
+        (2.0 * t3 - 3.0 * t2 + 1.0) * knee
+        + (t3 - 2.0 * t2 + t) * (1.0 - knee)
+        + (-2.0 * t3 + 3.0 * t2) * max_lum
+    )
+    e2 = np.where(e1 < knee, e1, spline)
+    return np.minimum(pq_eotf(e2 * source_max), peak) / peak
+
+
+def hlg_curve(x, peak=1000.0, system_gamma=None):
+    """BT.2100 HLG inverse OETF and OOTF for a display of the given peak.
+
+    The system gamma defaults to the BT.2100 value for the peak, and the OOTF
+    is applied per channel.  The result is normalized to the peak.
+    """
+    if peak <= 0.0:
+        raise ValueError(f"Invalid peak {peak}, must be positive.")
+    if system_gamma is None:
+        system_gamma = 1.2 + 0.42 * np.log10(peak / 1000.0)
+    x = np.clip(x, 0.0, 1.0)
+    with np.errstate(over="ignore"):
+        high = (np.exp((x - HLG_C) / HLG_A) + HLG_B) / 12.0
+    scene = np.where(x <= 0.5, x * x / 3.0, high)
+    return np.power(scene, system_gamma)
+
+
+CURVES_1D = {
+    "gamma": gamma_curve,
+    "bt1886": bt1886_curve,
+    "pq": pq_curve,
+    "hlg": hlg_curve,
+}
+
+
+@functools.lru_cache(maxsize=64)
+def _cached_curve_lut_1d(curve, params):
+    x = np.linspace(0.0, 1.0, LUT_1D_SIZE, dtype=np.float64)
+    y = CURVES_1D[curve](x, **dict(params))
+    lutmono = np.clip(np.rint(y * 32767.0), 0, 32767).astype(np.uint16)
+    lut = np.stack([lutmono] * 3, axis=0)
+    lut.flags.writeable = False
+    return lut
+
+
+def curve_lut_1d(curve, **params):
+    """Return a 1D LUT for upload_1d_lut following an analytic curve.
+
+    curve is one of gamma, bt1886, pq or hlg and params are passed to the
+    matching *_curve function.  LUTs are memoized by curve and parameters and
+    returned read-only, so repeated uploads share one array and its encoding.
+    """
+    if curve not in CURVES_1D:
+        raise ValueError(
+            f"Invalid curve {curve}, must be one of {', '.join(CURVES_1D)}."
+        )
+    return _cached_curve_lut_1d(curve, tuple(sorted(params.items())))
+
+
+def lattice_coordinates_3d(n):
+    """Return the normalized rgb coordinates of an n point 3D LUT lattice.
+
+    The result has shape (n, n, n, 3) and follows the element order of 3D LUTs,
+    ie blue varies slowest and red fastest.
+    """
+    axis = np.linspace(0.0, 1.0, n, dtype=np.float64)
+    b, g, r = np.meshgrid(axis, axis, axis, indexing="ij")
+    return np.stack([r, g, b], axis=-1)
+
+
+def interpolate_lut_3d(lut, rgb, method="tetrahedral"):
+    """Evaluate a 3D LUT at arbitrary normalized rgb coordinates.
+
+    lut has shape (n, n, n, 3) in 3D LUT element order and rgb has shape
+    (..., 3) with values in [0, 1].  All points are evaluated in a single
+    vectorized pass with either trilinear or tetrahedral interpolation.
+    """
+    if method not in ("trilinear", "tetrahedral"):
+        raise ValueError(
+            f"Invalid interpolation method {method}, must be trilinear or tetrahedral."
+        )
+    n = lut.shape[0]
+    table = np.reshape(lut, (-1, 3)).astype(np.float64, copy=False)
+    shape = rgb.shape
+    rgb = np.reshape(rgb, (-1, 3))
+
+    scaled = np.clip(rgb, 0.0, 1.0) * (n - 1)
+    base = np.minimum(np.floor(scaled).astype(np.intp), n - 2)
+    frac = scaled - base
+    # flat index strides of the red, green and blue axes
+    strides = np.array([1, n, n * n], dtype=np.intp)
+    idx0 = base @ strides
+
+    if method == "trilinear":
+        out = np.zeros((rgb.shape[0], 3), dtype=np.float64)
+        for corner in range(8):
+            offset = np.array([(corner >> axis) & 1 for axis in range(3)])
+            weight = np.prod(np.where(offset, frac, 1.0 - frac), axis=-1)
+            out += weight[:, np.newaxis] * table[idx0 + offset @ strides]
+    else:
+        # walk from the base corner to the opposite corner along the axes in
+        # order of decreasing fractional part, which selects the tetrahedron
+        order = np.argsort(-frac, axis=-1)
+        fsorted = np.take_along_axis(frac, order, axis=-1)
+        idx1 = idx0 + strides[order[:, 0]]
+        idx2 = idx1 + strides[order[:, 1]]
+        idx3 = idx0 + strides.sum()
+        out = (1.0 - fsorted[:, 0:1]) * table[idx0]
+        out += (fsorted[:, 0:1] - fsorted[:, 1:2]) * table[idx1]
+        out += (fsorted[:, 1:2] - fsorted[:, 2:3]) * table[idx2]
+        out += fsorted[:, 2:3] * table[idx3]
+
+    return np.reshape(out, shape)
+
+
+def resample_lut_3d(lut, n, method="tetrahedral"):
+    """Resample a uint16 3D LUT to n points per axis."""
+    if lut.shape[0] == n:
+        return lut
+    lut = interpolate_lut_3d(lut, lattice_coordinates_3d(n), method=method)
+    lut = np.rint(lut).astype(np.uint16)
+    lut = np.clip(lut, 0, 4095)
+    return lut
+
+
+def apply_lut_1d(lut, rgb):
+    """Apply a uint16 (3, m) 1D LUT to normalized rgb values of shape (..., 3).
+
+    The LUT is in the layout of upload_1d_lut, with outputs scaled to 32767,
+    and is linearly interpolated.  The result is normalized to [0, 1].
+    """
+    lut = np.asarray(lut)
+    if lut.ndim != 2 or lut.shape[0] != 3:
+        raise ValueError(f"Expected shape (3, m) for 1D LUT, but got {lut.shape}.")
+    x = np.linspace(0.0, 1.0, lut.shape[1], dtype=np.float64)
+    out = np.empty(rgb.shape, dtype=np.float64)
+    for channel in range(3):
+        out[..., channel] = np.interp(rgb[..., channel], x, lut[channel] / 32767.0)
+    return out
+
+
+def compose_lut_3d(n=33, curve=None, matrix=None, cube=None, method="tetrahedral"):
+    """Fold a 1D curve, a 3x3 matrix and a 3D LUT into one uint16 3D LUT.
+
+    The stages are applied in that order to every point of an n point lattice
+    in one vectorized pass, and any of them may be omitted.  curve is either a
+    (3, m) 1D LUT as returned by curve_lut_1d or read_cal_file, or a function
+    of normalized rgb values.  matrix maps rgb column vectors and its output is
+    clipped to [0, 1].  cube is a 3D LUT of any size as returned by
+    read_cube_file, interpolated with method.  The result is ready for
+    upload_3d_lut.
+    """
+    rgb = lattice_coordinates_3d(n)
+    if curve is not None:
+        rgb = curve(rgb) if callable(curve) else apply_lut_1d(curve, rgb)
+    if matrix is not None:
+        matrix = np.asarray(matrix, dtype=np.float64)
+        if matrix.shape != (3, 3):
+            raise ValueError(
+                f"Expected shape (3, 3) for matrix, but got {matrix.shape}."
+            )
+        rgb = np.clip(rgb @ matrix.T, 0.0, 1.0)
+    if cube is not None:
+        if cube.shape != (cube.shape[0],) * 3 + (3,):
+            raise ValueError(
+                f"Expected shape (k, k, k, 3) for 3D LUT, but got {cube.shape}."
+            )
+        lut = interpolate_lut_3d(cube, rgb, method=method)
+    else:
+        lut = rgb * 4096.0
+    lut = np.clip(np.rint(lut), 0, 4095).astype(np.uint16)
+    return lut
@@ -0,0 +1,159 @@
+import bisect
+import collections
+
+# upper bounds in seconds of the latency histogram buckets, the last bucket
+# counts everything slower
+LATENCY_BUCKETS = (
+    0.0005,
+    0.001,
+    0.002,
+    0.005,
+    0.01,
+    0.02,
+    0.05,
+    0.1,
+    0.2,
+    0.5,
+    1.0,
+    2.0,
+    5.0,
+    10.0,
+)
+_BUCKET_LABELS = tuple(str(bound) for bound in LATENCY_BUCKETS) + ("+Inf",)
+
+
+class LatencyHistogram:
+    """Fixed bucket histogram of latencies in seconds."""
+
+    __slots__ = ("counts", "count", "errors", "total", "max")
+
+    def __init__(self):
+        self.counts = [0] * (len(LATENCY_BUCKETS) + 1)
+        self.count = 0
+        self.errors = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def observe(self, latency, error=False):
+        self.counts[bisect.bisect_left(LATENCY_BUCKETS, latency)] += 1
+        self.count += 1
+        self.total += latency
+        if latency > self.max:
+            self.max = latency
+        if error:
+            self.errors += 1
+
+    def quantile(self, q):
+        """Return the upper bound of the bucket containing quantile q, at most the max."""
+        if not self.count:
+            return None
+        rank = q * self.count
+        seen = 0
+        for bound, count in zip(LATENCY_BUCKETS, self.counts):
+            seen += count
+            if seen >= rank:
+                return min(bound, self.max)
+        return self.max
+
+    def snapshot(self):
+        return {
+            "count": self.count,
+            "errors": self.errors,
+            "mean": self.total / self.count if self.count else None,
+            "p50": self.quantile(0.5),
+            "p99": self.quantile(0.99),
+            "max": self.max,
+            "buckets": dict(zip(_BUCKET_LABELS, self.counts)),
+        }
+
+
+class ClientMetrics:
+    """Counters and latency histograms of a WebOsClient.
+
+    Request latencies are kept per uri from send to response.  Connect phases
+    are the time taken to open the websocket, to register, to open the input
+    socket and to fetch the initial state, for the last connection and
+    accumulated as histograms.  One instance may be shared by several clients
+    to aggregate them.  snapshot() returns a plain dict which can be exported as
+    is.
+    """
+
+    def __init__(self):
+        self.requests = collections.defaultdict(LatencyHistogram)
+        self.connect_phases = collections.defaultdict(LatencyHistogram)
+        self.last_connect = {}
+        self.connects = 0
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.requests_expired = 0
+        self.subscriptions = 0
+        self.messages_sent = 0
+        self.messages_received = 0
+        self.messages_dropped = 0
+        self.bytes_sent = 0
+        self.bytes_received = 0
+        self.input_messages_sent = 0
+        self.input_bytes_sent = 0
+        self.max_callback_queue_depth = 0
+        self.callback_queues = []
+
+    def request_started(self):
+        self.in_flight += 1
+        if self.in_flight > self.max_in_flight:
+            self.max_in_flight = self.in_flight
+
+    def request_finished(self, uri, latency, error=False):
+        self.in_flight -= 1
+        self.requests[uri].observe(latency, error)
+
+    def message_sent(self, raw_msg):
+        self.messages_sent += 1
+        self.bytes_sent += len(raw_msg)
+
+    def message_received(self, raw_msg):
+        self.messages_received += 1
+        self.bytes_received += len(raw_msg)
+
+    def input_message_sent(self, message):
+        self.input_messages_sent += 1
+        self.input_bytes_sent += len(message)
+
+    def callback_queued(self, queue):
+        depth = queue.qsize()
+        if depth > self.max_callback_queue_depth:
+            self.max_callback_queue_depth = depth
+
+    def connect_phase(self, phase, duration):
+        self.last_connect[phase] = duration
+        self.connect_phases[phase].observe(duration)
+
+    def callback_queue_depth(self):
+        return sum(
+            queue.qsize()
+            for queues in self.callback_queues
+            for queue in queues.values()
+        )
+
+    def snapshot(self):
+        """Return the current metrics as a dict of plain values."""
+        return {
+            "requests": {uri: hist.snapshot() for uri, hist in self.requests.items()},
+            "in_flight": self.in_flight,
+            "max_in_flight": self.max_in_flight,
+            "requests_expired": self.requests_expired,
+            "subscriptions": self.subscriptions,
+            "messages_sent": self.messages_sent,
+            "messages_received": self.messages_received,
+            "messages_dropped": self.messages_dropped,
+            "bytes_sent": self.bytes_sent,
+            "bytes_received": self.bytes_received,
+            "input_messages_sent": self.input_messages_sent,
+            "input_bytes_sent": self.input_bytes_sent,
+            "callback_queue_depth": self.callback_queue_depth(),
+            "max_callback_queue_depth": self.max_callback_queue_depth,
+            "connects": self.connects,
+            "last_connect": dict(self.last_connect),
+            "connect_phases": {
+                phase: hist.snapshot() for phase, hist in self.connect_phases.items()
+            },
+        }
@@ -0,0 +1,125 @@
+import asyncio
+import logging
+
+from websockets.exceptions import ConnectionClosed
+
+from .webos_client import PyLGTVCmdException
+
+logger = logging.getLogger(__name__)
+
+
+class PointerChannel:
+    """Coalescing pointer input for high rate move and scroll events.
+
+    Events are queued without waiting for the socket.  While waiting to be sent,
+    consecutive moves with the same down state and consecutive scrolls are
+    merged by summing their deltas, while clicks and changes of the down state
+    keep their position in the sequence.  Pending events are sent at most
+    frame_rate times per second, and only once the socket has accepted the
+    previous frame.  Events which can't be sent because the input connection is
+    closed are counted as dropped.
+    """
+
+    def __init__(self, client, frame_rate=60):
+        self.client = client
+        self.frame_interval = 1.0 / frame_rate if frame_rate else 0.0
+        self.events_received = 0
+        self.frames_sent = 0
+        self.frames_dropped = 0
+        self._pending = []
+        self._wakeup = None
+        self._idle = None
+        self._task = None
+
+    def _add(self, kind, dx=0, dy=0, down=0):
+        self.events_received += 1
+        if self._pending and kind in ("move", "scroll"):
+            last = self._pending[-1]
+            if last[0] == kind and last[3] == down:
+                last[1] += dx
+                last[2] += dy
+                return
+        self._pending.append([kind, dx, dy, down])
+
+        if self._task is None or self._task.done():
+            self._wakeup = asyncio.Event()
+            self._idle = asyncio.Event()
+            self._task = asyncio.create_task(self.sender_handler())
+        self._idle.clear()
+        self._wakeup.set()
+
+    async def move(self, dx, dy, down=0):
+        """Queue a cursor move."""
+        self._add("move", dx, dy, down)
+
+    async def scroll(self, dx, dy):
+        """Queue a scroll."""
+        self._add("scroll", dx, dy)
+
+    async def click(self):
+        """Queue a cursor click."""
+        self._add("click")
+
+    @staticmethod
+    def _step(event):
+        kind, dx, dy, down = event
+        if kind == "move":
+            return ("move", dx, dy, down)
+        elif kind == "scroll":
+            return ("scroll", dx, dy)
+        return (kind,)
+
+    async def sender_handler(self):
+        loop = asyncio.get_running_loop()
+        next_frame = loop.time()
+        try:
+            while True:
+                await self._wakeup.wait()
+                delay = next_frame - loop.time()
+                if delay > 0:
+                    await asyncio.sleep(delay)
+                self._wakeup.clear()
+
+                pending, self._pending = self._pending, []
+                for event in pending:
+                    message = self.client.input_message(self._step(event))
+                    try:
+                        await self.client.input_command(message)
+                    except (PyLGTVCmdException, ConnectionClosed) as ex:
+                        self.frames_dropped += 1
+                        logger.debug(
+                            "dropping pointer event for %s: %r", self.client.ip, ex
+                        )
+                    else:
+                        self.frames_sent += 1
+                next_frame = loop.time() + self.frame_interval
+
+                if not self._pending:
+                    self._idle.set()
+        finally:
+            # never leave flush() waiting on a sender which stopped
+            self._idle.set()
+
+    async def flush(self):
+        """Wait until all queued events have been sent."""
+        if self._idle is not None and self._task is not None and not self._task.done():
+            await self._idle.wait()
+
+    async def close(self):
+        """Send all queued events and stop the sender."""
+        await self.flush()
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    def stats(self):
+        return {
+            "events_received": self.events_received,
+            "frames_sent": self.frames_sent,
+            "frames_dropped": self.frames_dropped,
+            "pending": len(self._pending),
+        }
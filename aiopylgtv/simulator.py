@@ -0,0 +1,223 @@
+import asyncio
+import copy
+import json
+import uuid
+
+import websockets
+
+from . import endpoints as ep
+
+SSAP_PREFIX = "ssap://"
+INPUT_SOCKET_PATH = "/resources/simulator/netinput.pointer.sock"
+
+DEFAULT_RESPONSES = {
+    ep.GET_SYSTEM_INFO: {
+        "features": {"3d": False, "dvr": True},
+        "receiverType": "atsc",
+        "modelName": "OLED65C9PUA",
+        "programMode": False,
+    },
+    ep.GET_SOFTWARE_INFO: {
+        "product_name": "webOSTV 4.5",
+        "model_name": "HE_DTV_W19H_AFADABAA",
+        "sw_type": "FIRMWARE",
+        "major_ver": "05",
+        "minor_ver": "00.20",
+        "country": "US",
+        "device_id": "00:00:00:00:00:00",
+    },
+    ep.GET_POWER_STATE: {"state": "Active"},
+    ep.GET_CURRENT_APP_INFO: {
+        "appId": "com.webos.app.hdmi1",
+        "windowId": "",
+        "processId": "",
+    },
+    ep.GET_AUDIO_STATUS: {"scenario": "mastervolume_tv_speaker", "mute": False},
+    ep.GET_VOLUME: {
+        "scenario": "mastervolume_tv_speaker",
+        "volume": 10,
+        "muted": False,
+    },
+    ep.GET_APPS: {
+        "launchPoints": [
+            {"id": "com.webos.app.livetv", "title": "Live TV"},
+            {"id": "com.webos.app.hdmi1", "title": "HDMI 1"},
+            {"id": "netflix", "title": "Netflix"},
+            {"id": "youtube.leanback.v4", "title": "YouTube"},
+        ]
+    },
+    ep.GET_INPUTS: {
+        "devices": [
+            {"id": "HDMI_1", "label": "HDMI 1", "appId": "com.webos.app.hdmi1"},
+            {"id": "HDMI_2", "label": "HDMI 2", "appId": "com.webos.app.hdmi2"},
+        ]
+    },
+    ep.GET_SOUND_OUTPUT: {"soundOutput": "tv_speaker"},
+    ep.GET_TV_CHANNELS: {
+        "channelList": [
+            {"channelId": "1_2_1_0_0_0_0", "channelNumber": "2-1", "channelName": "A"},
+            {"channelId": "1_4_1_0_0_0_0", "channelNumber": "4-1", "channelName": "B"},
+        ]
+    },
+}
+
+
+class WebOsSimulator:
+    """Minimal SSAP server that a WebOsClient can connect and pair to.
+
+    Every request is answered with the payload registered for its uri (or a bare
+    success response), optionally after response_delay seconds.  Subscriptions
+    receive an initial response and, if push_interval is set, the current
+    payload again every push_interval seconds.
+    """
+
+    def __init__(
+        self,
+        host="127.0.0.1",
+        port=3000,
+        response_delay=0.0,
+        push_interval=None,
+        responses=None,
+    ):
+        self.host = host
+        self.port = port
+        self.response_delay = response_delay
+        self.push_interval = push_interval
+        self.responses = copy.deepcopy(DEFAULT_RESPONSES)
+        if responses is not None:
+            self.responses.update(responses)
+        self.client_keys = set()
+        self.subscriptions = {}
+        self.requests_served = 0
+        self.input_messages = []
+        self.server = None
+        self.push_task = None
+
+    async def start(self):
+        self.server = await websockets.serve(
+            self.handler, self.host, self.port, ping_interval=None
+        )
+        if not self.port:
+            self.port = self.server.sockets[0].getsockname()[1]
+        if self.push_interval is not None:
+            self.push_task = asyncio.create_task(self.push_handler())
+
+    async def stop(self):
+        if self.push_task is not None:
+            self.push_task.cancel()
+            try:
+                await self.push_task
+            except asyncio.CancelledError:
+                pass
+            self.push_task = None
+        if self.server is not None:
+            self.server.close()
+            await self.server.wait_closed()
+            self.server = None
+
+    async def __aenter__(self):
+        await self.start()
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.stop()
+
+    async def handler(self, ws, path):
+        try:
+            if path == INPUT_SOCKET_PATH:
+                await self.input_handler(ws)
+            else:
+                await self.ssap_handler(ws)
+        except websockets.exceptions.ConnectionClosed:
+            pass
+        finally:
+            for subscribers in self.subscriptions.values():
+                subscribers.pop(ws, None)
+
+    async def input_handler(self, ws):
+        async for raw_msg in ws:
+            self.input_messages.append(raw_msg)
+
+    async def ssap_handler(self, ws):
+        async for raw_msg in ws:
+            msg = json.loads(raw_msg)
+            if msg.get("type") == "register":
+                await self.register(ws, msg)
+            elif self.response_delay:
+                asyncio.create_task(self.delayed_respond(ws, msg))
+            else:
+                await self.respond(ws, msg)
+
+    async def register(self, ws, msg):
+        uid = msg.get("id")
+        client_key = msg.get("payload", {}).get("client-key")
+        if client_key not in self.client_keys:
+            # emulate the pairing prompt being accepted on the tv
+            client_key = uuid.uuid4().hex
+            self.client_keys.add(client_key)
+            await ws.send(
+                json.dumps(
+                    {
+                        "type": "response",
+                        "id": uid,
+                        "payload": {"pairingType": "PROMPT", "returnValue": True},
+                    }
+                )
+            )
+        await ws.send(
+            json.dumps(
+                {"type": "registered", "id": uid, "payload": {"client-key": client_key}}
+            )
+        )
+
+    async def delayed_respond(self, ws, msg):
+        await asyncio.sleep(self.response_delay)
+        try:
+            await self.respond(ws, msg)
+        except websockets.exceptions.ConnectionClosed:
+            pass
+
+    async def respond(self, ws, msg):
+        uid = msg.get("id")
+        uri = msg.get("uri", "")
+        if uri.startswith(SSAP_PREFIX):
+            uri = uri[len(SSAP_PREFIX) :]
+
+        if uri == ep.INPUT_SOCKET:
+            host, port = ws.local_address[:2]
+            payload = {
+                "socketPath": f"ws://{host}:{port}{INPUT_SOCKET_PATH}",
+                "returnValue": True,
+            }
+        else:
+            payload = dict(self.responses.get(uri, {}))
+            payload["returnValue"] = True
+
+        if msg.get("type") == "subscribe":
+            payload["subscribed"] = True
+            self.subscriptions.setdefault(uri, {}).setdefault(ws, set()).add(uid)
+
+        self.requests_served += 1
+        await ws.send(json.dumps({"type": "response", "id": uid, "payload": payload}))
+
+    async def push(self, uri, payload=None):
+        """Update the payload for uri and send it to all subscribers."""
+        if payload is not None:
+            self.responses[uri] = payload
+        payload = dict(self.responses.get(uri, {}))
+        payload["returnValue"] = True
+        payload["subscribed"] = True
+
+        sends = []
+        for ws, uids in list(self.subscriptions.get(uri, {}).items()):
+            for uid in uids:
+                msg = json.dumps({"type": "response", "id": uid, "payload": payload})
+                sends.append(ws.send(msg))
+        if sends:
+            await asyncio.gather(*sends, return_exceptions=True)
+
+    async def push_handler(self):
+        while True:
+            await asyncio.sleep(self.push_interval)
+            for uri in list(self.subscriptions):
+                await self.push(uri)
@@ -1,7 +1,18 @@
 import argparse
 import asyncio
+import json
+import shlex
+import sys
 
 from aiopylgtv import WebOsClient
+from aiopylgtv.daemon import (
+    call_client_method,
+    daemon_listening,
+    encode_result,
+    iter_responses,
+    open_daemon_connection,
+    send_commands,
+)
 
 
 async def runloop(client, command, parameters):
@@ -10,6 +21,187 @@ async def runloop(client, command, parameters):
     await client.disconnect()
 
 
+async def run_via_daemon(socket_path, host, command, parameters):
+    """Run a command through a running daemon, returning False if there is none."""
+    request = {"host": host, "command": command, "parameters": parameters}
+    responses = await send_commands([request], socket_path)
+    if responses is None:
+        return False
+    response = responses[0]
+    if "error" in response:
+        print(f"{response['exception']}: {response['error']}", file=sys.stderr)
+        sys.exit(1)
+    print(response["result"])
+    return True
+
+
+def read_batch(lines):
+    """Return (line number, command, parameters) for each command in lines.
+
+    Each line holds a command and its parameters separated by whitespace, with
+    shell-like quoting.  Empty lines and lines starting with # are skipped.
+    Lines which can't be split, such as lines with unbalanced quotes, give
+    (line number, None, the ValueError) and are reported as failed commands.
+    """
+    commands = []
+    for lineno, line in enumerate(lines, 1):
+        try:
+            words = shlex.split(line, comments=True)
+        except ValueError as ex:
+            commands.append((lineno, None, ex))
+            continue
+        if words:
+            commands.append((lineno, words[0], words[1:]))
+    return commands
+
+
+def error_response(ex):
+    return {"error": str(ex), "exception": type(ex).__name__}
+
+
+def write_output(lineno, command, response):
+    """Print the json line of a batch result, returning whether it failed."""
+    output = {"line": lineno, "command": command}
+    output.update(response)
+    sys.stdout.write(encode_result(output))
+    sys.stdout.flush()
+    return "error" in output
+
+
+def report_failed(commands, ex):
+    """Report every command as failed with ex, returning the number of commands."""
+    for lineno, command, parameters in commands:
+        write_output(
+            lineno, command, error_response(parameters if command is None else ex)
+        )
+    return len(commands)
+
+
+async def run_daemon_worker(host, commands, socket_path=None):
+    """Run commands taken from the shared iterator commands one at a time over a daemon connection.
+
+    Returns the number of failed commands.
+    """
+    connection = await open_daemon_connection(socket_path)
+    lost = None
+    if connection is None:
+        lost = ConnectionRefusedError("No daemon is listening.")
+    failures = 0
+    try:
+        for lineno, command, parameters in commands:
+            if command is None:
+                response = error_response(parameters)
+            elif lost is not None:
+                response = error_response(lost)
+            else:
+                request = {"host": host, "command": command, "parameters": parameters}
+                reader, writer = connection
+                try:
+                    writer.write(encode_result(request).encode())
+                    await writer.drain()
+                    line = await reader.readline()
+                    if not line:
+                        raise ConnectionError("Daemon closed the connection.")
+                    response = json.loads(line)
+                except OSError as ex:
+                    lost = ex
+                    response = error_response(ex)
+            failures += write_output(lineno, command, response)
+    finally:
+        if connection is not None:
+            connection[1].close()
+    return failures
+
+
+async def run_daemon_batch(host, commands, socket_path=None, concurrency=1):
+    """Run batch commands through a daemon.
+
+    With concurrency 1 the commands are pipelined over one connection, which
+    the daemon serves in order, so results are printed in order.  With
+    concurrency above 1, that many connections each run one command at a time,
+    and results are printed as they complete.  If the connection to the daemon
+    is lost, the remaining commands are reported as failed.  Returns the number
+    of failed commands.
+    """
+    if concurrency > 1:
+        remaining = iter(commands)
+        workers = min(concurrency, len(commands))
+        failures = await asyncio.gather(
+            *(run_daemon_worker(host, remaining, socket_path) for _ in range(workers))
+        )
+        return sum(failures)
+
+    requests = [
+        {"id": lineno, "host": host, "command": command, "parameters": parameters}
+        for lineno, command, parameters in commands
+        if command is not None
+    ]
+    responses = iter_responses(requests, socket_path)
+    lost = None
+    failures = 0
+    try:
+        for lineno, command, parameters in commands:
+            if command is None:
+                response = error_response(parameters)
+            else:
+                if lost is None:
+                    try:
+                        response = await responses.__anext__()
+                        response.pop("id", None)
+                    except OSError as ex:
+                        lost = ex
+                if lost is not None:
+                    response = error_response(lost)
+            failures += write_output(lineno, command, response)
+    finally:
+        await responses.aclose()
+    return failures
+
+
+async def run_batch(host, commands, concurrency=1, socket_path=None, use_daemon=True):
+    """Run batch commands, printing a json line per result.
+
+    Through a running daemon see run_daemon_batch().  Otherwise the commands
+    run over one connection to the tv, and with concurrency above 1, up to that
+    many commands run at the same time and results are printed as they
+    complete.  If the tv can't be connected to, every command is reported as
+    failed.  Returns the number of failed commands.
+    """
+    if use_daemon and await daemon_listening(socket_path):
+        return await run_daemon_batch(host, commands, socket_path, concurrency)
+
+    client = WebOsClient(host, timeout_connect=2)
+    try:
+        await client.connect()
+    except Exception as ex:
+        return report_failed(commands, ex)
+
+    semaphore = asyncio.Semaphore(max(concurrency, 1))
+    failures = 0
+
+    async def run(lineno, command, parameters):
+        nonlocal failures
+        async with semaphore:
+            try:
+                if command is None:
+                    raise parameters
+                result = await call_client_method(client, command, parameters)
+                response = {"result": result}
+            except Exception as ex:
+                response = error_response(ex)
+        failures += write_output(lineno, command, response)
+
+    try:
+        if concurrency > 1:
+            await asyncio.gather(*(run(*command) for command in commands))
+        else:
+            for command in commands:
+                await run(*command)
+    finally:
+        await client.disconnect()
+    return failures
+
+
 def aiopylgtvcommand():
     parser = argparse.ArgumentParser(description="Send command to LG WebOs TV.")
     parser.add_argument(
@@ -18,6 +210,7 @@ def aiopylgtvcommand():
     parser.add_argument(
         "command",
         type=str,
+        nargs="?",
         help="command to send to the TV (can be any function of WebOsClient)",
     )
     parser.add_argument(
@@ -26,11 +219,56 @@ def aiopylgtvcommand():
         nargs="*",
         help="additional parameters to be passed to WebOsClient function call",
     )
+    parser.add_argument(
+        "--batch",
+        type=str,
+        default=None,
+        metavar="FILE",
+        help="run the commands in FILE, one per line, or from stdin if FILE is -, printing results as json lines",
+    )
+    parser.add_argument(
+        "--concurrency",
+        type=int,
+        default=1,
+        help="number of batch commands to run at the same time",
+    )
+    parser.add_argument(
+        "--socket",
+        type=str,
+        default=None,
+        help="Unix socket of a running aiopylgtvdaemon to send the command through",
+    )
+    parser.add_argument(
+        "--no-daemon",
+        action="store_true",
+        help="always connect to the TV directly instead of through aiopylgtvdaemon",
+    )
 
     args = parser.parse_args()
 
+    if args.batch is not None:
+        if args.command is not None:
+            parser.error("a command can't be combined with --batch")
+        if args.batch == "-":
+            commands = read_batch(sys.stdin)
+        else:
+            with open(args.batch) as f:
+                commands = read_batch(f)
+        failures = asyncio.run(
+            run_batch(
+                args.host, commands, args.concurrency, args.socket, not args.no_daemon
+            )
+        )
+        sys.exit(1 if failures else 0)
+
+    if args.command is None:
+        parser.error("the command argument is required without --batch")
+
+    if not args.no_daemon and asyncio.run(
+        run_via_daemon(args.socket, args.host, args.command, args.parameters)
+    ):
+        return
+
     client = WebOsClient(args.host, timeout_connect=2)
 
-    asyncio.get_event_loop().run_until_complete(
-        runloop(client, args.command, args.parameters)
-    )
+    asyncio.run(runloop(client, args.command, args.parameters))
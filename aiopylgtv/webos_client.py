@@ -1,25 +1,54 @@
 import asyncio
 import base64
+import contextvars
 import copy
-import json
+import functools
 import logging
 import os
+import random
+import time
 
-import numpy as np
 import websockets
 
 from . import buttons as btn
 from . import cal_commands as cal
 from . import endpoints as ep
-from .constants import CALIBRATION_TYPE_MAP, DEFAULT_CAL_DATA
+from .cal_encoding import (
+    cached_unity_lut_1d,
+    cached_unity_lut_3d,
+    default_payload_cache,
+    encode_values,
+    encoded_unity_lut_1d,
+    encoded_unity_lut_3d,
+)
+from .calibration import CalibrationTransaction, recording_transaction
+from .capabilities import calibration_support
+from .channels import ChannelTable
+from .constants import (
+    CALIBRATION_TYPE_MAP,
+    CHANNEL_FIELDS,
+    CONNECTION_BACKOFF,
+    CONNECTION_CONNECTED,
+    CONNECTION_CONNECTING,
+    CONNECTION_DISCONNECTED,
+    DEFAULT_CAL_VALUES,
+    IDENTITY_3BY3_VALUES,
+    STATE_FIELDS,
+    STATIC_FIELDS,
+)
+from .deadlines import DeadlineQueue
 from .handshake import REGISTRATION_MESSAGE
-from .lut_tools import read_cal_file, read_cube_file, unity_lut_1d, unity_lut_3d
+from .json_backend import NO_ID, get_backend, peek_message_id
+from .key_store import KeyStore, default_key_file_path
+from .metrics import ClientMetrics
 
 logger = logging.getLogger(__name__)
 
-
-KEY_FILE_NAME = ".aiopylgtv"
-USER_HOME = "HOME"
+# set while running the client's own connection and state handling, so that
+# only subscriptions made by users are replayed after a reconnect
+_internal_subscription = contextvars.ContextVar(
+    "aiopylgtv_internal_subscription", default=False
+)
 
 
 class PyLGTVPairException(Exception):
@@ -40,11 +69,38 @@ class WebOsClient:
         timeout_connect=2,
         ping_interval=20,
         standby_connection=False,
+        port=3000,
+        lut_cache=None,
+        key_store=None,
+        state_update_interval=0.0,
+        json_backend=None,
+        auto_reconnect=False,
+        reconnect_min_delay=1.0,
+        reconnect_max_delay=60.0,
+        subscriptions=None,
+        lazy_subscriptions=True,
+        metrics=None,
+        request_timeout=None,
     ):
         """Initialize the client."""
+        if subscriptions is None:
+            subscriptions = STATE_FIELDS
+        subscriptions = frozenset(subscriptions)
+        if not subscriptions <= STATE_FIELDS:
+            raise ValueError(
+                f"Unknown state fields {sorted(subscriptions - STATE_FIELDS)}, valid fields are {sorted(STATE_FIELDS)}."
+            )
         self.ip = ip
-        self.port = 3000
+        self.port = port
+        if metrics is True:
+            metrics = ClientMetrics()
+        self.metrics = metrics or None
+        self.request_timeout = request_timeout
+        self.deadlines = DeadlineQueue()
+        self.lut_cache = lut_cache
         self.key_file_path = key_file_path
+        self.key_store = key_store
+        self.json_loads, self.json_dumps = get_backend(json_backend)
         self.client_key = None
         self.web_socket = None
         self.command_count = 0
@@ -53,6 +109,24 @@ class WebOsClient:
         self.standby_connection = standby_connection
         self.connect_task = None
         self.connect_result = None
+        self.auto_reconnect = auto_reconnect
+        self.reconnect_min_delay = reconnect_min_delay
+        self.reconnect_max_delay = reconnect_max_delay
+        self.supervisor_task = None
+        self.connection_state = CONNECTION_DISCONNECTED
+        self.connection_state_callbacks = []
+        self.user_subscriptions = {}
+        self.reconnect_stats = {
+            "attempts": 0,
+            "failures": 0,
+            "reconnects": 0,
+            "last_latency": None,
+            "min_latency": None,
+            "max_latency": None,
+            "total_latency": 0.0,
+        }
+        self._connect_waiters = []
+        self._reconnect_now = None
         self.connection = None
         self.input_connection = None
         self.callbacks = {}
@@ -63,80 +137,69 @@ class WebOsClient:
         self._volume = None
         self._current_channel = None
         self._channel_info = None
-        self._channels = None
+        self.channel_table = ChannelTable()
+        self._channel_list_subscribed = False
         self._apps = {}
         self._extinputs = {}
         self._system_info = None
         self._software_info = None
         self._sound_output = None
+        self._calibration_support = None
         self.state_update_callbacks = []
+        self.state_update_fields = {}
+        self.catalog_callbacks = []
+        self.state_update_interval = state_update_interval
+        self._changed_state = set()
+        self._state_update_task = None
         self.doStateUpdate = False
+        self.subscriptions = subscriptions
+        self.lazy_subscriptions = lazy_subscriptions
+        self._requested_fields = set()
+        self._subscribed_fields = set()
+        self._lazy_subscribe_tasks = {}
 
         self.load_key_file()
 
     @staticmethod
     def _get_key_file_path():
         """Return the key file path."""
-        if os.getenv(USER_HOME) is not None and os.access(
-            os.getenv(USER_HOME), os.W_OK
-        ):
-            return os.path.join(os.getenv(USER_HOME), KEY_FILE_NAME)
-
-        return os.path.join(os.getcwd(), KEY_FILE_NAME)
+        return default_key_file_path()
 
     def load_key_file(self):
         """Try to load the client key for the current ip."""
-        self.client_key = None
-        if self.key_file_path:
-            key_file_path = self.key_file_path
-        else:
-            key_file_path = self._get_key_file_path()
-        key_dict = {}
-
-        logger.debug("load keyfile from %s", key_file_path)
-
-        if os.path.isfile(key_file_path):
-            with open(key_file_path, "r") as f:
-                raw_data = f.read()
-                if raw_data:
-                    key_dict = json.loads(raw_data)
-
-        logger.debug("getting client_key for %s from %s", self.ip, key_file_path)
-        if self.ip in key_dict:
-            self.client_key = key_dict[self.ip]
+        if self.key_store is None:
+            self.key_store = KeyStore.shared(self.key_file_path)
+        logger.debug("getting client_key for %s from %s", self.ip, self.key_store.path)
+        self.client_key = self.key_store.get(self.ip)
 
     def save_key_file(self):
         """Save the current client key."""
         if self.client_key is None:
             return
 
-        if self.key_file_path:
-            key_file_path = self.key_file_path
-        else:
-            key_file_path = self._get_key_file_path()
-
-        logger.debug("save keyfile to %s", key_file_path)
-
-        if os.path.isfile(key_file_path):
-            with open(key_file_path, "r+") as f:
-                raw_data = f.read()
-                f.seek(0)
-                f.truncate()
-                key_dict = {}
-
-                if raw_data:
-                    key_dict = json.loads(raw_data)
-
-                key_dict[self.ip] = self.client_key
-
-                f.write(json.dumps(key_dict))
-        else:
-            with open(key_file_path, "w") as f:
-                key_dict = {}
-                key_dict[self.ip] = self.client_key
-                f.write(json.dumps(key_dict))
+        self.key_store.set(self.ip, self.client_key)
 
     async def connect(self):
+        """Connect to the tv.
+
+        With auto_reconnect the connection is supervised: this returns or raises
+        the outcome of the next connection attempt, and the supervisor keeps
+        reconnecting with jittered exponential backoff until disconnect() is
+        called, replaying subscriptions made through subscribe().
+        """
+        if self.auto_reconnect:
+            if self.supervisor_task is None or self.supervisor_task.done():
+                self._reconnect_now = asyncio.Event()
+                self.supervisor_task = asyncio.create_task(self.supervisor_handler())
+            elif self.is_connected():
+                return await self.connect_result
+            else:
+                # skip the remaining backoff delay
+                self._reconnect_now.set()
+            waiter = asyncio.Future()
+            self._connect_waiters.append(waiter)
+            return await waiter
+
         if not self.is_connected():
             self.connect_result = asyncio.Future()
             self.connect_task = asyncio.create_task(
@@ -145,6 +208,18 @@ class WebOsClient:
         return await self.connect_result
 
     async def disconnect(self):
+        if self.supervisor_task is not None:
+            self.supervisor_task.cancel()
+            try:
+                await self.supervisor_task
+            except asyncio.CancelledError:
+                pass
+            self.supervisor_task = None
+            self.user_subscriptions = {}
+        await self.close_connection()
+
+    async def close_connection(self):
+        """Close the current connection, leaving any reconnect supervisor running."""
         if self.is_connected():
             self.connect_task.cancel()
             try:
@@ -152,6 +227,111 @@ class WebOsClient:
             except asyncio.CancelledError:
                 pass
 
+    def register_connection_state_callback(self, callback):
+        """Register a function called with the new connection state on every transition."""
+        self.connection_state_callbacks.append(callback)
+
+    def unregister_connection_state_callback(self, callback):
+        if callback in self.connection_state_callbacks:
+            self.connection_state_callbacks.remove(callback)
+
+    def set_connection_state(self, state):
+        if state == self.connection_state:
+            return
+        logger.debug("connection to %s is %s", self.ip, state)
+        self.connection_state = state
+        for callback in self.connection_state_callbacks:
+            try:
+                callback(state)
+            except Exception:
+                logger.exception("error in connection state callback for %s", self.ip)
+
+    def reconnect_delay(self, failures):
+        """Return the jittered exponential backoff delay after failures failed attempts."""
+        # failures keeps growing while the tv is unreachable, bound the exponent
+        # so that the delay stays a float
+        exponent = min(max(failures, 0), 32)
+        delay = min(self.reconnect_max_delay, self.reconnect_min_delay * 2 ** exponent)
+        return delay / 2.0 + random.uniform(0.0, delay / 2.0)
+
+    def _resolve_connect_waiters(self, exception=None):
+        waiters, self._connect_waiters = self._connect_waiters, []
+        for waiter in waiters:
+            if waiter.done():
+                continue
+            if exception is None:
+                waiter.set_result(True)
+            else:
+                waiter.set_exception(exception)
+
+    async def supervisor_handler(self):
+        loop = asyncio.get_running_loop()
+        failures = 0
+        dropped_at = None
+        try:
+            while True:
+                self._reconnect_now.clear()
+                self.reconnect_stats["attempts"] += 1
+                self.connect_result = asyncio.Future()
+                self.connect_task = asyncio.create_task(
+                    self.connect_handler(self.connect_result)
+                )
+                await asyncio.wait(
+                    {self.connect_result, self.connect_task},
+                    return_when=asyncio.FIRST_COMPLETED,
+                )
+                if self.connect_result.done() and not self.connect_result.cancelled():
+                    exception = self.connect_result.exception()
+                else:
+                    exception = PyLGTVCmdException("Connection attempt aborted.")
+
+                if exception is None:
+                    failures = 0
+                    if dropped_at is not None:
+                        self._record_reconnect(loop.time() - dropped_at)
+                    self._resolve_connect_waiters()
+                    await asyncio.wait({self.connect_task})
+                    dropped_at = loop.time()
+                    delay = self.reconnect_delay(0)
+                else:
+                    self.reconnect_stats["failures"] += 1
+                    logger.debug("connecting to %s failed: %r", self.ip, exception)
+                    self._resolve_connect_waiters(exception)
+                    if dropped_at is None:
+                        dropped_at = loop.time()
+                    delay = self.reconnect_delay(failures)
+                    failures += 1
+
+                self.set_connection_state(CONNECTION_BACKOFF)
+                try:
+                    await asyncio.wait_for(self._reconnect_now.wait(), timeout=delay)
+                except asyncio.TimeoutError:
+                    pass
+        finally:
+            self._resolve_connect_waiters(
+                PyLGTVCmdException("Connection supervisor stopped.")
+            )
+            if not self.is_connected():
+                self.set_connection_state(CONNECTION_DISCONNECTED)
+
+    def _record_reconnect(self, latency):
+        stats = self.reconnect_stats
+        stats["reconnects"] += 1
+        stats["last_latency"] = latency
+        stats["total_latency"] += latency
+        if stats["min_latency"] is None or latency < stats["min_latency"]:
+            stats["min_latency"] = latency
+        if stats["max_latency"] is None or latency > stats["max_latency"]:
+            stats["max_latency"] = latency
+
+    def reconnect_statistics(self):
+        """Return reconnect counters and latencies in seconds, from drop to ready."""
+        stats = dict(self.reconnect_stats)
+        stats["mean_latency"] = None
+        if stats["reconnects"]:
+            stats["mean_latency"] = stats["total_latency"] / stats["reconnects"]
+        return stats
+
     def is_registered(self):
         """Paired with the tv."""
         return self.client_key is not None
@@ -166,9 +346,14 @@ class WebOsClient:
 
     async def connect_handler(self, res):
 
+        _internal_subscription.set(True)
+        self.set_connection_state(CONNECTION_CONNECTING)
         handler_tasks = set()
         ws = None
         inputws = None
+        metrics = self.metrics
+        if metrics is not None:
+            phase_start = time.perf_counter()
         try:
             ws = await asyncio.wait_for(
                 websockets.connect(
@@ -178,22 +363,26 @@ class WebOsClient:
                 ),
                 timeout=self.timeout_connect,
             )
-            await ws.send(json.dumps(self.registration_msg()))
+            if metrics is not None:
+                phase_start = self._connect_phase_done("websocket", phase_start)
+            await ws.send(self.json_dumps(self.registration_msg()))
             raw_response = await ws.recv()
-            response = json.loads(raw_response)
+            response = self.json_loads(raw_response)
 
             if (
                 response["type"] == "response"
                 and response["payload"]["pairingType"] == "PROMPT"
             ):
                 raw_response = await ws.recv()
-                response = json.loads(raw_response)
+                response = self.json_loads(raw_response)
                 if response["type"] == "registered":
                     self.client_key = response["payload"]["client-key"]
                     self.save_key_file()
 
             if not self.client_key:
                 raise PyLGTVPairException("Unable to pair")
+            if metrics is not None:
+                phase_start = self._connect_phase_done("register", phase_start)
 
             self.callbacks = {}
             self.futures = {}
@@ -229,28 +418,28 @@ class WebOsClient:
                     asyncio.create_task(self.ping_handler(inputws, self.ping_interval))
                 )
             self.input_connection = inputws
+            if metrics is not None:
+                phase_start = self._connect_phase_done("input_socket", phase_start)
 
             # set static state and subscribe to state updates
             # avoid partial updates during initial subscription
 
             self.doStateUpdate = False
-            self._system_info, self._software_info = await asyncio.gather(
-                self.get_system_info(), self.get_software_info()
-            )
-            await asyncio.gather(
-                self.subscribe_power_state(self.set_power_state),
-                self.subscribe_current_app(self.set_current_app_state),
-                self.subscribe_muted(self.set_muted_state),
-                self.subscribe_volume(self.set_volume_state),
-                self.subscribe_apps(self.set_apps_state),
-                self.subscribe_inputs(self.set_inputs_state),
-                self.subscribe_sound_output(self.set_sound_output_state),
-            )
+            await self.subscribe_state(*self.subscription_fields())
+            if self.auto_reconnect and self.user_subscriptions:
+                await self.replay_subscriptions()
+
             self.doStateUpdate = True
+            self._changed_state.clear()
             if self.state_update_callbacks:
                 await self.do_state_update_callbacks()
 
+            if metrics is not None:
+                self._connect_phase_done("initial_state", phase_start)
+                metrics.connects += 1
+
             res.set_result(True)
+            self.set_connection_state(CONNECTION_CONNECTED)
 
             await asyncio.wait(handler_tasks, return_when=asyncio.FIRST_COMPLETED)
 
@@ -264,6 +453,9 @@ class WebOsClient:
 
             for future in self.futures.values():
                 future.cancel()
+            self.deadlines.clear()
+            for task in self._lazy_subscribe_tasks.values():
+                task.cancel()
 
             closeout = set()
             closeout.update(handler_tasks)
@@ -275,8 +467,13 @@ class WebOsClient:
 
             self.connection = None
             self.input_connection = None
+            self.set_connection_state(CONNECTION_DISCONNECTED)
 
             self.doStateUpdate = False
+            if self._state_update_task is not None:
+                self._state_update_task.cancel()
+                self._state_update_task = None
+            self._changed_state.clear()
 
             self._power_state = None
             self._current_appId = None
@@ -284,15 +481,20 @@ class WebOsClient:
             self._volume = None
             self._current_channel = None
             self._channel_info = None
-            self._channels = None
+            self.channel_table.clear()
+            self._channel_list_subscribed = False
             self._apps = {}
             self._extinputs = {}
             self._system_info = None
             self._software_info = None
             self._sound_output = None
+            self._calibration_support = None
+            self._subscribed_fields = set()
 
             for callback in self.state_update_callbacks:
-                closeout.add(callback())
+                coro = self.state_update_call(callback, STATE_FIELDS)
+                if coro is not None:
+                    closeout.add(asyncio.create_task(coro))
 
             if closeout:
                 closeout_task = asyncio.create_task(asyncio.wait(closeout))
@@ -303,11 +505,16 @@ class WebOsClient:
                     except asyncio.CancelledError:
                         pass
 
+    def _connect_phase_done(self, phase, start):
+        now = time.perf_counter()
+        self.metrics.connect_phase(phase, now - start)
+        return now
+
     async def ping_handler(self, ws, interval=20):
         try:
             while True:
                 await asyncio.sleep(interval)
-                if self.current_appId != "" or not self.standby_connection:
+                if self._current_appId != "" or not self.standby_connection:
                     ping_waiter = await ws.ping()
                     await asyncio.wait_for(ping_waiter, timeout=self.timeout_connect)
         except (
@@ -332,11 +539,26 @@ class WebOsClient:
 
         callback_queues = {}
         callback_tasks = {}
+        metrics = self.metrics
+        if metrics is not None:
+            metrics.callback_queues.append(callback_queues)
 
         try:
             async for raw_msg in ws:
+                if metrics is not None:
+                    metrics.message_received(raw_msg)
                 if callbacks or futures:
-                    msg = json.loads(raw_msg)
+                    # drop messages nobody is waiting for before decoding them
+                    uid = peek_message_id(raw_msg)
+                    if (
+                        uid is not NO_ID
+                        and uid not in self.callbacks
+                        and uid not in self.futures
+                    ):
+                        if metrics is not None:
+                            metrics.messages_dropped += 1
+                        continue
+                    msg = self.json_loads(raw_msg)
                     uid = msg.get("id")
                     callback = self.callbacks.get(uid)
                     future = self.futures.get(uid)
@@ -348,12 +570,16 @@ class WebOsClient:
                                 self.callback_handler(queue, callback, future)
                             )
                         callback_queues[uid].put_nowait(msg)
+                        if metrics is not None:
+                            metrics.callback_queued(callback_queues[uid])
                     elif future is not None and not future.done():
                         self.futures[uid].set_result(msg)
 
         except (websockets.exceptions.ConnectionClosedError, asyncio.CancelledError):
             pass
         finally:
+            if metrics is not None:
+                metrics.callback_queues.remove(callback_queues)
             for task in callback_tasks.values():
                 if not task.done():
                     task.cancel()
@@ -364,220 +590,419 @@ class WebOsClient:
             if tasks:
                 closeout_task = asyncio.create_task(asyncio.wait(tasks))
 
-            while not closeout_task.done():
-                try:
-                    await asyncio.shield(closeout_task)
-                except asyncio.CancelledError:
-                    pass
+                while not closeout_task.done():
+                    try:
+                        await asyncio.shield(closeout_task)
+                    except asyncio.CancelledError:
+                        pass
 
     # manage state
     @property
     def power_state(self):
+        self._lazy_subscribe("power_state")
         return self._power_state
 
     @property
     def current_appId(self):
+        self._lazy_subscribe("current_appId")
         return self._current_appId
 
     @property
     def muted(self):
+        self._lazy_subscribe("muted")
         return self._muted
 
     @property
     def volume(self):
+        self._lazy_subscribe("volume")
         return self._volume
 
     @property
     def current_channel(self):
+        self._lazy_subscribe("current_channel")
         return self._current_channel
 
     @property
     def channel_info(self):
+        self._lazy_subscribe("channel_info")
         return self._channel_info
 
     @property
     def channels(self):
-        return self._channels
+        self._lazy_subscribe("channels")
+        return self.channel_table.entries
 
     @property
     def apps(self):
+        self._lazy_subscribe("apps")
         return self._apps
 
     @property
     def inputs(self):
+        self._lazy_subscribe("inputs")
         return self._extinputs
 
     @property
     def system_info(self):
+        self._lazy_subscribe("system_info")
         return self._system_info
 
     @property
     def software_info(self):
+        self._lazy_subscribe("software_info")
         return self._software_info
 
     @property
     def sound_output(self):
+        self._lazy_subscribe("sound_output")
         return self._sound_output
 
+    def subscription_fields(self):
+        """Return the state fields which are kept up to date on every connection."""
+        fields = self.subscriptions | self._requested_fields
+        if fields & CHANNEL_FIELDS:
+            # channel subscriptions are managed on current app changes
+            fields = fields | {"current_appId"}
+        return fields
+
+    async def subscribe_state(self, *fields):
+        """Fetch or subscribe to the given state fields, unless already done.
+
+        The fields are also subscribed to on later connections.  Channel fields
+        are subscribed to when available, which depends on the current app.
+        """
+        fields = set(fields)
+        if not fields <= STATE_FIELDS:
+            raise ValueError(
+                f"Unknown state fields {sorted(fields - STATE_FIELDS)}, valid fields are {sorted(STATE_FIELDS)}."
+            )
+        self._requested_fields.update(fields - self.subscriptions)
+        if fields & CHANNEL_FIELDS:
+            fields.add("current_appId")
+        update_channels = "current_appId" in self._subscribed_fields
+        todo = fields - self._subscribed_fields
+        if not todo:
+            return
+        self._subscribed_fields.update(todo)
+
+        # state subscriptions are renewed through the profile, not replayed
+        token = _internal_subscription.set(True)
+        pending = sorted(todo - CHANNEL_FIELDS)
+        try:
+            results = await asyncio.gather(
+                *(self._subscribe_field(field) for field in pending),
+                return_exceptions=True,
+            )
+        finally:
+            _internal_subscription.reset(token)
+        errors = []
+        for field, result in zip(pending, results):
+            if isinstance(result, BaseException):
+                self._subscribed_fields.discard(field)
+                errors.append(result)
+        if errors:
+            raise errors[0]
+
+        if update_channels and todo & CHANNEL_FIELDS:
+            await self.update_channel_subscriptions()
+
+    async def _subscribe_field(self, field):
+        if field in STATIC_FIELDS:
+            if field == "system_info":
+                self._system_info = await self.get_system_info()
+                self._calibration_support = None
+            else:
+                self._software_info = await self.get_software_info()
+        elif field == "power_state":
+            await self.subscribe_power_state(self.set_power_state)
+        elif field == "current_appId":
+            await self.subscribe_current_app(self.set_current_app_state)
+        elif field == "muted":
+            await self.subscribe_muted(self.set_muted_state)
+        elif field == "volume":
+            await self.subscribe_volume(self.set_volume_state)
+        elif field == "apps":
+            await self.subscribe_apps(self.set_apps_state)
+        elif field == "inputs":
+            await self.subscribe_inputs(self.set_inputs_state)
+        elif field == "sound_output":
+            await self.subscribe_sound_output(self.set_sound_output_state)
+
+    def _lazy_subscribe(self, field):
+        """Subscribe to a state field on first access, if not in the profile.
+
+        The subscription runs in a task kept in _lazy_subscribe_tasks until it
+        is done, errors are logged.
+        """
+        if field in self._subscribed_fields or not self.lazy_subscriptions:
+            return
+        if field not in self.subscriptions:
+            self._requested_fields.add(field)
+        # during connect the profile is subscribed to anyway
+        if self.connection is None or not self.doStateUpdate:
+            return
+        if field in self._lazy_subscribe_tasks:
+            return
+        try:
+            asyncio.get_running_loop()
+        except RuntimeError:
+            return
+        task = asyncio.create_task(self.lazy_subscribe_handler(field))
+        self._lazy_subscribe_tasks[field] = task
+        task.add_done_callback(functools.partial(self._lazy_subscribe_done, field))
+
+    def _lazy_subscribe_done(self, field, task):
+        if self._lazy_subscribe_tasks.get(field) is task:
+            del self._lazy_subscribe_tasks[field]
+
+    async def lazy_subscribe_handler(self, field):
+        try:
+            await self.subscribe_state(field)
+        except Exception as ex:
+            logger.warning("unable to subscribe to %s on %s: %r", field, self.ip, ex)
+
+    async def _ensure_system_info(self):
+        if self._system_info is None:
+            await self.subscribe_state("system_info")
+
     def calibration_support_info(self):
-        info = {
-            "lut1d": False,
-            "lut3d_size": None,
-            "custom_tone_mapping": False,
-            "dv_config_type": None,
-        }
-        model_name = self._system_info["modelName"]
-        if model_name.startswith("OLED") and len(model_name) > 7:
-            model = model_name[6]
-            year = int(model_name[7])
-            if year >= 8:
-                info["lut1d"] = True
-                if model == "B":
-                    info["lut3d_size"] = 17
-                else:
-                    info["lut3d_size"] = 33
-            if year == 8:
-                info["dv_config_type"] = 2018
-            elif year == 9:
-                info["custom_tone_mapping"] = True
-                info["dv_config_type"] = 2019
-        elif len(model_name) > 5:
-            size = None
-            try:
-                size = int(model_name[0:2])
-            except ValueError:
-                pass
-            if size:
-                modeltype = model_name[2]
-                modelyear = model_name[3]
-                modelseries = model_name[4]
-                modelnumber = model_name[5]
-
-                if modeltype == "S" and modelyear in ["K", "M"] and modelseries >= 8:
-                    info["lut1d"] = True
-                    if modelseries == 9 and modelnumber == 9:
-                        info["lut3d_size"] = 33
-                    else:
-                        info["lut3d_size"] = 17
-                    if modelyear == "K":
-                        info["dv_config_type"] = 2018
-                    elif modelyear == "M":
-                        info["custom_tone_mapping"] = True
-                        info["dv_config_type"] = 2019
-
-        return info
-
-    async def register_state_update_callback(self, callback):
+        """Return the calibration capabilities of the tv.
+
+        The result is empty while the system info is unknown, which is the
+        case on clients not subscribed to system_info until
+        subscribe_state("system_info") is called.
+        """
+        if self._system_info is None:
+            return {}
+        if self._calibration_support is None:
+            self._calibration_support = calibration_support(
+                self._system_info["modelName"]
+            )
+        return dict(self._calibration_support)
+
+    async def register_state_update_callback(self, callback, fields=None):
+        """Register a coroutine function to be called on state changes.
+
+        If fields is None the callback is called without arguments whenever any
+        state changes.  Otherwise it is only called when one of the given state
+        fields (see STATE_FIELDS) changed, and receives the frozenset of all
+        fields which changed since the last notification.
+        """
         self.state_update_callbacks.append(callback)
+        if fields is not None:
+            self.state_update_fields[callback] = frozenset(fields)
         if self.doStateUpdate:
-            await callback()
+            coro = self.state_update_call(callback, STATE_FIELDS)
+            if coro is not None:
+                await coro
 
     def unregister_state_update_callback(self, callback):
         if callback in self.state_update_callbacks:
             self.state_update_callbacks.remove(callback)
+        self.state_update_fields.pop(callback, None)
 
     def clear_state_update_callbacks(self):
         self.state_update_callbacks = []
-
-    async def do_state_update_callbacks(self):
+        self.state_update_fields = {}
+
+    def state_update_call(self, callback, changed):
+        """Return the coroutine notifying callback of changed, or None if not interested."""
+        fields = self.state_update_fields.get(callback)
+        if fields is None:
+            return callback()
+        if fields.isdisjoint(changed):
+            return None
+        return callback(changed)
+
+    async def do_state_update_callbacks(self, changed=STATE_FIELDS):
         callbacks = set()
         for callback in self.state_update_callbacks:
-            callbacks.add(callback())
+            coro = self.state_update_call(callback, changed)
+            if coro is not None:
+                callbacks.add(coro)
 
         if callbacks:
             await asyncio.gather(*callbacks)
 
+    async def state_changed(self, *fields):
+        """Record changed state fields and notify the state update callbacks.
+
+        With a state_update_interval the notification is deferred, so that all
+        changes within one interval result in a single call to each callback.
+        """
+        self._changed_state.update(fields)
+        if not (self.state_update_callbacks and self.doStateUpdate):
+            return
+        if not self.state_update_interval:
+            await self.flush_state_updates()
+        elif self._state_update_task is None:
+            self._state_update_task = asyncio.create_task(
+                self.delayed_state_update_handler()
+            )
+
+    async def flush_state_updates(self):
+        """Notify the state update callbacks of all pending changes now."""
+        changed = frozenset(self._changed_state)
+        self._changed_state.clear()
+        if changed:
+            await self.do_state_update_callbacks(changed)
+
+    async def delayed_state_update_handler(self):
+        try:
+            await asyncio.sleep(self.state_update_interval)
+        finally:
+            self._state_update_task = None
+        try:
+            await self.flush_state_updates()
+        except Exception:
+            logger.exception("error in state update callback for %s", self.ip)
+
     async def set_power_state(self, payload):
-        self._power_state = payload.get("state")
+        power_state = payload.get("state")
+        changed = power_state != self._power_state
+        self._power_state = power_state
 
         # if standby+ is off, the actual state update will never come, so disconnect on the initial notification
         if (
             not self.standby_connection
             and payload.get("processing") == "Request Power Off"
         ):
-            await self.disconnect()
+            await self.close_connection()
 
-        if self.state_update_callbacks and self.doStateUpdate:
-            await self.do_state_update_callbacks()
+        if changed:
+            await self.state_changed("power_state")
 
     async def set_current_app_state(self, appId):
         """Set current app state variable.  This function also handles subscriptions to current channel and channel list, since the current channel subscription can only succeed when Live TV is running, and the channel list subscription can only succeed after channels have been configured."""
+        changed = appId != self._current_appId
         self._current_appId = appId
 
-        if self._channels is None:
+        await self.update_channel_subscriptions()
+
+        if changed:
+            await self.state_changed("current_appId")
+
+    async def update_channel_subscriptions(self):
+        """Subscribe to the channel list and current channel once they are available."""
+        if not self._channel_list_subscribed and "channels" in self._subscribed_fields:
             try:
                 await self.subscribe_channels(self.set_channels_state)
+                self._channel_list_subscribed = True
             except PyLGTVCmdException:
                 pass
 
-        if appId == "com.webos.app.livetv" and self._current_channel is None:
+        if (
+            self._current_appId == "com.webos.app.livetv"
+            and self._current_channel is None
+            and self._subscribed_fields & {"current_channel", "channel_info"}
+        ):
             try:
                 await self.subscribe_current_channel(self.set_current_channel_state)
             except PyLGTVCmdException:
                 pass
 
-        if self.state_update_callbacks and self.doStateUpdate:
-            await self.do_state_update_callbacks()
-
     async def set_muted_state(self, muted):
-        self._muted = muted
-
-        if self.state_update_callbacks and self.doStateUpdate:
-            await self.do_state_update_callbacks()
+        if muted != self._muted:
+            self._muted = muted
+            await self.state_changed("muted")
 
     async def set_volume_state(self, volume):
-        self._volume = volume
-
-        if self.state_update_callbacks and self.doStateUpdate:
-            await self.do_state_update_callbacks()
+        if volume != self._volume:
+            self._volume = volume
+            await self.state_changed("volume")
 
     async def set_channels_state(self, channels):
-        self._channels = channels
-
-        if self.state_update_callbacks and self.doStateUpdate:
-            await self.do_state_update_callbacks()
+        loaded = self.channel_table.loaded
+        if any(self.channel_table.update(channels or [])) or not loaded:
+            await self.state_changed("channels")
 
     async def set_current_channel_state(self, channel):
         """Set current channel state variable.  This function also handles the channel info subscription, since that call may fail if channel information is not available when it's called."""
-
+        changed = channel != self._current_channel
         self._current_channel = channel
 
-        if self._channel_info is None:
+        if self._channel_info is None and "channel_info" in self._subscribed_fields:
             try:
                 await self.subscribe_channel_info(self.set_channel_info_state)
             except PyLGTVCmdException:
                 pass
 
-        if self.state_update_callbacks and self.doStateUpdate:
-            await self.do_state_update_callbacks()
+        if changed:
+            await self.state_changed("current_channel")
 
     async def set_channel_info_state(self, channel_info):
-        self._channel_info = channel_info
+        if channel_info != self._channel_info:
+            self._channel_info = channel_info
+            await self.state_changed("channel_info")
 
-        if self.state_update_callbacks and self.doStateUpdate:
-            await self.do_state_update_callbacks()
+    @staticmethod
+    def update_catalog(entries, items, key):
+        """Update a dict of entries by id in place from a list of items.
+
+        Entries which are equal to the new item are kept as they are, so
+        reordering items changes nothing.  Returns the lists of added, removed
+        and changed ids.
+        """
+        new_entries = {item[key]: item for item in items}
+        # the common case of an unchanged list is settled by one dict comparison
+        if new_entries == entries:
+            return [], [], []
+
+        added = []
+        changed = []
+        for item_id, item in new_entries.items():
+            entry = entries.get(item_id)
+            if entry is None:
+                entries[item_id] = item
+                added.append(item_id)
+            elif entry != item:
+                entries[item_id] = item
+                changed.append(item_id)
+
+        removed = [item_id for item_id in entries if item_id not in new_entries]
+        for item_id in removed:
+            del entries[item_id]
+        return added, removed, changed
 
     async def set_apps_state(self, apps):
-        self._apps = {}
-        for app in apps:
-            self._apps[app["id"]] = app
-
-        if self.state_update_callbacks and self.doStateUpdate:
-            await self.do_state_update_callbacks()
+        added, removed, changed = self.update_catalog(self._apps, apps, "id")
+        if added or removed or changed:
+            await self.catalog_changed("apps", added, removed, changed)
+            await self.state_changed("apps")
 
     async def set_inputs_state(self, extinputs):
-        self._extinputs = {}
-        for extinput in extinputs:
-            self._extinputs[extinput["appId"]] = extinput
+        added, removed, changed = self.update_catalog(
+            self._extinputs, extinputs, "appId"
+        )
+        if added or removed or changed:
+            await self.catalog_changed("inputs", added, removed, changed)
+            await self.state_changed("inputs")
 
-        if self.state_update_callbacks and self.doStateUpdate:
-            await self.do_state_update_callbacks()
+    def register_catalog_callback(self, callback):
+        """Register a coroutine function called on changes to apps or inputs.
 
-    async def set_sound_output_state(self, sound_output):
-        self._sound_output = sound_output
+        It is called with the field, apps or inputs, followed by the lists of
+        added, removed and changed ids.
+        """
+        self.catalog_callbacks.append(callback)
+
+    def unregister_catalog_callback(self, callback):
+        if callback in self.catalog_callbacks:
+            self.catalog_callbacks.remove(callback)
+
+    async def catalog_changed(self, field, added, removed, changed):
+        if self.catalog_callbacks and self.doStateUpdate:
+            await asyncio.gather(
+                *(
+                    callback(field, added, removed, changed)
+                    for callback in self.catalog_callbacks
+                )
+            )
 
-        if self.state_update_callbacks and self.doStateUpdate:
-            await self.do_state_update_callbacks()
+    async def set_sound_output_state(self, sound_output):
+        if sound_output != self._sound_output:
+            self._sound_output = sound_output
+            await self.state_changed("sound_output")
 
     # low level request handling
 
@@ -600,15 +1025,30 @@ class WebOsClient:
         if self.connection is None:
             raise PyLGTVCmdException("Not connected, can't execute command.")
 
-        await self.connection.send(json.dumps(message))
+        raw_msg = self.json_dumps(message)
+        await self.connection.send(raw_msg)
+        if self.metrics is not None:
+            self.metrics.message_sent(raw_msg)
+
+    async def request(
+        self, uri, payload=None, cmd_type="request", uid=None, timeout=None
+    ):
+        """Send a request and wait for response.
 
-    async def request(self, uri, payload=None, cmd_type="request", uid=None):
-        """Send a request and wait for response."""
+        If no response arrives within timeout seconds, or request_timeout if
+        timeout is None, asyncio.TimeoutError is raised.
+        """
         if uid is None:
             uid = self.command_count
             self.command_count += 1
+        if timeout is None:
+            timeout = self.request_timeout
+        if self.metrics is not None:
+            return await self._measured_request(uri, payload, cmd_type, uid, timeout)
         res = asyncio.Future()
         self.futures[uid] = res
+        if timeout is not None:
+            self._add_deadline(uid, uri, res, timeout)
         try:
             await self.command(cmd_type, uri, payload, uid)
         except (asyncio.CancelledError, PyLGTVCmdException):
@@ -622,6 +1062,57 @@ class WebOsClient:
             raise
         del self.futures[uid]
 
+        return self.response_payload(response)
+
+    async def _measured_request(self, uri, payload, cmd_type, uid, timeout):
+        metrics = self.metrics
+        metrics.request_started()
+        start = time.perf_counter()
+        error = True
+        try:
+            res = asyncio.Future()
+            self.futures[uid] = res
+            if timeout is not None:
+                self._add_deadline(uid, uri, res, timeout)
+            try:
+                await self.command(cmd_type, uri, payload, uid)
+                response = await res
+            finally:
+                self.futures.pop(uid, None)
+            payload = self.response_payload(response)
+            error = False
+            return payload
+        finally:
+            metrics.request_finished(uri, time.perf_counter() - start, error)
+
+    def _add_deadline(self, uid, uri, future, timeout):
+        self.deadlines.add(
+            future, timeout, functools.partial(self._expire_request, uid, uri, timeout)
+        )
+
+    def _expire_request(self, uid, uri, timeout, future):
+        if self.futures.get(uid) is future:
+            del self.futures[uid]
+        if self.metrics is not None:
+            self.metrics.requests_expired += 1
+        future.set_exception(
+            asyncio.TimeoutError(
+                f"No response to request {uid} for {uri} within {timeout} seconds."
+            )
+        )
+
+    @property
+    def expired_requests(self):
+        """Return the number of requests which expired without a response."""
+        return self.deadlines.expired
+
+    def _request_done(self, uri, start, future):
+        error = future.cancelled() or future.exception() is not None
+        self.metrics.request_finished(uri, time.perf_counter() - start, error)
+
+    @staticmethod
+    def response_payload(response):
+        """Return the payload of a request response, raising if the request failed."""
         payload = response.get("payload")
         if payload is None:
             raise PyLGTVCmdException(f"Invalid request response {response}")
@@ -635,50 +1126,258 @@ class WebOsClient:
 
         return payload
 
+    async def request_many(
+        self,
+        requests,
+        max_in_flight=None,
+        return_exceptions=True,
+        timeout=None,
+        stop_on_error=False,
+    ):
+        """Send several requests back to back and wait for all responses.
+
+        requests is an iterable of uris or (uri, payload) tuples.  Requests are
+        written to the connection in order without waiting for responses in
+        between, with at most max_in_flight outstanding at any time (unlimited if
+        None).  Results are returned in request order.  If return_exceptions is
+        True a failed request yields its exception in place of its payload,
+        otherwise the first failure is raised after all responses are in.  Each
+        request expires after timeout seconds as with request().  With
+        stop_on_error no more requests are sent once one has failed, and those
+        not sent yield PyLGTVCmdException.
+        """
+        items = []
+        for item in requests:
+            if isinstance(item, str):
+                items.append((item, None))
+            else:
+                items.append(tuple(item))
+
+        outcomes = await self._request_pipeline(
+            items, max_in_flight, timeout, stop_on_error
+        )
+
+        results = []
+        for result, _ in outcomes:
+            if isinstance(result, BaseException) and not return_exceptions:
+                raise result
+            results.append(result)
+
+        return results
+
+    async def _request_pipeline(
+        self, items, max_in_flight=None, timeout=None, stop_on_error=False
+    ):
+        """Send (uri, payload) requests back to back, see request_many().
+
+        Returns a (result, duration) tuple per request, where result is the
+        response payload or the exception of the request and duration is the
+        time in seconds from send to response, or None if it was not sent.
+        """
+        if timeout is None:
+            timeout = self.request_timeout
+        loop = asyncio.get_running_loop()
+        semaphore = None
+        if max_in_flight is not None:
+            semaphore = asyncio.Semaphore(max_in_flight)
+
+        durations = [None] * len(items)
+        failed = False
+
+        def done(index, start, future):
+            nonlocal failed
+            durations[index] = loop.time() - start
+            if semaphore is not None:
+                semaphore.release()
+            if future.cancelled() or isinstance(
+                self._response_result(future.exception() or future.result()), Exception
+            ):
+                failed = True
+
+        uids = []
+        futures = []
+        try:
+            for index, (uri, payload) in enumerate(items):
+                if semaphore is not None:
+                    await semaphore.acquire()
+                if stop_on_error and failed:
+                    if semaphore is not None:
+                        semaphore.release()
+                    break
+                uid = self.command_count
+                self.command_count += 1
+                future = asyncio.Future()
+                future.add_done_callback(functools.partial(done, index, loop.time()))
+                if self.metrics is not None:
+                    self.metrics.request_started()
+                    future.add_done_callback(
+                        functools.partial(self._request_done, uri, time.perf_counter())
+                    )
+                self.futures[uid] = future
+                if timeout is not None:
+                    self._add_deadline(uid, uri, future, timeout)
+                uids.append(uid)
+                futures.append(future)
+                await self.command("request", uri, payload, uid)
+
+            responses = await asyncio.gather(*futures, return_exceptions=True)
+        finally:
+            for uid in uids:
+                self.futures.pop(uid, None)
+            for future in futures:
+                if not future.done():
+                    future.cancel()
+
+        outcomes = [
+            (self._response_result(response), duration)
+            for response, duration in zip(responses, durations)
+        ]
+        for uri, _ in items[len(responses) :]:
+            error = PyLGTVCmdException(
+                f"Request for {uri} not sent after an earlier request failed."
+            )
+            outcomes.append((error, None))
+        return outcomes
+
+    def _response_result(self, response):
+        """Return the payload of a response, or the exception of a failed request."""
+        if isinstance(response, BaseException):
+            return response
+        try:
+            return self.response_payload(response)
+        except PyLGTVCmdException as ex:
+            return ex
+
     async def subscribe(self, callback, uri, payload=None):
         """Subscribe to updates."""
         uid = self.command_count
         self.command_count += 1
         self.callbacks[uid] = callback
         try:
-            return await self.request(
+            res = await self.request(
                 uri, payload=payload, cmd_type="subscribe", uid=uid
             )
         except Exception:
             del self.callbacks[uid]
             raise
+        if self.metrics is not None:
+            self.metrics.subscriptions += 1
+        if self.auto_reconnect and not _internal_subscription.get():
+            self.user_subscriptions[uid] = (callback, uri, payload)
+        return res
+
+    async def replay_subscriptions(self):
+        """Renew the subscriptions made through subscribe() on a new connection.
+
+        Subscriptions which can't be renewed are kept and retried on the next
+        connection.
+        """
+        subscriptions = list(self.user_subscriptions.items())
+        self.user_subscriptions = {}
+        token = _internal_subscription.set(False)
+        try:
+            results = await asyncio.gather(
+                *(
+                    self.subscribe(callback, uri, payload)
+                    for _, (callback, uri, payload) in subscriptions
+                ),
+                return_exceptions=True,
+            )
+        finally:
+            _internal_subscription.reset(token)
+        for (uid, subscription), result in zip(subscriptions, results):
+            if isinstance(result, Exception):
+                logger.warning(
+                    "unable to renew subscription to %s: %r", subscription[1], result
+                )
+                self.user_subscriptions[uid] = subscription
 
     async def input_command(self, message):
         if self.input_connection is None:
             raise PyLGTVCmdException("Couldn't execute input command.")
 
         await self.input_connection.send(message)
+        if self.metrics is not None:
+            self.metrics.input_message_sent(message)
+
+    @staticmethod
+    def input_message(step):
+        """Serialise an input step to an input socket message.
+
+        A step is a button name or one of the tuples ("button", name),
+        ("move", dx, dy), ("move", dx, dy, down), ("click",) or ("scroll", dx, dy).
+        """
+        if isinstance(step, str):
+            step = ("button", step)
+        kind, *args = step
+        if kind == "button":
+            (name,) = args
+            return f"type:button\nname:{name}\n\n"
+        elif kind == "move":
+            dx, dy, *down = args
+            down = down[0] if down else 0
+            return f"type:move\ndx:{dx}\ndy:{dy}\ndown:{down}\n\n"
+        elif kind == "click":
+            return "type:click\n\n"
+        elif kind == "scroll":
+            dx, dy = args
+            return f"type:scroll\ndx:{dx}\ndy:{dy}\n\n"
+        raise ValueError(f"Invalid input step {step}.")
+
+    async def button_sequence(self, steps, interval=None):
+        """Send a sequence of buttons, pointer moves and clicks on the input socket.
+
+        All steps are serialised up front and written back to back, optionally
+        paced by interval, which is either a delay in seconds between all steps
+        or a sequence with one delay per gap between steps.  Returns the number
+        of messages sent once the last one has been written to the socket.
+        Raises PyLGTVCmdException if the input connection is closed, including
+        part way through the sequence.
+        """
+        if isinstance(steps, str):
+            steps = steps.split(",")
+        messages = [self.input_message(step) for step in steps]
+
+        if interval is None:
+            delays = [0.0] * len(messages)
+        elif isinstance(interval, (int, float, str)):
+            delays = [float(interval)] * len(messages)
+        else:
+            delays = [float(delay) for delay in interval]
+            if len(delays) != max(len(messages) - 1, 0):
+                raise ValueError(
+                    f"Expected {len(messages) - 1} intervals for {len(messages)} steps, but got {len(delays)}."
+                )
+
+        for i, message in enumerate(messages):
+            if i > 0 and delays[i - 1] > 0:
+                await asyncio.sleep(delays[i - 1])
+            # the connection may drop while pacing the steps
+            await self.input_command(message)
+
+        return len(messages)
 
     # high level request handling
 
     async def button(self, name):
         """Send button press command."""
 
-        message = f"type:button\nname:{name}\n\n"
-        await self.input_command(message)
+        await self.input_command(self.input_message(("button", name)))
 
     async def move(self, dx, dy, down=0):
         """Send cursor move command."""
 
-        message = f"type:move\ndx:{dx}\ndy:{dy}\ndown:{down}\n\n"
-        await self.input_command(message)
+        await self.input_command(self.input_message(("move", dx, dy, down)))
 
     async def click(self):
         """Send cursor click command."""
 
-        message = f"type:click\n\n"
-        await self.input_command(message)
+        await self.input_command(self.input_message(("click",)))
 
     async def scroll(self, dx, dy):
         """Send scroll command."""
 
-        message = f"type:scroll\ndx:{dx}\ndy:{dy}\n\n"
-        await self.input_command(message)
+        await self.input_command(self.input_message(("scroll", dx, dy)))
 
     async def send_message(self, message, icon_path=None):
         """Show a floating message."""
@@ -905,6 +1604,28 @@ class WebOsClient:
         """Set the current channel."""
         return await self.request(ep.SET_CHANNEL, {"channelId": channel})
 
+    async def _ensure_channel_table(self):
+        # without a channel list subscription the table is not kept up to
+        # date, so the list is fetched again
+        if not (self._channel_list_subscribed and self.channel_table.loaded):
+            self.channel_table.update(await self.get_channels() or [])
+
+    async def set_channel_by_number(self, number):
+        """Set the current channel by its number, such as 7 or "2-1"."""
+        await self._ensure_channel_table()
+        channel = self.channel_table.by_number(number)
+        if channel is None:
+            raise PyLGTVCmdException(f"Unknown channel number {number}.")
+        return await self.set_channel(channel.channel_id)
+
+    async def set_channel_by_name(self, name):
+        """Set the current channel by its name, ignoring case."""
+        await self._ensure_channel_table()
+        channel = self.channel_table.by_name(name)
+        if channel is None:
+            raise PyLGTVCmdException(f"Unknown channel name {name}.")
+        return await self.set_channel(channel.channel_id)
+
     async def get_sound_output(self):
         """Get the current audio output."""
         res = await self.request(ep.GET_SOUND_OUTPUT)
@@ -1062,6 +1783,8 @@ class WebOsClient:
         await self.button(f"""{num}""")
 
     def validateCalibrationData(self, data, shape, dtype):
+        import numpy as np
+
         if not isinstance(data, np.ndarray):
             raise TypeError
         if data.shape != shape:
@@ -1069,31 +1792,72 @@ class WebOsClient:
         if data.dtype != dtype:
             raise TypeError
 
-    async def calibration_request(self, command, picMode, data):
-        dataenc = base64.b64encode(data.tobytes()).decode()
-
-        payload = {
+    @staticmethod
+    def _calibration_payload(command, picMode, dataenc, count, dtype):
+        return {
             "command": command,
             "data": dataenc,
-            "dataCount": data.size,
+            "dataCount": count,
             "dataOpt": 1,
-            "dataType": CALIBRATION_TYPE_MAP[data.dtype.name],
+            "dataType": CALIBRATION_TYPE_MAP[dtype],
             "profileNo": 0,
             "programID": 1,
             "picMode": picMode,
         }
 
+    def calibration_payload(self, command, picMode, data, dataenc=None):
+        if dataenc is None:
+            dataenc = default_payload_cache.encode(data)
+        return self._calibration_payload(
+            command, picMode, dataenc, data.size, data.dtype.name
+        )
+
+    def calibration_values_payload(self, command, picMode, values, dtype="uint16"):
+        """Return the payload of a short sequence of values, encoded without NumPy."""
+        return self._calibration_payload(
+            command, picMode, encode_values(values, dtype), len(values), dtype
+        )
+
+    async def calibration_request(self, command, picMode, data, dataenc=None):
+        payload = self.calibration_payload(command, picMode, data, dataenc)
+        return await self.send_calibration_payload(command, payload)
+
+    async def calibration_values_request(
+        self, command, picMode, values, dtype="uint16"
+    ):
+        payload = self.calibration_values_payload(command, picMode, values, dtype)
+        return await self.send_calibration_payload(command, payload)
+
+    async def send_calibration_payload(self, command, payload):
+        transaction = recording_transaction.get()
+        if transaction is not None:
+            transaction.queue(command, payload)
+            return None
+
         return await self.request(ep.CALIBRATION, payload)
 
-    async def start_calibration(self, picMode, data=DEFAULT_CAL_DATA):
-        self.validateCalibrationData(data, (9,), np.float32)
+    def calibration_transaction(self, picMode, **kwargs):
+        """Return a CalibrationTransaction for picMode on this client."""
+        return CalibrationTransaction(self, picMode, **kwargs)
+
+    async def start_calibration(self, picMode, data=None):
+        if data is None:
+            return await self.calibration_values_request(
+                cal.CAL_START, picMode, DEFAULT_CAL_VALUES, "float32"
+            )
+        self.validateCalibrationData(data, (9,), "float32")
         return await self.calibration_request(cal.CAL_START, picMode, data)
 
-    async def end_calibration(self, picMode, data=DEFAULT_CAL_DATA):
-        self.validateCalibrationData(data, (9,), np.float32)
+    async def end_calibration(self, picMode, data=None):
+        if data is None:
+            return await self.calibration_values_request(
+                cal.CAL_END, picMode, DEFAULT_CAL_VALUES, "float32"
+            )
+        self.validateCalibrationData(data, (9,), "float32")
         return await self.calibration_request(cal.CAL_END, picMode, data)
 
     async def upload_1d_lut(self, picMode, data=None):
+        await self._ensure_system_info()
         info = self.calibration_support_info()
         if not info["lut1d"]:
             model = self._system_info["modelName"]
@@ -1101,13 +1865,19 @@ class WebOsClient:
                 f"1D LUT Upload not supported by tv model {model}."
             )
         if data is None:
-            data = unity_lut_1d()
-        self.validateCalibrationData(data, (3, 1024), np.uint16)
+            return await self.calibration_request(
+                cal.UPLOAD_1D_LUT,
+                picMode,
+                cached_unity_lut_1d(),
+                dataenc=encoded_unity_lut_1d(),
+            )
+        self.validateCalibrationData(data, (3, 1024), "uint16")
         return await self.calibration_request(cal.UPLOAD_1D_LUT, picMode, data)
 
     async def upload_3d_lut(self, command, picMode, data):
-        if command not in [cal.UPLOAD_3D_LUT_BT709, cal.UPLOAD_3D_LUT_BT202]:
+        if command not in [cal.UPLOAD_3D_LUT_BT709, cal.UPLOAD_3D_LUT_BT2020]:
             raise PyLGTVCmdException(f"Invalid 3D LUT Upload command {command}.")
+        await self._ensure_system_info()
         info = self.calibration_support_info()
         lut3d_size = info["lut3d_size"]
         if not lut3d_size:
@@ -1116,9 +1886,14 @@ class WebOsClient:
                 f"3D LUT Upload not supported by tv model {model}."
             )
         if data is None:
-            data = unity_lut_3d(lut3d_size)
+            return await self.calibration_request(
+                command,
+                picMode,
+                cached_unity_lut_3d(lut3d_size),
+                dataenc=encoded_unity_lut_3d(lut3d_size),
+            )
         lut3d_shape = (lut3d_size, lut3d_size, lut3d_size, 3)
-        self.validateCalibrationData(data, lut3d_shape, np.uint16)
+        self.validateCalibrationData(data, lut3d_shape, "uint16")
         return await self.calibration_request(command, picMode, data)
 
     async def upload_3d_lut_bt709(self, picMode, data=None):
@@ -1134,8 +1909,7 @@ class WebOsClient:
         if not (value >= 0 and value <= 100):
             raise ValueError
 
-        data = np.array(value, dtype=np.uint16)
-        return await self.calibration_request(command, picMode, data)
+        return await self.calibration_values_request(command, picMode, (int(value),))
 
     async def set_brightness(self, picMode, value):
         return await self.set_ui_data(cal.BRIGHTNESS_UI_DATA, picMode, value)
@@ -1150,27 +1924,29 @@ class WebOsClient:
         return await self.set_ui_data(cal.COLOR_UI_DATA, picMode, value)
 
     async def set_1d_2_2_en(self, picMode, value=0):
-        data = np.array(value, dtype=np.uint16)
-        return await self.calibration_request(
-            cal.ENABLE_GAMMA_2_2_TRANSFORM, picMode, data
+        return await self.calibration_values_request(
+            cal.ENABLE_GAMMA_2_2_TRANSFORM, picMode, (int(value),)
         )
 
     async def set_1d_0_45_en(self, picMode, value=0):
-        data = np.array(value, dtype=np.uint16)
-        return await self.calibration_request(
-            cal.ENABLE_GAMMA_0_45_TRANSFORM, picMode, data
+        return await self.calibration_values_request(
+            cal.ENABLE_GAMMA_0_45_TRANSFORM, picMode, (int(value),)
         )
 
-    async def set_bt709_3by3_gamut_data(
-        self, picMode, data=np.identity(3, dtype=np.float32)
-    ):
-        self.validateCalibrationData(data, (3, 3), np.float32)
+    async def set_bt709_3by3_gamut_data(self, picMode, data=None):
+        if data is None:
+            return await self.calibration_values_request(
+                cal.BT709_3BY3_GAMUT_DATA, picMode, IDENTITY_3BY3_VALUES, "float32"
+            )
+        self.validateCalibrationData(data, (3, 3), "float32")
         return await self.calibration_request(cal.BT709_3BY3_GAMUT_DATA, picMode, data)
 
-    async def set_bt2020_3by3_gamut_data(
-        self, picMode, data=np.identity(3, dtype=np.float32)
-    ):
-        self.validateCalibrationData(data, (3, 3), np.float32)
+    async def set_bt2020_3by3_gamut_data(self, picMode, data=None):
+        if data is None:
+            return await self.calibration_values_request(
+                cal.BT2020_3BY3_GAMUT_DATA, picMode, IDENTITY_3BY3_VALUES, "float32"
+            )
+        self.validateCalibrationData(data, (3, 3), "float32")
         return await self.calibration_request(cal.BT2020_3BY3_GAMUT_DATA, picMode, data)
 
     async def set_tonemap_params(
@@ -1185,8 +1961,9 @@ class WebOsClient:
         rolloff_point_3=50,
     ):
 
-        data = np.array(
-            [
+        values = tuple(
+            int(value)
+            for value in (
                 luminance,
                 mastering_peak_1,
                 rolloff_point_1,
@@ -1194,11 +1971,12 @@ class WebOsClient:
                 rolloff_point_2,
                 mastering_peak_3,
                 rolloff_point_3,
-            ],
-            dtype=np.uint16,
+            )
         )
 
-        return await self.calibration_request(cal.SET_TONEMAP_PARAM, picMode, data)
+        return await self.calibration_values_request(
+            cal.SET_TONEMAP_PARAM, picMode, values
+        )
 
     async def ddc_reset(self, picMode, reset_1d_lut=True):
         if isinstance(reset_1d_lut, str):
@@ -1214,14 +1992,16 @@ class WebOsClient:
                         f"Invalid parameter {reset_1d_lut} for ddc_reset, should be a boolean."
                     )
 
-        await self.set_1d_2_2_en(picMode)
-        await self.set_1d_0_45_en(picMode)
-        await self.set_bt709_3by3_gamut_data(picMode)
-        await self.set_bt2020_3by3_gamut_data(picMode)
-        await self.upload_3d_lut_bt709(picMode)
-        await self.upload_3d_lut_bt2020(picMode)
+        transaction = self.calibration_transaction(picMode, bracket=False)
+        await transaction.add(self.set_1d_2_2_en)
+        await transaction.add(self.set_1d_0_45_en)
+        await transaction.add(self.set_bt709_3by3_gamut_data)
+        await transaction.add(self.set_bt2020_3by3_gamut_data)
+        await transaction.add(self.upload_3d_lut_bt709)
+        await transaction.add(self.upload_3d_lut_bt2020)
         if reset_1d_lut:
-            await self.upload_1d_lut(picMode)
+            await transaction.add(self.upload_1d_lut)
+        await transaction.commit()
 
         return True
 
@@ -1232,12 +2012,20 @@ class WebOsClient:
         ret = await self.request(ep.GET_SYSTEM_SETTINGS, payload=payload)
         return ret["settings"]
 
+    def read_lut_file(self, filename, reader):
+        """Read a LUT file, through the LUT cache if one is configured."""
+        if self.lut_cache is None:
+            return reader(filename)
+        return self.lut_cache.load(filename, reader)
+
     async def upload_1d_lut_from_file(self, picMode, filename):
+        from .lut_tools import read_cal_file, read_cube_file
+
         ext = filename.split(".")[-1].lower()
         if ext == "cal":
-            lut = read_cal_file(filename)
+            lut = self.read_lut_file(filename, read_cal_file)
         elif ext == "cube":
-            lut = read_cube_file(filename)
+            lut = self.read_lut_file(filename, read_cube_file)
         else:
             raise ValueError(
                 f"Unsupported file format {ext} for 1D LUT.  Supported file formats are cal and cube."
@@ -1245,15 +2033,25 @@ class WebOsClient:
 
         return await self.upload_1d_lut(picMode, lut)
 
-    async def upload_3d_lut_from_file(self, command, picMode, filename):
+    async def upload_3d_lut_from_file(
+        self, command, picMode, filename, resample_method="tetrahedral"
+    ):
+        from .lut_tools import read_cube_file, resample_lut_3d
+
         ext = filename.split(".")[-1].lower()
         if ext == "cube":
-            lut = read_cube_file(filename)
+            lut = self.read_lut_file(filename, read_cube_file)
         else:
             raise ValueError(
                 f"Unsupported file format {ext} for 3D LUT.  Supported file formats are cube."
             )
 
+        # resample LUTs of a different size to the one supported by the tv
+        await self._ensure_system_info()
+        lut3d_size = self.calibration_support_info()["lut3d_size"]
+        if lut3d_size and lut.ndim == 4 and lut.shape[0] != lut3d_size:
+            lut = resample_lut_3d(lut, lut3d_size, method=resample_method)
+
         return await self.upload_3d_lut(command, picMode, lut)
 
     async def upload_3d_lut_bt709_from_file(self, picMode, filename):
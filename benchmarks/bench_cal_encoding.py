@@ -0,0 +1,57 @@
+"""Benchmark of calibration payload encoding with and without the cache.
+
+Run from the repository root:
+
+    python benchmarks/bench_cal_encoding.py --rounds 200
+"""
+import argparse
+import base64
+import time
+
+from common import report, summarize
+
+from aiopylgtv.cal_encoding import (
+    CalibrationPayloadCache,
+    cached_unity_lut_3d,
+    encoded_unity_lut_3d,
+)
+from aiopylgtv.lut_tools import unity_lut_3d
+
+
+def timed(func, rounds):
+    samples = []
+    for _ in range(rounds):
+        start = time.perf_counter()
+        func()
+        samples.append(time.perf_counter() - start)
+    return summarize(samples)
+
+
+def main(args):
+    lut = unity_lut_3d(args.size)
+    cache = CalibrationPayloadCache()
+
+    results = {
+        "unity_uncached": timed(
+            lambda: base64.b64encode(unity_lut_3d(args.size).tobytes()).decode(),
+            args.rounds,
+        ),
+        "unity_precomputed": timed(
+            lambda: (cached_unity_lut_3d(args.size), encoded_unity_lut_3d(args.size)),
+            args.rounds,
+        ),
+        "encode_uncached": timed(
+            lambda: base64.b64encode(lut.tobytes()).decode(), args.rounds
+        ),
+        "encode_cached": timed(lambda: cache.encode(lut), args.rounds),
+    }
+    results["cache"] = cache.stats()
+    report("cal_encoding", results, as_json=args.json)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--size", type=int, default=33)
+    parser.add_argument("--rounds", type=int, default=200)
+    parser.add_argument("--json", action="store_true", help="print results as json")
+    main(parser.parse_args())
@@ -0,0 +1,97 @@
+"""Micro-benchmark of apps list updates in WebOsClient.set_apps_state.
+
+Applies launch point lists as they arrive from the apps subscription, once
+unchanged, once reordered and once with a single changed app, and reports
+the time per update and the number of state notifications.  The rebuild
+baseline follows the implementation before incremental updates, which built
+a new dict and notified the state callbacks on every update.  Run from the
+repository root:
+
+    python benchmarks/bench_catalog.py --apps 80 --updates 2000
+"""
+
+import argparse
+import asyncio
+import random
+import time
+
+from common import report, temp_key_file
+
+from aiopylgtv import WebOsClient
+
+
+def launch_points(count):
+    return [
+        {
+            "id": f"com.example.app{i}",
+            "title": f"App {i}",
+            "icon": f"http://127.0.0.1:3000/resources/{'0' * 40}/icon{i}.png",
+            "bgColor": "#000000",
+            "removable": True,
+            "systemApp": False,
+            "miniicon": f"http://127.0.0.1:3000/resources/{'0' * 40}/mini{i}.png",
+        }
+        for i in range(count)
+    ]
+
+
+def variants(apps, kind):
+    # decoded json yields new objects for every push
+    if kind == "unchanged":
+        return [dict(app) for app in apps]
+    elif kind == "reordered":
+        new_apps = [dict(app) for app in apps]
+        random.shuffle(new_apps)
+        return new_apps
+    new_apps = [dict(app) for app in apps]
+    new_apps[len(new_apps) // 2]["title"] += " (updated)"
+    return new_apps
+
+
+class RebuildClient(WebOsClient):
+    async def set_apps_state(self, apps):
+        self._apps = {}
+        for app in apps:
+            self._apps[app["id"]] = app
+        await self.state_changed("apps")
+
+
+async def run(client_class, payloads):
+    client = client_class("127.0.0.1", key_file_path=temp_key_file())
+    notifications = 0
+
+    async def on_apps(changed):
+        nonlocal notifications
+        notifications += 1
+
+    await client.register_state_update_callback(on_apps, fields={"apps"})
+    client.doStateUpdate = True
+    await client.set_apps_state(payloads[0])
+    notifications = 0
+
+    start = time.perf_counter()
+    for payload in payloads[1:]:
+        await client.set_apps_state(payload)
+    elapsed = time.perf_counter() - start
+    return {
+        "us_per_update": 1e6 * elapsed / (len(payloads) - 1),
+        "notifications": notifications,
+    }
+
+
+async def main(args):
+    apps = launch_points(args.apps)
+    results = {}
+    for kind in ("unchanged", "reordered", "one_changed"):
+        payloads = [apps] + [variants(apps, kind) for _ in range(args.updates)]
+        results[f"rebuild_{kind}"] = await run(RebuildClient, payloads)
+        results[f"incremental_{kind}"] = await run(WebOsClient, payloads)
+    report("catalog", results, as_json=args.json)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--apps", type=int, default=80)
+    parser.add_argument("--updates", type=int, default=2000)
+    parser.add_argument("--json", action="store_true", help="print results as json")
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,126 @@
+"""Benchmark of ChannelTable memory use and channel lookups on large lists.
+
+Builds a ChannelTable from a synthetic cable-sized channelList and reports
+the memory held by the raw list and the memory the table indexes add on top
+of it, the time to build and
+incrementally update the table, and lookup times by id, number and name
+against a linear scan of the raw list.  Run from the repository root:
+
+    python benchmarks/bench_channels.py --channels 5000
+"""
+
+import argparse
+import gc
+import random
+import time
+import tracemalloc
+
+from common import report
+
+from aiopylgtv.channels import ChannelTable
+
+
+def channel_list(count):
+    return [
+        {
+            "channelId": f"3_{i}_{i}_0_{1000 + i}_{i * 7}_0",
+            "channelNumber": f"{i // 4 + 2}-{i % 4 + 1}",
+            "channelName": f"Channel {i}",
+            "channelMode": "Cable",
+            "channelType": "Cable Digital TV",
+            "channelTypeId": 4,
+            "programId": f"3_{i}_0_0",
+            "signalChannelId": f"{1000 + i}_{i * 7}_0",
+            "physicalNumber": 30 + i % 100,
+            "majorNumber": i // 4 + 2,
+            "minorNumber": i % 4 + 1,
+            "sourceIndex": 3,
+            "satelliteName": " ",
+            "Radio": False,
+            "Invisible": False,
+            "Locked": False,
+            "scrambled": False,
+            "skipped": False,
+            "fineTuned": False,
+            "HDTV": True,
+            "TV": True,
+            "favoriteGroup": "",
+            "imgUrl": "",
+            "display": 1,
+        }
+        for i in range(count)
+    ]
+
+
+def measure_memory(build):
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    obj = build()
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return obj, after - before
+
+
+def time_per_call(func, args, rounds=1):
+    start = time.perf_counter()
+    for _ in range(rounds):
+        for arg in args:
+            func(arg)
+    return 1e6 * (time.perf_counter() - start) / (rounds * len(args))
+
+
+def linear_lookup(channels, key, value):
+    for channel in channels:
+        if channel[key] == value:
+            return channel
+    return None
+
+
+def main(args):
+    raw, raw_bytes = measure_memory(lambda: channel_list(args.channels))
+    table, table_bytes = measure_memory(lambda: ChannelTable(raw))
+
+    start = time.perf_counter()
+    ChannelTable(raw)
+    build_ms = 1e3 * (time.perf_counter() - start)
+
+    updated = [dict(channel) for channel in raw]
+    updated[len(updated) // 2]["channelName"] = "Renamed"
+    start = time.perf_counter()
+    changes = table.update(updated)
+    update_ms = 1e3 * (time.perf_counter() - start)
+
+    sample = random.sample(updated, min(args.lookups, len(updated)))
+    ids = [channel["channelId"] for channel in sample]
+    numbers = [channel["channelNumber"] for channel in sample]
+    names = [channel["channelName"] for channel in sample]
+    results = {
+        "memory": {
+            "channels": args.channels,
+            "raw_list_kib": raw_bytes / 1024,
+            "table_kib": table_bytes / 1024,
+        },
+        "update": {
+            "build_ms": build_ms,
+            "one_renamed_ms": update_ms,
+            "added_removed_changed": changes,
+        },
+        "lookup_us": {
+            "table_by_id": time_per_call(table.by_id, ids, 10),
+            "table_by_number": time_per_call(table.by_number, numbers, 10),
+            "table_by_name": time_per_call(table.by_name, names, 10),
+            "scan_by_number": time_per_call(
+                lambda number: linear_lookup(updated, "channelNumber", number), numbers
+            ),
+        },
+    }
+    report("channels", results, as_json=args.json)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--channels", type=int, default=5000)
+    parser.add_argument("--lookups", type=int, default=500)
+    parser.add_argument("--json", action="store_true", help="print results as json")
+    main(parser.parse_args())
@@ -0,0 +1,275 @@
+"""Round-trip benchmark of WebOsClient against the local webOS simulator.
+
+Reports connect time-to-ready, sequential request latency and pipelined
+request throughput.  Sequential request latency is also measured with a bare
+websockets connection, as a baseline for the same machine, and
+--max-p99-ratio fails the run if the client p99 exceeds that many times the
+baseline p99.  Run from the repository root:
+
+    python benchmarks/bench_client.py --requests 2000 --concurrency 32
+"""
+
+import argparse
+import asyncio
+import json
+import sys
+import time
+
+import websockets
+
+from common import report, summarize, temp_key_file
+
+from aiopylgtv import PointerChannel, WebOsClient
+from aiopylgtv import endpoints as ep
+from aiopylgtv.constants import SUBSCRIPTIONS_MINIMAL
+from aiopylgtv.simulator import WebOsSimulator
+
+
+async def bench_connect(sim, key_file, rounds, subscriptions=None):
+    samples = []
+    for _ in range(rounds):
+        client = WebOsClient(
+            "127.0.0.1",
+            key_file_path=key_file,
+            port=sim.port,
+            subscriptions=subscriptions,
+        )
+        start = time.perf_counter()
+        await client.connect()
+        samples.append(time.perf_counter() - start)
+        await client.disconnect()
+    return summarize(samples)
+
+
+async def bench_raw_sequential(sim, requests):
+    """Sequential request latency without the client, sending bare ssap messages."""
+    samples = []
+    async with websockets.connect(f"ws://127.0.0.1:{sim.port}") as ws:
+        for i in range(requests):
+            msg = json.dumps(
+                {"type": "request", "id": str(i), "uri": f"ssap://{ep.GET_VOLUME}"}
+            )
+            start = time.perf_counter()
+            await ws.send(msg)
+            json.loads(await ws.recv())
+            samples.append(time.perf_counter() - start)
+    return summarize(samples)
+
+
+async def bench_sequential(client, requests):
+    samples = []
+    for _ in range(requests):
+        start = time.perf_counter()
+        await client.request(ep.GET_VOLUME)
+        samples.append(time.perf_counter() - start)
+    return summarize(samples)
+
+
+async def bench_concurrent(client, requests, concurrency):
+    samples = []
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def one():
+        async with semaphore:
+            start = time.perf_counter()
+            await client.request(ep.GET_VOLUME)
+            samples.append(time.perf_counter() - start)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(one() for _ in range(requests)))
+    elapsed = time.perf_counter() - start
+    results = summarize(samples)
+    results["requests_per_s"] = requests / elapsed
+    return results
+
+
+async def bench_request_many(client, batches, batch_size):
+    uris = [ep.GET_VOLUME, ep.GET_POWER_STATE, ep.GET_CURRENT_APP_INFO]
+    batch = [uris[i % len(uris)] for i in range(batch_size)]
+    sequential = []
+    pipelined = []
+    for _ in range(batches):
+        start = time.perf_counter()
+        for uri in batch:
+            await client.request(uri)
+        sequential.append(time.perf_counter() - start)
+
+        start = time.perf_counter()
+        await client.request_many(batch)
+        pipelined.append(time.perf_counter() - start)
+    return {
+        "batch_size": batch_size,
+        "sequential_p50_ms": summarize(sequential)["p50_ms"],
+        "request_many_p50_ms": summarize(pipelined)["p50_ms"],
+    }
+
+
+async def bench_input(client, sim, presses):
+    buttons = ["UP", "DOWN", "LEFT", "RIGHT"]
+    steps = [buttons[i % len(buttons)] for i in range(presses)]
+
+    start = time.perf_counter()
+    for name in steps:
+        await client.button(name)
+    individual = time.perf_counter() - start
+
+    start = time.perf_counter()
+    await client.button_sequence(steps)
+    sequence = time.perf_counter() - start
+
+    # wait for the simulator to receive everything
+    while len(sim.input_messages) < 2 * presses:
+        await asyncio.sleep(0.001)
+    return {
+        "presses": presses,
+        "button_loop_ms": 1e3 * individual,
+        "button_sequence_ms": 1e3 * sequence,
+    }
+
+
+async def bench_pointer(client, events, rate):
+    pointer = PointerChannel(client, frame_rate=60)
+    start = time.perf_counter()
+    for i in range(events):
+        await pointer.move(1, -1)
+        if i % 10 == 9:
+            await pointer.click()
+        await asyncio.sleep(1.0 / rate)
+    await pointer.close()
+    elapsed = time.perf_counter() - start
+    results = pointer.stats()
+    results["events_per_s"] = pointer.events_received / elapsed
+    results["frames_per_s"] = pointer.frames_sent / elapsed
+    return results
+
+
+async def bench_ddc_reset(client, rounds):
+    samples = []
+    for _ in range(rounds):
+        start = time.perf_counter()
+        await client.ddc_reset("expert1")
+        samples.append(time.perf_counter() - start)
+    return summarize(samples)
+
+
+async def bench_push(client, sim, duration):
+    received = 0
+
+    async def on_volume(payload):
+        nonlocal received
+        received += 1
+
+    await client.subscribe(on_volume, ep.GET_VOLUME)
+    received = 0
+    await asyncio.sleep(duration)
+    return {"pushes_per_s": received / duration}
+
+
+async def main(args):
+    push_interval = 1.0 / args.push_rate if args.push_rate else None
+    sim = WebOsSimulator(
+        port=0, response_delay=args.delay / 1e3, push_interval=push_interval
+    )
+    async with sim:
+        key_file = temp_key_file()
+        results = {}
+        results["connect"] = await bench_connect(sim, key_file, args.connects)
+        results["connect_minimal"] = await bench_connect(
+            sim, key_file, args.connects, SUBSCRIPTIONS_MINIMAL
+        )
+
+        client = WebOsClient(
+            "127.0.0.1", key_file_path=key_file, port=sim.port, metrics=args.metrics
+        )
+        await client.connect()
+        results["request_raw_sequential"] = await bench_raw_sequential(
+            sim, args.requests
+        )
+        results["request_sequential"] = await bench_sequential(client, args.requests)
+        results["request_sequential"]["p99_ratio"] = (
+            results["request_sequential"]["p99_ms"]
+            / results["request_raw_sequential"]["p99_ms"]
+        )
+        results["request_concurrent"] = await bench_concurrent(
+            client, args.requests, args.concurrency
+        )
+        results["request_many"] = await bench_request_many(
+            client, args.batches, args.batch_size
+        )
+        results["input"] = await bench_input(client, sim, args.presses)
+        results["pointer"] = await bench_pointer(
+            client, args.pointer_events, args.pointer_rate
+        )
+        results["ddc_reset"] = await bench_ddc_reset(client, args.resets)
+        if push_interval is not None:
+            results["subscription_push"] = await bench_push(client, sim, args.duration)
+        if args.metrics:
+            snapshot = client.metrics.snapshot()
+            results["metrics"] = {
+                "messages_sent": snapshot["messages_sent"],
+                "messages_received": snapshot["messages_received"],
+                "bytes_sent": snapshot["bytes_sent"],
+                "bytes_received": snapshot["bytes_received"],
+                "max_in_flight": snapshot["max_in_flight"],
+            }
+        await client.disconnect()
+
+    report("webos_client", results, as_json=args.json)
+
+    failed = False
+    if args.max_p99 is not None:
+        p99 = results["request_sequential"]["p99_ms"]
+        if p99 > args.max_p99:
+            print(f"request p99 {p99:.3f} ms exceeds limit {args.max_p99} ms")
+            failed = True
+    if args.max_p99_ratio is not None:
+        ratio = results["request_sequential"]["p99_ratio"]
+        if ratio > args.max_p99_ratio:
+            print(
+                f"request p99 is {ratio:.2f} times the bare websockets p99,"
+                f" exceeding limit {args.max_p99_ratio}"
+            )
+            failed = True
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--connects", type=int, default=20)
+    parser.add_argument("--batches", type=int, default=50)
+    parser.add_argument("--batch-size", type=int, default=10)
+    parser.add_argument("--presses", type=int, default=200)
+    parser.add_argument("--resets", type=int, default=10)
+    parser.add_argument("--pointer-events", type=int, default=120)
+    parser.add_argument(
+        "--pointer-rate", type=float, default=240.0, help="pointer events per second"
+    )
+    parser.add_argument(
+        "--delay", type=float, default=0.0, help="simulated tv response delay in ms"
+    )
+    parser.add_argument(
+        "--push-rate",
+        type=float,
+        default=None,
+        help="simulated subscription push events per second",
+    )
+    parser.add_argument("--duration", type=float, default=2.0)
+    parser.add_argument(
+        "--max-p99",
+        type=float,
+        default=None,
+        help="fail if sequential request p99 latency exceeds this many ms",
+    )
+    parser.add_argument(
+        "--max-p99-ratio",
+        type=float,
+        default=None,
+        help="fail if sequential request p99 latency exceeds this many times the bare websockets p99",
+    )
+    parser.add_argument(
+        "--metrics", action="store_true", help="enable client instrumentation"
+    )
+    parser.add_argument("--json", action="store_true", help="print results as json")
+    sys.exit(asyncio.run(main(parser.parse_args())))
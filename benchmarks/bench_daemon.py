@@ -0,0 +1,65 @@
+"""Benchmark of one-off commands run directly and through the command daemon.
+
+Direct mode connects, runs the command and disconnects, as aiopylgtvcommand
+does without a daemon.  Daemon mode sends the command over the Unix socket to
+a CommandDaemon holding a warm connection to the local webOS simulator.  Run
+from the repository root:
+
+    python benchmarks/bench_daemon.py --commands 50
+"""
+
+import argparse
+import asyncio
+import os
+import tempfile
+import time
+
+from common import report, summarize, temp_key_file
+
+from aiopylgtv import WebOsClient
+from aiopylgtv.daemon import CommandDaemon, send_commands
+from aiopylgtv.simulator import WebOsSimulator
+
+
+async def bench_direct(sim, key_file, commands):
+    samples = []
+    for _ in range(commands):
+        start = time.perf_counter()
+        client = WebOsClient("127.0.0.1", key_file_path=key_file, port=sim.port)
+        await client.connect()
+        await client.get_volume()
+        await client.disconnect()
+        samples.append(time.perf_counter() - start)
+    return summarize(samples)
+
+
+async def bench_daemon(socket_path, commands):
+    request = {"host": "127.0.0.1", "command": "get_volume"}
+    samples = []
+    for _ in range(commands):
+        start = time.perf_counter()
+        await send_commands([request], socket_path)
+        samples.append(time.perf_counter() - start)
+    return summarize(samples)
+
+
+async def main(args):
+    socket_path = os.path.join(tempfile.mkdtemp(), "aiopylgtv.sock")
+    async with WebOsSimulator(port=0, response_delay=args.delay / 1e3) as sim:
+        key_file = temp_key_file()
+        results = {"direct": await bench_direct(sim, key_file, args.commands)}
+        async with CommandDaemon(
+            socket_path, ["127.0.0.1"], key_file_path=key_file, port=sim.port
+        ):
+            results["daemon"] = await bench_daemon(socket_path, args.commands)
+    report("daemon", results, as_json=args.json)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--commands", type=int, default=50)
+    parser.add_argument(
+        "--delay", type=float, default=1.0, help="simulated tv response delay in ms"
+    )
+    parser.add_argument("--json", action="store_true", help="print results as json")
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,90 @@
+"""Micro-benchmark of inbound message dispatch in WebOsClient.consumer_handler.
+
+Feeds pre-encoded SSAP frames straight into consumer_handler, without any
+network, and reports messages per second for each installed json backend.
+"Matched" frames answer pending requests, "unmatched" frames are large
+launch point lists with ids nobody waits for, which are dropped after the id
+pre-scan.  Run from the repository root:
+
+    python benchmarks/bench_dispatch.py --messages 20000
+"""
+import argparse
+import asyncio
+import json
+import time
+
+from common import report, temp_key_file
+
+from aiopylgtv import WebOsClient
+from aiopylgtv.json_backend import available_backends
+
+
+def launch_points(count):
+    return [
+        {
+            "id": f"com.example.app{i}",
+            "title": f"App {i}",
+            "icon": f"http://127.0.0.1:3000/resources/{'0' * 40}/icon{i}.png",
+            "bgColor": "#000000",
+            "removable": True,
+            "systemApp": False,
+        }
+        for i in range(count)
+    ]
+
+
+def make_frames(count, matched, apps):
+    if matched:
+        payload = {"returnValue": True, "volume": 10, "muted": False}
+    else:
+        payload = {"returnValue": True, "launchPoints": launch_points(apps)}
+    offset = 0 if matched else count
+    return [
+        json.dumps({"type": "response", "id": offset + i, "payload": payload})
+        for i in range(count)
+    ]
+
+
+async def frames_ws(frames):
+    for frame in frames:
+        yield frame
+
+
+async def dispatch(client, frames, matched):
+    futures = {}
+    if matched:
+        loop = asyncio.get_running_loop()
+        futures = {i: loop.create_future() for i in range(len(frames))}
+    client.futures = futures
+    # register one unrelated future so the dispatcher does not short cut
+    client.futures[-1] = asyncio.get_running_loop().create_future()
+
+    start = time.perf_counter()
+    await client.consumer_handler(frames_ws(frames), client.callbacks, client.futures)
+    elapsed = time.perf_counter() - start
+    if matched and not all(future.done() for i, future in futures.items() if i >= 0):
+        raise RuntimeError("not all requests were answered")
+    return len(frames) / elapsed
+
+
+async def main(args):
+    results = {}
+    key_file = temp_key_file()
+    for backend in available_backends():
+        client = WebOsClient("127.0.0.1", key_file_path=key_file, json_backend=backend)
+        for matched in (True, False):
+            frames = make_frames(args.messages, matched, args.apps)
+            rate = await dispatch(client, frames, matched)
+            kind = "matched" if matched else "unmatched"
+            results[f"{backend}_{kind}"] = {"messages_per_s": rate}
+    report("consumer_handler", results, as_json=args.json)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--messages", type=int, default=20000)
+    parser.add_argument(
+        "--apps", type=int, default=40, help="launch points per unmatched frame"
+    )
+    parser.add_argument("--json", action="store_true", help="print results as json")
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,105 @@
+"""Scaling benchmark of WebOsFleet against the local webOS simulator.
+
+Each simulated tv gets its own loopback address (127.0.0.2, 127.0.0.3, ...,
+which requires a platform that routes all of 127.0.0.0/8 to loopback, such as
+Linux).  The simulator runs in a separate process, so for each fleet size the
+time for connect_all and the Python memory allocated per connected client only
+cover the client side.  Run from the repository root:
+
+    python benchmarks/bench_fleet.py --sizes 10 50 100 200
+"""
+import argparse
+import asyncio
+import multiprocessing
+import socket
+import time
+import tracemalloc
+
+from common import report, temp_key_file
+
+from aiopylgtv import WebOsFleet
+from aiopylgtv.simulator import WebOsSimulator
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def loopback_hosts(count):
+    return [f"127.0.{(i + 2) // 256}.{(i + 2) % 256}" for i in range(count)]
+
+
+def run_simulator(hosts, port, delay, ready, stop):
+    async def serve():
+        async with WebOsSimulator(host=hosts, port=port, response_delay=delay):
+            ready.set()
+            while not stop.is_set():
+                await asyncio.sleep(0.1)
+
+    asyncio.run(serve())
+
+
+async def bench_size(size, max_concurrent_connects, delay):
+    hosts = loopback_hosts(size)
+    port = free_port()
+    ready = multiprocessing.Event()
+    stop = multiprocessing.Event()
+    simulator = multiprocessing.Process(
+        target=run_simulator, args=(hosts, port, delay, ready, stop)
+    )
+    simulator.start()
+    try:
+        if not ready.wait(timeout=30):
+            raise RuntimeError("simulator did not start")
+        fleet = WebOsFleet(
+            hosts,
+            key_file_path=temp_key_file(),
+            max_concurrent_connects=max_concurrent_connects,
+            port=port,
+            ping_interval=None,
+        )
+        tracemalloc.start()
+        before = tracemalloc.get_traced_memory()[0]
+        start = time.perf_counter()
+        results = await fleet.connect_all()
+        elapsed = time.perf_counter() - start
+        after = tracemalloc.get_traced_memory()[0]
+        tracemalloc.stop()
+
+        summary = fleet.summary()
+        await fleet.stop()
+    finally:
+        stop.set()
+        simulator.join()
+
+    failures = sum(1 for result in results.values() if result is not True)
+    return {
+        "connect_all_s": elapsed,
+        "per_client_ms": 1e3 * elapsed / size,
+        "kib_per_client": (after - before) / 1024.0 / size,
+        "connected": summary["connected"],
+        "key_file_reads": fleet.key_store.reads,
+        "failures": failures,
+    }
+
+
+async def main(args):
+    results = {}
+    for size in args.sizes:
+        results[f"fleet_{size}"] = await bench_size(
+            size, args.max_concurrent_connects, args.delay / 1e3
+        )
+    report("webos_fleet", results, as_json=args.json)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10, 50, 100, 200])
+    parser.add_argument("--max-concurrent-connects", type=int, default=10)
+    parser.add_argument(
+        "--delay", type=float, default=0.0, help="simulated tv response delay in ms"
+    )
+    parser.add_argument("--json", action="store_true", help="print results as json")
+    asyncio.run(main(parser.parse_args()))
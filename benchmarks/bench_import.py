@@ -0,0 +1,82 @@
+"""Import time and memory benchmark of aiopylgtv.
+
+Each sample imports the package in a fresh interpreter and reports the import
+time, the peak RSS of the process and whether NumPy was imported.  With
+--check the script fails if importing the client imports NumPy.  Run from the
+repository root:
+
+    python benchmarks/bench_import.py --rounds 20 --check
+"""
+
+import argparse
+import json
+import subprocess
+import sys
+
+from common import report, summarize
+
+PROBE = """
+import json, resource, sys, time
+start = time.perf_counter()
+{statement}
+duration = time.perf_counter() - start
+print(json.dumps({{
+    "duration": duration,
+    "maxrss_kb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+    "numpy": "numpy" in sys.modules,
+}}))
+"""
+
+CASES = {
+    "baseline": "pass",
+    "client": "import aiopylgtv",
+    "client_scalar_calibration": (
+        "import aiopylgtv\n"
+        "from aiopylgtv.cal_encoding import encode_values\n"
+        "encode_values((50,), 'uint16')"
+    ),
+    "lut_tools": "import aiopylgtv; aiopylgtv.unity_lut_3d",
+}
+
+
+def probe(statement):
+    output = subprocess.run(
+        [sys.executable, "-c", PROBE.format(statement=statement)],
+        check=True,
+        capture_output=True,
+        text=True,
+    ).stdout
+    return json.loads(output)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rounds", type=int, default=10)
+    parser.add_argument("--json", action="store_true")
+    parser.add_argument(
+        "--check",
+        action="store_true",
+        help="exit with an error if importing the client imports NumPy",
+    )
+    args = parser.parse_args()
+
+    results = {}
+    numpy_imported = {}
+    for name, statement in CASES.items():
+        samples = [probe(statement) for _ in range(args.rounds)]
+        results[f"{name}_import"] = summarize([s["duration"] for s in samples])
+        results[f"{name}_maxrss_kb"] = max(s["maxrss_kb"] for s in samples)
+        numpy_imported[name] = any(s["numpy"] for s in samples)
+        results[f"{name}_numpy"] = numpy_imported[name]
+
+    report("import", results, args.json)
+
+    if args.check and (
+        numpy_imported["client"] or numpy_imported["client_scalar_calibration"]
+    ):
+        print("importing aiopylgtv imported NumPy", file=sys.stderr)
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
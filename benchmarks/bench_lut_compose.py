@@ -0,0 +1,102 @@
+"""Benchmark of 3D LUT composition in aiopylgtv.lut_tools.
+
+Folds a 1D curve, a 3x3 matrix and a correction cube into one 3D LUT with
+compose_lut_3d, and compares it against applying each stage point by point
+over the same lattice.  Run from the repository root:
+
+    python benchmarks/bench_lut_compose.py --sizes 17 33
+"""
+
+import argparse
+import time
+
+import numpy as np
+from common import report
+
+from aiopylgtv.lut_tools import compose_lut_3d, curve_lut_1d, lattice_coordinates_3d
+
+MATRIX = np.array([[0.92, 0.06, 0.02], [0.03, 0.95, 0.02], [0.01, 0.04, 0.95]])
+
+
+def make_cube(n):
+    """Smooth correction cube with channel crosstalk."""
+    rgb = lattice_coordinates_3d(n)
+    mixed = rgb @ np.array([[0.9, 0.05, 0.05], [0.1, 0.8, 0.1], [0.0, 0.1, 0.9]]).T
+    lut = np.rint(np.clip(mixed, 0.0, 1.0) ** (1.0 / 1.1) * 4096.0)
+    return np.clip(lut, 0, 4095).astype(np.uint16)
+
+
+def tetrahedral_point(table, m, rgb):
+    pos = [min(max(c, 0.0), 1.0) * (m - 1) for c in rgb]
+    base = [min(int(p), m - 2) for p in pos]
+    frac = [p - i for p, i in zip(pos, base)]
+    order = sorted(range(3), key=lambda axis: -frac[axis])
+    corner = list(base)
+    value = (1.0 - frac[order[0]]) * table[corner[2], corner[1], corner[0]]
+    for k, axis in enumerate(order):
+        corner[axis] += 1
+        nxt = frac[order[k + 1]] if k < 2 else 0.0
+        value = value + (frac[axis] - nxt) * table[corner[2], corner[1], corner[0]]
+    return value
+
+
+def per_point_compose(n, curve, matrix, cube):
+    """Apply the curve, matrix and cube stages separately to every point."""
+    m = cube.shape[0]
+    table = cube.astype(np.float64)
+    x = np.linspace(0.0, 1.0, curve.shape[1])
+    curve = curve / 32767.0
+    out = np.empty((n, n, n, 3))
+    for b in range(n):
+        for g in range(n):
+            for r in range(n):
+                rgb = [c / (n - 1) for c in (r, g, b)]
+                rgb = [float(np.interp(v, x, curve[i])) for i, v in enumerate(rgb)]
+                rgb = [
+                    min(max(sum(matrix[i][j] * rgb[j] for j in range(3)), 0.0), 1.0)
+                    for i in range(3)
+                ]
+                out[b, g, r] = tetrahedral_point(table, m, rgb)
+    return np.clip(np.rint(out), 0, 4095).astype(np.uint16)
+
+
+def best_of(func, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def main(args):
+    curve = curve_lut_1d("bt1886", black=0.05, white=120.0)
+    cube = make_cube(args.cube_size)
+    results = {}
+    for n in args.sizes:
+        t_vec, lut_vec = best_of(
+            lambda: compose_lut_3d(n, curve=curve, matrix=MATRIX, cube=cube),
+            args.repeat,
+        )
+        t_ref, lut_ref = best_of(
+            lambda: per_point_compose(n, curve, MATRIX.tolist(), cube), 1
+        )
+        error = int(np.max(np.abs(lut_vec.astype(int) - lut_ref.astype(int))))
+        if error > 1:
+            raise RuntimeError(f"compose differs from per-point by {error} at {n}")
+        results[f"compose_{n}"] = {
+            "per_point_ms": 1e3 * t_ref,
+            "vectorized_ms": 1e3 * t_vec,
+            "speedup": t_ref / t_vec,
+            "max_error": error,
+        }
+    report("lut_tools.compose_lut_3d", results, as_json=args.json)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[17, 33])
+    parser.add_argument("--cube-size", type=int, default=33)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--json", action="store_true", help="print results as json")
+    main(parser.parse_args())
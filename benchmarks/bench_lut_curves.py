@@ -0,0 +1,113 @@
+"""Benchmark of the analytic 1D LUT generators in aiopylgtv.lut_tools.
+
+Compares curve_lut_1d, both uncached and memoized, against evaluating the
+same curve per point with the math module, and checks that both agree.  Run
+from the repository root:
+
+    python benchmarks/bench_lut_curves.py --repeat 20
+"""
+import argparse
+import math
+import time
+
+import numpy as np
+from common import report
+
+from aiopylgtv.lut_tools import (
+    HLG_A,
+    HLG_B,
+    HLG_C,
+    PQ_C1,
+    PQ_C2,
+    PQ_C3,
+    PQ_M1,
+    PQ_M2,
+    PQ_PEAK,
+    _cached_curve_lut_1d,
+    curve_lut_1d,
+)
+
+CASES = {
+    "gamma": {"gamma": 2.2},
+    "bt1886": {"black": 0.05, "white": 120.0},
+    "pq": {"peak": 1000.0, "rolloff": False},
+    "hlg": {"peak": 1000.0},
+}
+
+
+def reference_point(curve, x, params):
+    """Per-point evaluation of the curves without roll-off."""
+    if curve == "gamma":
+        return x ** params["gamma"]
+    if curve == "bt1886":
+        gamma = 2.4
+        white_root = params["white"] ** (1.0 / gamma)
+        black_root = params["black"] ** (1.0 / gamma)
+        a = (white_root - black_root) ** gamma
+        b = black_root / (white_root - black_root)
+        return a * (x + b) ** gamma / params["white"]
+    if curve == "pq":
+        p = x ** (1.0 / PQ_M2)
+        luminance = PQ_PEAK * (max(p - PQ_C1, 0.0) / (PQ_C2 - PQ_C3 * p)) ** (
+            1.0 / PQ_M1
+        )
+        return min(luminance, params["peak"]) / params["peak"]
+    if curve == "hlg":
+        gamma = 1.2 + 0.42 * math.log10(params["peak"] / 1000.0)
+        if x <= 0.5:
+            scene = x * x / 3.0
+        else:
+            scene = (math.exp((x - HLG_C) / HLG_A) + HLG_B) / 12.0
+        return scene ** gamma
+    raise ValueError(curve)
+
+
+def reference_lut_1d(curve, params):
+    rows = []
+    for _ in range(3):
+        row = []
+        for i in range(1024):
+            y = reference_point(curve, i / 1023.0, params)
+            row.append(min(max(round(y * 32767.0), 0), 32767))
+        rows.append(row)
+    return np.array(rows, dtype=np.uint16)
+
+
+def best_of(func, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def main(args):
+    results = {}
+    for curve, params in CASES.items():
+
+        def uncached():
+            _cached_curve_lut_1d.cache_clear()
+            return curve_lut_1d(curve, **params)
+
+        t_ref, lut_ref = best_of(lambda: reference_lut_1d(curve, params), args.repeat)
+        t_vec, lut_vec = best_of(uncached, args.repeat)
+        t_hit, _ = best_of(lambda: curve_lut_1d(curve, **params), args.repeat)
+        error = int(np.max(np.abs(lut_vec.astype(int) - lut_ref.astype(int))))
+        if error > 1:
+            raise RuntimeError(f"{curve} differs from the reference by {error}")
+        results[curve] = {
+            "per_point_ms": 1e3 * t_ref,
+            "vectorized_ms": 1e3 * t_vec,
+            "memoized_us": 1e6 * t_hit,
+            "speedup": t_ref / t_vec,
+            "max_error": error,
+        }
+    report("lut_tools.curve_lut_1d", results, as_json=args.json)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=10)
+    parser.add_argument("--json", action="store_true", help="print results as json")
+    main(parser.parse_args())
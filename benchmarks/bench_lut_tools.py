@@ -0,0 +1,79 @@
+"""Benchmark of the .cube file parser in aiopylgtv.lut_tools.
+
+Compares read_cube_file against the previous np.genfromtxt based parser for
+the 3D LUT sizes used by the supported TVs.  Run from the repository root:
+
+    python benchmarks/bench_lut_tools.py --sizes 17 33 65
+"""
+import argparse
+import os
+import tempfile
+import time
+
+import numpy as np
+from common import report
+
+from aiopylgtv.lut_tools import read_cube_file
+
+
+def write_cube(filename, size, seed=0):
+    rng = np.random.default_rng(seed)
+    table = rng.random((size ** 3, 3))
+    with open(filename, "w") as f:
+        f.write('TITLE "benchmark"\n')
+        f.write(f"LUT_3D_SIZE {size}\n\n")
+        np.savetxt(f, table, fmt="%.6f")
+
+
+def genfromtxt_read_cube_file(filename):
+    """Reference implementation of the original genfromtxt parse path."""
+    with open(filename) as f:
+        lines = f.readlines()
+    nheader = 0
+    size = None
+    for line in lines:
+        splitline = line.split("#")[0].split()
+        if splitline and splitline[0] == "LUT_3D_SIZE":
+            size = int(splitline[1])
+        elif splitline and splitline[0] != "TITLE":
+            break
+        nheader += 1
+    lut = np.genfromtxt(lines[nheader:], comments="#", dtype=np.float64)
+    lut = np.reshape(lut, (size, size, size, 3))
+    lut = np.rint(lut * 4096.0).astype(np.uint16)
+    return np.clip(lut, 0, 4095)
+
+
+def best_of(func, filename, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func(filename)
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def main(args):
+    results = {}
+    with tempfile.TemporaryDirectory() as tmpdir:
+        for size in args.sizes:
+            filename = os.path.join(tmpdir, f"lut{size}.cube")
+            write_cube(filename, size)
+            t_new, lut_new = best_of(read_cube_file, filename, args.repeat)
+            t_old, lut_old = best_of(genfromtxt_read_cube_file, filename, args.repeat)
+            if not np.array_equal(lut_new, lut_old):
+                raise RuntimeError(f"parsers disagree for size {size}")
+            results[f"read_cube_file_{size}"] = {
+                "genfromtxt_ms": 1e3 * t_old,
+                "bulk_ms": 1e3 * t_new,
+                "speedup": t_old / t_new,
+            }
+    report("lut_tools.read_cube_file", results, as_json=args.json)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[17, 33, 65])
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--json", action="store_true", help="print results as json")
+    main(parser.parse_args())
@@ -0,0 +1,47 @@
+import json
+import os
+import statistics
+import tempfile
+
+
+def percentile(values, q):
+    """Return the q-th percentile of values using nearest-rank."""
+    ordered = sorted(values)
+    if not ordered:
+        return float("nan")
+    rank = max(0, min(len(ordered) - 1, int(round(q / 100.0 * len(ordered))) - 1))
+    return ordered[rank]
+
+
+def summarize(samples):
+    """Summarize a list of durations in seconds as milliseconds."""
+    return {
+        "n": len(samples),
+        "mean_ms": 1e3 * statistics.mean(samples),
+        "p50_ms": 1e3 * percentile(samples, 50),
+        "p99_ms": 1e3 * percentile(samples, 99),
+        "max_ms": 1e3 * max(samples),
+    }
+
+
+def temp_key_file():
+    """Return a key file path in a fresh temporary directory."""
+    return os.path.join(tempfile.mkdtemp(prefix="aiopylgtv-bench-"), "keys.json")
+
+
+def report(name, results, as_json=False):
+    if as_json:
+        print(json.dumps({"benchmark": name, "results": results}))
+        return
+    print(f"== {name}")
+    for key, value in results.items():
+        if isinstance(value, dict):
+            fields = "  ".join(
+                f"{k}={v:.3f}" if isinstance(v, float) else f"{k}={v}"
+                for k, v in value.items()
+            )
+            print(f"  {key:<28} {fields}")
+        elif isinstance(value, float):
+            print(f"  {key:<28} {value:.3f}")
+        else:
+            print(f"  {key:<28} {value}")
@@ -7,6 +7,7 @@ setup(
     name="aiopylgtv",
     packages=["aiopylgtv"],
     install_requires=["websockets>=8.1", "numpy>=1.17.0"],
+    extras_require={"fastjson": ["orjson"]},
     python_requires=">=3.7",
     zip_safe=True,
     version="0.2.5",
@@ -19,6 +20,9 @@ setup(
     keywords=["webos", "tv"],
     classifiers=[],
     entry_points={
-        "console_scripts": ["aiopylgtvcommand=aiopylgtv.utils:aiopylgtvcommand"]
+        "console_scripts": [
+            "aiopylgtvcommand=aiopylgtv.utils:aiopylgtvcommand",
+            "aiopylgtvdaemon=aiopylgtv.daemon:aiopylgtvdaemon",
+        ]
     },
 )
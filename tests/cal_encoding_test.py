@@ -0,0 +1,48 @@
+import base64
+
+import numpy as np
+
+from aiopylgtv.cal_encoding import CalibrationPayloadCache, encode_values
+from aiopylgtv.lut_tools import unity_lut_3d
+
+
+def decode(dataenc, like):
+    return np.frombuffer(base64.b64decode(dataenc), dtype=like.dtype).reshape(
+        like.shape
+    )
+
+
+def test_cache_hit_for_equal_arrays():
+    cache = CalibrationPayloadCache()
+    lut = unity_lut_3d(17)
+    first = cache.encode(lut)
+    assert cache.encode(lut.copy()) == first
+    assert (cache.hits, cache.misses) == (1, 1)
+    np.testing.assert_array_equal(decode(first, lut), lut)
+
+
+def test_readonly_array_made_writable_again():
+    cache = CalibrationPayloadCache()
+    lut = unity_lut_3d(17)
+    lut.flags.writeable = False
+    cache.encode(lut)
+
+    lut.flags.writeable = True
+    lut[0, 0, 0] = 1234
+    lut.flags.writeable = False
+    np.testing.assert_array_equal(decode(cache.encode(lut), lut), lut)
+
+
+def test_readonly_view_of_changed_base():
+    cache = CalibrationPayloadCache()
+    base = unity_lut_3d(17)
+    view = base[...]
+    view.flags.writeable = False
+    cache.encode(view)
+
+    base[0, 0, 0] = 1234
+    np.testing.assert_array_equal(decode(cache.encode(view), view), base)
+
+
+def test_encode_values():
+    assert encode_values((26,), "uint16") == "GgA="
@@ -0,0 +1,188 @@
+import asyncio
+import contextlib
+import json
+
+import pytest
+
+from aiopylgtv import PyLGTVCmdException, WebOsClient
+from aiopylgtv import cal_commands as cal
+from aiopylgtv import endpoints as ep
+from aiopylgtv.key_store import KeyStore
+from aiopylgtv.simulator import WebOsSimulator
+
+
+class CalibrationSimulator(WebOsSimulator):
+    """Simulator which records calibration commands and can fail them."""
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self.commands = []
+        self.payloads = []
+        self.failing_commands = set()
+        self.silent_commands = set()
+
+    async def respond(self, ws, msg):
+        if msg.get("uri") == f"ssap://{ep.CALIBRATION}":
+            command = msg["payload"]["command"]
+            self.commands.append(command)
+            self.payloads.append(msg["payload"])
+            if command in self.failing_commands:
+                response = {"type": "error", "id": msg.get("id")}
+                response["payload"] = {"returnValue": False}
+                await ws.send(json.dumps(response))
+                return
+            if command in self.silent_commands:
+                return
+        await super().respond(ws, msg)
+
+
+@contextlib.asynccontextmanager
+async def calibration_client(tmp_path, sim, **kwargs):
+    store = KeyStore(str(tmp_path / "keys.json"), save_delay=None)
+    client = WebOsClient("127.0.0.1", port=sim.port, key_store=store, **kwargs)
+    await client.connect()
+    try:
+        yield client
+    finally:
+        await client.disconnect()
+
+
+def test_transaction_brackets_steps(tmp_path):
+    async def run():
+        async with CalibrationSimulator(port=0) as sim:
+            async with calibration_client(tmp_path, sim) as client:
+                tx = client.calibration_transaction("expert1")
+                await tx.add(client.set_oled_light, 26)
+                await tx.add(client.set_contrast, 85)
+                await tx.add(client.set_1d_2_2_en)
+                results = await tx.commit()
+
+        assert sim.commands == [
+            cal.CAL_START,
+            cal.BACKLIGHT_UI_DATA,
+            cal.CONTRAST_UI_DATA,
+            cal.ENABLE_GAMMA_2_2_TRANSFORM,
+            cal.CAL_END,
+        ]
+        assert len(results) == 3
+        assert [timing["command"] for timing in tx.timings] == sim.commands
+        assert all(timing["error"] is None for timing in tx.timings)
+
+    asyncio.run(run())
+
+
+def test_transaction_stops_after_failed_step(tmp_path):
+    async def run():
+        async with CalibrationSimulator(port=0) as sim:
+            sim.failing_commands.add(cal.CONTRAST_UI_DATA)
+            async with calibration_client(tmp_path, sim) as client:
+                tx = client.calibration_transaction("expert1", max_in_flight=1)
+                await tx.add(client.set_oled_light, 26)
+                await tx.add(client.set_contrast, 85)
+                await tx.add(client.set_color, 50)
+                await tx.add(client.set_brightness, 50)
+                with pytest.raises(PyLGTVCmdException):
+                    await tx.commit()
+
+        # the remaining steps are not sent, but calibration mode is left
+        assert sim.commands == [
+            cal.CAL_START,
+            cal.BACKLIGHT_UI_DATA,
+            cal.CONTRAST_UI_DATA,
+            cal.CAL_END,
+        ]
+        steps = [
+            timing for timing in tx.timings if timing["command"] == cal.COLOR_UI_DATA
+        ]
+        assert steps[0]["duration"] is None
+        assert isinstance(steps[0]["error"], PyLGTVCmdException)
+
+    asyncio.run(run())
+
+
+def test_transaction_default_window_after_failed_step(tmp_path):
+    async def run():
+        async with CalibrationSimulator(port=0) as sim:
+            sim.failing_commands.add(cal.CONTRAST_UI_DATA)
+            async with calibration_client(tmp_path, sim) as client:
+                tx = client.calibration_transaction("expert1")
+                await tx.add(client.set_oled_light, 26)
+                await tx.add(client.set_contrast, 85)
+                await tx.add(client.set_color, 50)
+                await tx.add(client.set_brightness, 50)
+                await tx.add(client.set_1d_2_2_en)
+                with pytest.raises(PyLGTVCmdException):
+                    await tx.commit()
+
+        # at most the one step written while the failed one was in flight
+        # follows it
+        assert sim.commands[:3] == [
+            cal.CAL_START,
+            cal.BACKLIGHT_UI_DATA,
+            cal.CONTRAST_UI_DATA,
+        ]
+        assert sim.commands[3:] in ([cal.CAL_END], [cal.COLOR_UI_DATA, cal.CAL_END])
+
+    asyncio.run(run())
+
+
+def test_transaction_records_metrics(tmp_path):
+    async def run():
+        async with CalibrationSimulator(port=0) as sim:
+            async with calibration_client(tmp_path, sim, metrics=True) as client:
+                await client.ddc_reset("expert1")
+                return client.metrics.snapshot()
+
+    snapshot = asyncio.run(run())
+    assert snapshot["requests"][ep.CALIBRATION]["count"] == 7
+
+
+def test_ddc_reset_stops_after_failed_step(tmp_path):
+    async def run():
+        async with CalibrationSimulator(port=0) as sim:
+            sim.failing_commands.add(cal.ENABLE_GAMMA_2_2_TRANSFORM)
+            async with calibration_client(tmp_path, sim) as client:
+                with pytest.raises(PyLGTVCmdException):
+                    await client.ddc_reset("expert1")
+
+        # at most one more step is sent after the failed one
+        assert sim.commands[0] == cal.ENABLE_GAMMA_2_2_TRANSFORM
+        assert len(sim.commands) <= 2
+
+    asyncio.run(run())
+
+
+def test_pipelined_step_times_out(tmp_path):
+    async def run():
+        async with CalibrationSimulator(port=0) as sim:
+            sim.silent_commands.add(cal.UPLOAD_3D_LUT_BT709)
+            async with calibration_client(tmp_path, sim, request_timeout=0.3) as client:
+                start = asyncio.get_running_loop().time()
+                with pytest.raises(asyncio.TimeoutError):
+                    await asyncio.wait_for(client.ddc_reset("expert1"), 5.0)
+                assert asyncio.get_running_loop().time() - start < 2.0
+                assert client.futures == {}
+                assert client.expired_requests == 1
+
+                # a transaction timeout overrides the client request_timeout
+                tx = client.calibration_transaction("expert1", timeout=0.1)
+                await tx.add(client.upload_3d_lut_bt709)
+                with pytest.raises(asyncio.TimeoutError):
+                    await asyncio.wait_for(tx.commit(), 5.0)
+                assert tx.timings[1]["duration"] < 0.3
+                assert isinstance(tx.timings[1]["error"], asyncio.TimeoutError)
+
+    asyncio.run(run())
+
+
+def test_ui_data_float_value(tmp_path):
+    async def run():
+        async with CalibrationSimulator(port=0) as sim:
+            async with calibration_client(tmp_path, sim) as client:
+                await client.set_oled_light("expert1", 26.0)
+                await client.set_contrast("expert1", "85")
+                with pytest.raises(ValueError):
+                    await client.set_contrast("expert1", 100.5)
+        assert [payload["data"] for payload in sim.payloads] == ["GgA=", "VQA="]
+
+    asyncio.run(run())
@@ -0,0 +1,61 @@
+import pytest
+
+from aiopylgtv.capabilities import (
+    NO_CALIBRATION_SUPPORT,
+    calibration_support,
+    parse_model_name,
+)
+
+
+@pytest.mark.parametrize(
+    "model_name, lut3d_size, custom_tone_mapping, dv_config_type",
+    [
+        ("OLED65C9PUA", 33, True, 2019),
+        ("OLED55B9PLA", 17, True, 2019),
+        ("OLED65E8PUA", 33, False, 2018),
+        ("OLED55B8PLA", 17, False, 2018),
+        ("65SM9900PUA", 33, True, 2019),
+        ("65SM9000PUA", 17, True, 2019),
+        ("55SM8600PUA", 17, True, 2019),
+        ("65SK9900PUA", 33, False, 2018),
+        ("55SK9500PLA", 17, False, 2018),
+        ("55SK8000PUA", 17, False, 2018),
+    ],
+)
+def test_supported_models(model_name, lut3d_size, custom_tone_mapping, dv_config_type):
+    assert calibration_support(model_name) == {
+        "lut1d": True,
+        "lut3d_size": lut3d_size,
+        "custom_tone_mapping": custom_tone_mapping,
+        "dv_config_type": dv_config_type,
+    }
+
+
+@pytest.mark.parametrize(
+    "model_name",
+    [
+        # unknown model years
+        "OLED65CXPUA",
+        "OLED55B7PLA",
+        "65SN9000PUA",
+        # lower series of supported years
+        "55SM7600PUA",
+        "43UK6300PLB",
+        "OLED",
+        "",
+    ],
+)
+def test_unsupported_models(model_name):
+    assert calibration_support(model_name) == NO_CALIBRATION_SUPPORT
+
+
+def test_parse_model_name():
+    assert parse_model_name("OLED65C9PUA") == ("OLED", "9", "C")
+    assert parse_model_name("65SM9900PUA") == ("S", "M", "99")
+    assert parse_model_name("LG") is None
+
+
+def test_result_is_a_copy():
+    info = calibration_support("OLED65C9PUA")
+    info["lut3d_size"] = 0
+    assert calibration_support("OLED65C9PUA")["lut3d_size"] == 33
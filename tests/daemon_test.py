@@ -0,0 +1,89 @@
+import asyncio
+import os
+import socket
+import stat
+
+import pytest
+
+from aiopylgtv.daemon import CommandDaemon, send_commands
+from aiopylgtv.key_store import KeyStore
+from aiopylgtv.utils import run_via_daemon
+
+
+def test_socket_mode(tmp_path):
+    async def run():
+        path = str(tmp_path / "daemon.sock")
+        async with CommandDaemon(path):
+            assert stat.S_IMODE(os.stat(path).st_mode) == 0o600
+            (response,) = await send_commands([{"command": "status"}], path)
+            assert response["result"]["socket_path"] == path
+        assert not os.path.exists(path)
+
+    asyncio.run(run())
+
+
+def test_refuses_running_daemon(tmp_path):
+    async def run():
+        path = str(tmp_path / "daemon.sock")
+        async with CommandDaemon(path):
+            with pytest.raises(RuntimeError):
+                await CommandDaemon(path).start()
+            # the first daemon still owns the socket
+            (response,) = await send_commands([{"command": "status"}], path)
+            assert "result" in response
+
+    asyncio.run(run())
+
+
+def test_replaces_stale_socket(tmp_path):
+    async def run():
+        path = str(tmp_path / "daemon.sock")
+        with socket.socket(socket.AF_UNIX) as sock:
+            sock.bind(path)
+        async with CommandDaemon(path):
+            (response,) = await send_commands([{"command": "status"}], path)
+            assert "result" in response
+
+    asyncio.run(run())
+
+
+def test_refuses_non_socket_path(tmp_path):
+    async def run():
+        path = tmp_path / "daemon.sock"
+        path.write_text("data")
+        with pytest.raises(RuntimeError):
+            await CommandDaemon(str(path)).start()
+        assert path.read_text() == "data"
+
+    asyncio.run(run())
+
+
+def test_no_daemon_without_getuid(monkeypatch):
+    monkeypatch.delattr(os, "getuid")
+    assert asyncio.run(send_commands([{"command": "status"}])) is None
+    assert not asyncio.run(run_via_daemon(None, "tv", "power_off", []))
+
+
+def test_no_daemon_without_unix_connections(monkeypatch, tmp_path):
+    async def unsupported(*args, **kwargs):
+        raise NotImplementedError
+
+    monkeypatch.setattr(asyncio, "open_unix_connection", unsupported)
+    path = str(tmp_path / "daemon.sock")
+    assert asyncio.run(send_commands([{"command": "status"}], path)) is None
+
+
+def test_forgets_host_which_never_connected(tmp_path):
+    async def run():
+        with socket.socket() as sock:
+            sock.bind(("127.0.0.1", 0))
+            port = sock.getsockname()[1]
+        path = str(tmp_path / "daemon.sock")
+        store = KeyStore(str(tmp_path / "keys.json"), save_delay=None)
+        async with CommandDaemon(path, port=port, key_store=store) as daemon:
+            request = {"host": "127.0.0.1", "command": "get_volume"}
+            (response,) = await send_commands([request], path)
+            assert response["exception"] == "ConnectionRefusedError"
+            assert len(daemon.fleet) == 0
+
+    asyncio.run(run())
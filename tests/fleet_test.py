@@ -0,0 +1,28 @@
+import asyncio
+
+from aiopylgtv import WebOsFleet
+from aiopylgtv.key_store import KeyStore
+from aiopylgtv.simulator import WebOsSimulator
+
+
+def test_summary_does_not_subscribe(tmp_path):
+    async def run():
+        async with WebOsSimulator(port=0) as sim:
+            store = KeyStore(str(tmp_path / "keys.json"), save_delay=None)
+            fleet = WebOsFleet(
+                ["127.0.0.1"],
+                key_store=store,
+                port=sim.port,
+                subscriptions={"current_appId"},
+            )
+            async with fleet:
+                summary = fleet.summary()
+                await asyncio.sleep(0.05)
+                client = fleet["127.0.0.1"]
+                assert "power_state" not in client._requested_fields
+                assert "power_state" not in client._subscribed_fields
+        return summary
+
+    summary = asyncio.run(run())
+    assert summary["connected"] == 1
+    assert summary["power_states"] == {None: 1}
@@ -0,0 +1,40 @@
+import json
+
+import pytest
+
+from aiopylgtv.json_backend import NO_ID, get_backend, peek_message_id
+
+
+@pytest.mark.parametrize(
+    "raw_msg, expected",
+    [
+        ('{"type": "response", "id": 5, "payload": {"id": 1}}', 5),
+        ('{"type":"response","id":"abc_7","payload":{}}', "abc_7"),
+        ('{"id": -3}', -3),
+        # the id follows the payload, which is not scanned
+        ('{"type": "response", "payload": {"id": 1}, "id": 7}', NO_ID),
+        # the first id is in a nested object
+        ('{"type": "response", "meta": {"id": 3}, "id": 4, "payload": {}}', NO_ID),
+        # string ids with escapes are left to the decoder
+        ('{"type": "response", "id": "a\\"b", "payload": {}}', NO_ID),
+        ('{"type": "response", "id": 1.5, "payload": {}}', NO_ID),
+        ('{"type": "response", "payload": {}}', NO_ID),
+        (b'{"type": "response", "id": 5, "payload": {}}', NO_ID),
+        (None, NO_ID),
+    ],
+)
+def test_peek_message_id(raw_msg, expected):
+    uid = peek_message_id(raw_msg)
+    if expected is NO_ID:
+        assert uid is NO_ID
+    else:
+        assert uid == expected == json.loads(raw_msg)["id"]
+
+
+def test_get_backend():
+    loads, dumps = get_backend("json")
+    assert loads(dumps({"id": 1})) == {"id": 1}
+    loads, dumps = get_backend()
+    assert isinstance(dumps({"id": 1}), str)
+    with pytest.raises(ValueError):
+        get_backend("pickle")
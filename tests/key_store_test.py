@@ -0,0 +1,51 @@
+import asyncio
+import gc
+import json
+
+from aiopylgtv import key_store
+from aiopylgtv.key_store import KeyStore
+
+
+def test_set_without_loop_saves_immediately(tmp_path):
+    path = str(tmp_path / "keys.json")
+    store = KeyStore(path)
+    store.set("192.168.1.2", "abc")
+    with open(path) as f:
+        assert json.load(f) == {"192.168.1.2": "abc"}
+    assert store.writes == 1
+
+
+def test_stores_are_not_kept_alive_for_exit(tmp_path):
+    gc.collect()
+    before = len(key_store._open_stores)
+    for i in range(10):
+        KeyStore(str(tmp_path / f"keys{i}.json"))
+    gc.collect()
+    assert len(key_store._open_stores) == before
+
+    store = KeyStore(str(tmp_path / "keys.json"))
+    assert store in key_store._open_stores
+    store.close()
+    assert store not in key_store._open_stores
+
+
+def test_save_scheduled_on_closed_loop_is_rescheduled(tmp_path):
+    path = str(tmp_path / "keys.json")
+    store = KeyStore(path, save_delay=60.0)
+
+    async def set_key(ip, key):
+        store.set(ip, key)
+
+    # the loop closes before the delayed save runs
+    asyncio.run(set_key("192.168.1.2", "abc"))
+    assert store.writes == 0
+
+    async def set_key_and_wait(ip, key):
+        store.save_delay = 0.01
+        store.set(ip, key)
+        await asyncio.sleep(0.05)
+
+    asyncio.run(set_key_and_wait("192.168.1.3", "def"))
+    assert store.writes == 1
+    with open(path) as f:
+        assert json.load(f) == {"192.168.1.2": "abc", "192.168.1.3": "def"}
@@ -0,0 +1,64 @@
+import os
+
+import numpy as np
+
+from aiopylgtv.lut_cache import LutCache
+from aiopylgtv.lut_tools import read_cube_file, unity_lut_1d
+
+
+def write_cube(path, scale=1.0):
+    rows = "".join(f"{x} {x} {x}\n" for x in np.linspace(0.0, scale, 16))
+    path.write_text(f"LUT_1D_SIZE 16\n{rows}")
+    return str(path)
+
+
+def test_hit_and_miss(tmp_path):
+    cache = LutCache(str(tmp_path / "cache"))
+    filename = write_cube(tmp_path / "a.cube")
+
+    lut = cache.load(filename, read_cube_file)
+    cached = cache.load(filename, read_cube_file)
+    assert (cache.hits, cache.misses) == (1, 1)
+    np.testing.assert_array_equal(cached, lut)
+    assert not cached.flags.writeable
+
+    # a changed file is converted again
+    write_cube(tmp_path / "a.cube", 0.5)
+    os.utime(filename, ns=(0, 0))
+    changed = cache.load(filename, read_cube_file)
+    assert cache.misses == 2
+    assert changed.max() < lut.max()
+
+
+def test_reader_is_part_of_the_key(tmp_path):
+    cache = LutCache(str(tmp_path / "cache"))
+    filename = write_cube(tmp_path / "a.cube")
+
+    def unity_reader(filename):
+        return unity_lut_1d()
+
+    cache.load(filename, read_cube_file)
+    assert cache.load(filename, unity_reader).shape == (3, 1024)
+    assert (cache.hits, cache.misses) == (0, 2)
+
+
+def test_eviction(tmp_path):
+    cache = LutCache(str(tmp_path / "cache"))
+    first = write_cube(tmp_path / "a.cube")
+    second = write_cube(tmp_path / "b.cube", 0.5)
+
+    cache.load(first, read_cube_file)
+    (entry,) = [path for _, _, path in cache._entries()]
+    os.utime(entry, (1, 1))
+    cache.max_bytes = os.path.getsize(entry)
+
+    cache.load(second, read_cube_file)
+    assert cache.evictions == 1
+    stats = cache.stats()
+    assert stats["entries"] == 1
+    assert stats["bytes"] <= cache.max_bytes
+    assert not os.path.exists(entry)
+
+    # the evicted lut is converted again
+    cache.load(first, read_cube_file)
+    assert cache.misses == 3
@@ -0,0 +1,139 @@
+import numpy as np
+import pytest
+
+from aiopylgtv.lut_tools import (
+    compose_lut_3d,
+    curve_lut_1d,
+    interpolate_lut_3d,
+    lattice_coordinates_3d,
+    pq_curve,
+    read_cal_file,
+    read_cube_file,
+    resample_lut_3d,
+    unity_lut_1d,
+    unity_lut_3d,
+)
+
+IDENTITY_CUBE = """\
+# identity cube
+TITLE "identity"
+LUT_3D_SIZE 2
+DOMAIN_MIN 0 0 0
+DOMAIN_MAX 1 1 1
+
+0 0 0
+1 0 0  # red
+0 1 0
+1 1 0
+0 0 1
+1 0 1
+0 1 1
+1 1 1
+"""
+
+
+def write(tmp_path, name, text):
+    path = tmp_path / name
+    path.write_text(text)
+    return str(path)
+
+
+def test_read_cube_file_3d(tmp_path):
+    lut = read_cube_file(write(tmp_path, "identity.cube", IDENTITY_CUBE))
+    assert lut.dtype == np.uint16
+    np.testing.assert_array_equal(lut, unity_lut_3d(2))
+
+
+def test_read_cube_file_1d(tmp_path):
+    text = "LUT_1D_SIZE 2\r\nDOMAIN_MAX 2 2 2\r\n0 0 0\r\n\r\n1 2 2"
+    lut = read_cube_file(write(tmp_path, "curve.cube", text))
+    np.testing.assert_array_equal(lut, [[0, 16384], [0, 32767], [0, 32767]])
+
+
+@pytest.mark.parametrize(
+    "text",
+    [
+        "LUT_1D_SIZE 2\nLUT_3D_SIZE 2\n0 0 0\n1 1 1\n",
+        "0 0 0\n1 1 1\n",
+        "LUT_1D_SIZE 3\n0 0 0\n1 1 1\n",
+        "LUT_1D_SIZE 2\n0 0 0\n1 x 1\n",
+        "LUT_3D_SIZE 1\n0 0 0\n",
+        "LUT_1D_SIZE 2\nDOMAIN_MIN 0 0\n0 0 0\n1 1 1\n",
+        "LUT_1D_SIZE 2\n0 0\n0 1 1 1\n",
+        # 24 values on 8 rows, but not 3 on each
+        "LUT_3D_SIZE 2\n0 0 0\n1 0 0 0\n1 0\n1 1 0\n0 0 1\n1 0 1\n0 1 1\n1 1 1\n",
+        "LUT_1D_SIZE 2\n0 0 0\n1 nan 1\n",
+    ],
+)
+def test_read_cube_file_invalid(tmp_path, text):
+    with pytest.raises(ValueError):
+        read_cube_file(write(tmp_path, "invalid.cube", text))
+
+
+def test_read_cal_file(tmp_path):
+    text = "CAL\n\nNUMBER_OF_SETS 2\nBEGIN_DATA\n0 0 0 0\n1 1 1 1\nEND_DATA\n"
+    lut = read_cal_file(write(tmp_path, "identity.cal", text))
+    np.testing.assert_array_equal(lut, unity_lut_1d())
+
+
+@pytest.mark.parametrize("method", ["trilinear", "tetrahedral"])
+def test_interpolate_lut_3d_at_lattice_points(method):
+    lut = np.random.default_rng(0).integers(0, 4096, (5, 5, 5, 3))
+    out = interpolate_lut_3d(lut, lattice_coordinates_3d(5), method=method)
+    np.testing.assert_allclose(out, lut)
+
+
+@pytest.mark.parametrize("method", ["trilinear", "tetrahedral"])
+def test_resample_lut_3d(method):
+    lut = resample_lut_3d(unity_lut_3d(17), 33, method=method)
+    assert lut.shape == (33, 33, 33, 3)
+    assert lut.dtype == np.uint16
+    assert np.abs(lut.astype(int) - unity_lut_3d(33)).max() <= 1
+
+    same = unity_lut_3d(9)
+    assert resample_lut_3d(same, 9) is same
+    with pytest.raises(ValueError):
+        resample_lut_3d(same, 5, method="cubic")
+
+
+def test_curve_lut_1d():
+    lut = curve_lut_1d("gamma", gamma=1.0)
+    assert lut.shape == (3, 1024)
+    assert np.abs(lut.astype(int) - unity_lut_1d()).max() <= 1
+    assert curve_lut_1d("gamma", gamma=1.0) is lut
+    assert not lut.flags.writeable
+
+    pq = curve_lut_1d("pq", peak=1000.0)
+    assert pq[0, 0] == 0 and pq[0, -1] == 32767
+    assert np.all(np.diff(pq[0].astype(int)) >= 0)
+    with pytest.raises(ValueError):
+        curve_lut_1d("srgb")
+
+
+def test_pq_curve_rolloff():
+    x = np.linspace(0.0, 1.0, 101)
+    clipped = pq_curve(x, peak=1000.0, rolloff=False)
+    rolled = pq_curve(x, peak=1000.0)
+    assert clipped.max() == pytest.approx(1.0)
+    assert rolled.max() == pytest.approx(1.0)
+    # the roll-off only compresses highlights
+    assert np.all(rolled <= clipped + 1e-12)
+    np.testing.assert_allclose(rolled[:40], clipped[:40])
+
+
+def test_compose_lut_3d():
+    np.testing.assert_array_equal(compose_lut_3d(9), unity_lut_3d(9))
+
+    swap = [[0, 0, 1], [0, 1, 0], [1, 0, 0]]
+    lut = compose_lut_3d(9, matrix=swap)
+    np.testing.assert_array_equal(lut[..., 0], unity_lut_3d(9)[..., 2])
+
+    lut = compose_lut_3d(
+        33, curve=curve_lut_1d("gamma", gamma=1.0), cube=unity_lut_3d(17)
+    )
+    assert np.abs(lut.astype(int) - unity_lut_3d(33)).max() <= 2
+
+    with pytest.raises(ValueError):
+        compose_lut_3d(9, matrix=np.eye(2))
+    with pytest.raises(ValueError):
+        compose_lut_3d(9, cube=np.zeros((3, 4, 3, 3)))
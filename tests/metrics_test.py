@@ -0,0 +1,76 @@
+import asyncio
+import json
+
+import pytest
+
+from aiopylgtv import ClientMetrics, WebOsClient
+from aiopylgtv import endpoints as ep
+from aiopylgtv.constants import SUBSCRIPTIONS_MINIMAL
+from aiopylgtv.key_store import KeyStore
+from aiopylgtv.metrics import LatencyHistogram
+from aiopylgtv.simulator import WebOsSimulator
+
+
+def test_latency_histogram():
+    hist = LatencyHistogram()
+    assert hist.snapshot()["p50"] is None
+    for latency in (0.0004, 0.003, 0.003, 0.03):
+        hist.observe(latency)
+    hist.observe(20.0, error=True)
+
+    snapshot = hist.snapshot()
+    assert snapshot["count"] == 5
+    assert snapshot["errors"] == 1
+    assert snapshot["p50"] == 0.005
+    assert snapshot["p99"] == snapshot["max"] == 20.0
+    assert snapshot["buckets"]["0.0005"] == 1
+    assert snapshot["buckets"]["0.005"] == 2
+    assert snapshot["buckets"]["+Inf"] == 1
+    assert snapshot["mean"] == pytest.approx(20.0364 / 5)
+
+
+def test_client_snapshot(tmp_path):
+    async def run():
+        async with WebOsSimulator(port=0) as sim:
+            store = KeyStore(str(tmp_path / "keys.json"), save_delay=None)
+            client = WebOsClient(
+                "127.0.0.1",
+                port=sim.port,
+                key_store=store,
+                metrics=True,
+                subscriptions=SUBSCRIPTIONS_MINIMAL,
+            )
+            await client.connect()
+            try:
+                await client.request(ep.GET_VOLUME)
+                await client.request_many([ep.GET_VOLUME, ep.GET_SOUND_OUTPUT])
+                await client.button("UP")
+            finally:
+                await client.disconnect()
+            return client.metrics.snapshot()
+
+    snapshot = asyncio.run(run())
+    # plain values, ready for export
+    assert json.loads(json.dumps(snapshot)) == snapshot
+    assert snapshot["requests"][ep.GET_VOLUME]["count"] == 2
+    assert snapshot["requests"][ep.GET_SOUND_OUTPUT]["count"] == 1
+    assert snapshot["in_flight"] == 0
+    assert snapshot["max_in_flight"] >= 2
+    assert snapshot["connects"] == 1
+    assert snapshot["messages_sent"] >= 3
+    assert snapshot["bytes_received"] > 0
+    assert snapshot["input_messages_sent"] == 1
+    assert snapshot["last_connect"]
+    assert set(snapshot["connect_phases"]) == set(snapshot["last_connect"])
+
+
+def test_shared_metrics():
+    metrics = ClientMetrics()
+    metrics.request_started()
+    metrics.request_started()
+    metrics.request_finished("a", 0.001)
+    metrics.request_finished("a", 0.002, error=True)
+    snapshot = metrics.snapshot()
+    assert snapshot["in_flight"] == 0
+    assert snapshot["max_in_flight"] == 2
+    assert snapshot["requests"]["a"]["errors"] == 1
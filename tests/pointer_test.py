@@ -0,0 +1,63 @@
+import asyncio
+
+from websockets.exceptions import ConnectionClosedError
+
+from aiopylgtv import PointerChannel, WebOsClient
+
+
+def connection_closed():
+    try:
+        return ConnectionClosedError(None, None)
+    except Exception:
+        return ConnectionClosedError(1006, "")
+
+
+class StubClient:
+    """Client whose input connection closes after sending a number of messages."""
+
+    ip = "127.0.0.1"
+    input_message = staticmethod(WebOsClient.input_message)
+
+    def __init__(self, fail_after):
+        self.fail_after = fail_after
+        self.sent = []
+
+    async def input_command(self, message):
+        if len(self.sent) >= self.fail_after:
+            raise connection_closed()
+        self.sent.append(message)
+
+
+def test_pointer_coalesces_moves():
+    async def run():
+        client = StubClient(fail_after=100)
+        pointer = PointerChannel(client, frame_rate=0)
+        for _ in range(10):
+            await pointer.move(1, 2)
+        await pointer.click()
+        await pointer.close()
+        assert client.sent == ["type:move\ndx:10\ndy:20\ndown:0\n\n", "type:click\n\n"]
+
+    asyncio.run(run())
+
+
+def test_pointer_survives_connection_closed():
+    async def run():
+        client = StubClient(fail_after=1)
+        pointer = PointerChannel(client, frame_rate=0)
+        await pointer.move(1, 1)
+        await pointer.click()
+        await pointer.scroll(0, 1)
+        await pointer.flush()
+        assert pointer.frames_sent == 1
+        assert pointer.frames_dropped == 2
+        assert not pointer._task.done()
+
+        # the sender keeps running once the connection is back
+        client.fail_after = 100
+        await pointer.move(2, 2)
+        await pointer.close()
+        assert pointer.frames_sent == 2
+        assert client.sent[-1] == "type:move\ndx:2\ndy:2\ndown:0\n\n"
+
+    asyncio.run(run())
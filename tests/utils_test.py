@@ -0,0 +1,130 @@
+import asyncio
+import json
+
+from aiopylgtv import WebOsClient
+from aiopylgtv.daemon import CommandDaemon
+from aiopylgtv.utils import read_batch, run_batch
+
+
+class CountingDaemon(CommandDaemon):
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.connections = 0
+
+    async def handle_connection(self, reader, writer):
+        self.connections += 1
+        await super().handle_connection(reader, writer)
+
+
+def outputs(capsys):
+    return [json.loads(line) for line in capsys.readouterr().out.splitlines()]
+
+
+def test_read_batch():
+    commands = read_batch(["status\n", "# comment\n", "\n", 'echo "a b" c\n'])
+    assert commands == [(1, "status", []), (4, "echo", ["a b", "c"])]
+
+    ((lineno, command, error),) = read_batch(['echo "unbalanced\n'])
+    assert (lineno, command) == (1, None)
+    assert isinstance(error, ValueError)
+
+
+def test_daemon_batch_over_one_connection(tmp_path, capsys):
+    async def run():
+        path = str(tmp_path / "daemon.sock")
+        commands = read_batch(["status", 'status "unbalanced', "bogus", "status"])
+        async with CountingDaemon(path) as daemon:
+            failures = await run_batch(None, commands, socket_path=path)
+            # one connection for the daemon probe and one for the batch
+            assert daemon.connections == 2
+        return failures
+
+    assert asyncio.run(run()) == 2
+    results = outputs(capsys)
+    assert [output["line"] for output in results] == [1, 2, 3, 4]
+    assert "result" in results[0] and "result" in results[3]
+    assert results[1]["exception"] == "ValueError"
+    assert results[2]["exception"] == "ValueError"
+    assert "id" not in results[0]
+
+
+def test_daemon_batch_connection_lost(tmp_path, capsys):
+    async def run():
+        path = str(tmp_path / "daemon.sock")
+
+        async def answer_once(reader, writer):
+            await reader.readline()
+            writer.write(b'{"id": 1, "result": true}\n')
+            await writer.drain()
+            writer.close()
+
+        server = await asyncio.start_unix_server(answer_once, path=path)
+        try:
+            commands = [(1, "one", []), (2, "two", []), (3, "three", [])]
+            return await run_batch("tv", commands, socket_path=path)
+        finally:
+            server.close()
+            await server.wait_closed()
+
+    assert asyncio.run(run()) == 2
+    results = outputs(capsys)
+    assert results[0] == {"line": 1, "command": "one", "result": True}
+    assert [output["exception"] for output in results[1:]] == [
+        "ConnectionError",
+        "ConnectionError",
+    ]
+
+
+class SlowDaemon(CountingDaemon):
+    """Daemon whose commands take a while, recording how many run at once."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.running = 0
+        self.max_running = 0
+
+    async def run_command(self, host, command, parameters=()):
+        self.running += 1
+        self.max_running = max(self.max_running, self.running)
+        try:
+            await asyncio.sleep(0.05)
+            return await super().run_command(host, command, parameters)
+        finally:
+            self.running -= 1
+
+
+def test_daemon_batch_concurrency(tmp_path, capsys):
+    async def run():
+        path = str(tmp_path / "daemon.sock")
+        commands = read_batch(["status", "status", "bogus", "status", 'x "y'])
+        async with SlowDaemon(path) as daemon:
+            failures = await run_batch(None, commands, 2, socket_path=path)
+            assert daemon.max_running == 2
+            # one connection for the daemon probe and one per worker
+            assert daemon.connections == 3
+        return failures
+
+    assert asyncio.run(run()) == 2
+    results = sorted(outputs(capsys), key=lambda output: output["line"])
+    assert [output["line"] for output in results] == [1, 2, 3, 4, 5]
+    assert [("error" in output) for output in results] == [
+        False,
+        False,
+        True,
+        False,
+        True,
+    ]
+
+
+def test_direct_batch_connect_failure(monkeypatch, capsys):
+    async def refuse(self):
+        raise ConnectionRefusedError("refused")
+
+    monkeypatch.setattr(WebOsClient, "connect", refuse)
+    commands = read_batch(["get_volume", 'x "y'])
+    assert asyncio.run(run_batch("tv", commands, use_daemon=False)) == 2
+    results = outputs(capsys)
+    assert [output["exception"] for output in results] == [
+        "ConnectionRefusedError",
+        "ValueError",
+    ]
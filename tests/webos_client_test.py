@@ -0,0 +1,366 @@
+import asyncio
+import contextlib
+import json
+
+import pytest
+
+from aiopylgtv import PyLGTVCmdException, WebOsClient
+from aiopylgtv import endpoints as ep
+from aiopylgtv.channels import ChannelTable
+from aiopylgtv.constants import SUBSCRIPTIONS_MINIMAL
+from aiopylgtv.key_store import KeyStore
+from aiopylgtv.simulator import WebOsSimulator
+
+
+class FailingSimulator(WebOsSimulator):
+    """Simulator which answers requests for failing_uris with a failure."""
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self.failing_uris = set()
+
+    async def respond(self, ws, msg):
+        uri = msg.get("uri", "")[len("ssap://") :]
+        if uri in self.failing_uris:
+            response = {"type": "error", "id": msg.get("id")}
+            response["payload"] = {"returnValue": False}
+            await ws.send(json.dumps(response))
+            return
+        await super().respond(ws, msg)
+
+
+@contextlib.asynccontextmanager
+async def connected_client(tmp_path, sim=None, **kwargs):
+    async with contextlib.AsyncExitStack() as stack:
+        if sim is None:
+            sim = await stack.enter_async_context(WebOsSimulator(port=0))
+        store = KeyStore(str(tmp_path / "keys.json"), save_delay=None)
+        client = WebOsClient("127.0.0.1", port=sim.port, key_store=store, **kwargs)
+        await client.connect()
+        try:
+            yield client, sim
+        finally:
+            await client.disconnect()
+
+
+def test_button_sequence(tmp_path):
+    async def run():
+        async with connected_client(tmp_path) as (client, sim):
+            sent = await client.button_sequence("UP,DOWN,ENTER", interval=0.01)
+            assert sent == 3
+            for _ in range(100):
+                if len(sim.input_messages) == 3:
+                    break
+                await asyncio.sleep(0.01)
+            assert sim.input_messages == [
+                "type:button\nname:UP\n\n",
+                "type:button\nname:DOWN\n\n",
+                "type:button\nname:ENTER\n\n",
+            ]
+
+    asyncio.run(run())
+
+
+def test_button_sequence_connection_dropped(tmp_path):
+    async def run():
+        async with connected_client(tmp_path) as (client, sim):
+            sequence = asyncio.create_task(
+                client.button_sequence(["UP", "DOWN", "ENTER"], interval=0.05)
+            )
+            await asyncio.sleep(0.02)
+            await client.close_connection()
+            with pytest.raises(PyLGTVCmdException):
+                await sequence
+
+    asyncio.run(run())
+
+
+def test_reconnect_delay_backoff(tmp_path):
+    store = KeyStore(str(tmp_path / "keys.json"), save_delay=None)
+    client = WebOsClient(
+        "127.0.0.1", key_store=store, reconnect_min_delay=1.0, reconnect_max_delay=60.0
+    )
+    for failures, bound in [(0, 1.0), (1, 2.0), (3, 8.0), (10, 60.0)]:
+        for _ in range(20):
+            delay = client.reconnect_delay(failures)
+            assert bound / 2.0 <= delay <= bound
+
+
+def test_reconnect_delay_after_many_failures(tmp_path):
+    store = KeyStore(str(tmp_path / "keys.json"), save_delay=None)
+    client = WebOsClient("127.0.0.1", key_store=store, reconnect_max_delay=60.0)
+    for failures in (1023, 1100, 10 ** 6):
+        assert 30.0 <= client.reconnect_delay(failures) <= 60.0
+
+
+def test_subscriptions_not_recorded_without_auto_reconnect(tmp_path):
+    async def run():
+        async with connected_client(tmp_path) as (client, sim):
+
+            async def callback(payload):
+                pass
+
+            await client.subscribe(callback, ep.GET_VOLUME)
+            assert client.user_subscriptions == {}
+
+    asyncio.run(run())
+
+
+def test_failed_subscription_replayed_on_next_reconnect(tmp_path):
+    async def run():
+        async with FailingSimulator(port=0) as sim:
+            async with connected_client(
+                tmp_path,
+                sim,
+                auto_reconnect=True,
+                reconnect_min_delay=0.01,
+                subscriptions=SUBSCRIPTIONS_MINIMAL,
+            ) as (client, sim):
+                calls = []
+
+                async def callback(payload):
+                    if payload.get("returnValue"):
+                        calls.append(payload)
+
+                await client.subscribe(callback, ep.GET_VOLUME)
+                assert len(calls) == 1
+                assert len(client.user_subscriptions) == 1
+
+                # renewing the subscription fails on the next connection
+                sim.failing_uris.add(ep.GET_VOLUME)
+                await client.close_connection()
+                await client.connect()
+                assert len(calls) == 1
+                assert len(client.user_subscriptions) == 1
+
+                # and is retried on the one after
+                sim.failing_uris.clear()
+                await client.close_connection()
+                await client.connect()
+                assert len(calls) == 2
+                assert len(client.user_subscriptions) == 1
+
+    asyncio.run(run())
+
+
+def test_lazy_subscription_on_property_access(tmp_path):
+    async def run():
+        async with connected_client(tmp_path, subscriptions=SUBSCRIPTIONS_MINIMAL) as (
+            client,
+            sim,
+        ):
+            assert client.volume is None
+            task = client._lazy_subscribe_tasks["volume"]
+            # further reads don't start another subscription
+            assert client.volume is None
+            assert client._lazy_subscribe_tasks["volume"] is task
+            await task
+            assert client.volume == 10
+            assert "volume" not in client._lazy_subscribe_tasks
+
+    asyncio.run(run())
+
+
+def test_lazy_subscription_errors_are_logged(tmp_path, caplog):
+    async def run():
+        async with FailingSimulator(port=0) as sim:
+            sim.failing_uris.add(ep.GET_VOLUME)
+            async with connected_client(
+                tmp_path, sim, subscriptions=SUBSCRIPTIONS_MINIMAL
+            ) as (client, sim):
+                assert client.volume is None
+                await client._lazy_subscribe_tasks["volume"]
+                assert client.volume is None
+
+    asyncio.run(run())
+    assert "unable to subscribe to volume" in caplog.text
+
+
+def test_calibration_support_info_without_system_info(tmp_path):
+    async def run():
+        async with connected_client(tmp_path, subscriptions=SUBSCRIPTIONS_MINIMAL) as (
+            client,
+            sim,
+        ):
+            assert client.calibration_support_info() == {}
+            await client.subscribe_state("system_info")
+            info = client.calibration_support_info()
+            assert info["lut1d"] is True
+            assert info["lut3d_size"] == 33
+
+    asyncio.run(run())
+
+
+def test_channel_table_refreshed_without_subscription(tmp_path):
+    async def run():
+        async with connected_client(tmp_path, subscriptions=SUBSCRIPTIONS_MINIMAL) as (
+            client,
+            sim,
+        ):
+            await client.set_channel_by_number("2-1")
+            with pytest.raises(PyLGTVCmdException):
+                await client.set_channel_by_number("5-1")
+
+            channels = sim.responses[ep.GET_TV_CHANNELS]["channelList"]
+            sim.responses[ep.GET_TV_CHANNELS] = {
+                "channelList": channels
+                + [{"channelId": "5_1", "channelNumber": "5-1", "channelName": "C"}]
+            }
+            await client.set_channel_by_number("5-1")
+            assert client.channel_table.by_number("5-1").channel_id == "5_1"
+
+    asyncio.run(run())
+
+
+def test_channel_list_push_updates_table(tmp_path):
+    async def run():
+        async with connected_client(tmp_path) as (client, sim):
+            assert [c["channelNumber"] for c in client.channels] == ["2-1", "4-1"]
+
+            notified = []
+
+            async def on_change(changed):
+                notified.append(changed)
+
+            await client.register_state_update_callback(on_change, {"channels"})
+            notified.clear()
+
+            await sim.push(ep.GET_TV_CHANNELS)
+            channels = [
+                {
+                    "channelId": "1_2_1_0_0_0_0",
+                    "channelNumber": "2-1",
+                    "channelName": "A",
+                },
+                {"channelId": "5_1", "channelNumber": "5-1", "channelName": "C"},
+            ]
+            await sim.push(ep.GET_TV_CHANNELS, {"channelList": channels})
+            for _ in range(100):
+                if notified:
+                    break
+                await asyncio.sleep(0.01)
+            assert len(notified) == 1
+            assert client.channels == channels
+            assert client.channel_table.by_number("4-1") is None
+
+    asyncio.run(run())
+
+
+def test_channel_table_keeps_full_entries():
+    channels = [
+        {"channelId": "1", "channelNumber": "2-1", "channelName": "A", "HDTV": True},
+        {"channelId": "2", "channelNumber": "4-1", "channelName": "B", "HDTV": False},
+    ]
+    table = ChannelTable(channels)
+    assert table.entries is channels
+    assert table.by_number("4-1").entry["HDTV"] is False
+
+    changed = [dict(channel) for channel in channels]
+    changed[0]["HDTV"] = False
+    assert table.update(changed) == (0, 0, 1)
+    assert table.by_name("a").entry is changed[0]
+    assert table.update(list(reversed(changed))) == (0, 0, 0)
+
+
+def test_update_catalog():
+    apps = [{"id": "a", "title": "A"}, {"id": "b", "title": "B"}]
+    entries = {}
+    assert WebOsClient.update_catalog(entries, apps, "id") == (["a", "b"], [], [])
+    first = entries["a"]
+
+    # decoded again, reordered and unchanged
+    same = [{"id": "b", "title": "B"}, {"id": "a", "title": "A"}]
+    assert WebOsClient.update_catalog(entries, same, "id") == ([], [], [])
+    assert entries["a"] is first
+
+    new_apps = [{"id": "a", "title": "A2"}, {"id": "c", "title": "C"}]
+    assert WebOsClient.update_catalog(entries, new_apps, "id") == (["c"], ["b"], ["a"])
+    assert entries == {"a": new_apps[0], "c": new_apps[1]}
+
+
+def test_apps_state_notified_on_change_only(tmp_path):
+    store = KeyStore(str(tmp_path / "keys.json"), save_delay=None)
+    client = WebOsClient("127.0.0.1", key_store=store)
+    catalog = []
+    notified = []
+
+    async def on_catalog(field, added, removed, changed):
+        catalog.append((field, added, removed, changed))
+
+    async def on_apps(changed):
+        notified.append(changed)
+
+    async def run():
+        client.doStateUpdate = True
+        client.register_catalog_callback(on_catalog)
+        await client.register_state_update_callback(on_apps, {"apps"})
+        notified.clear()
+        await client.set_apps_state([{"id": "a", "title": "A"}])
+        await client.set_apps_state([{"id": "a", "title": "A"}])
+        await client.set_apps_state([{"id": "a", "title": "A2"}])
+
+    asyncio.run(run())
+    assert len(notified) == 2
+    assert catalog == [("apps", ["a"], [], []), ("apps", [], [], ["a"])]
+
+
+class InFlightSimulator(FailingSimulator):
+    """Simulator answering requests concurrently, slower for uris in slow_uris."""
+
+    def __init__(self, **kwargs):
+        super().__init__(response_delay=0.001, **kwargs)
+        self.slow_uris = set()
+        self.in_flight = 0
+        self.max_in_flight = 0
+
+    async def respond(self, ws, msg):
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            uri = msg.get("uri", "")[len("ssap://") :]
+            await asyncio.sleep(0.05 if uri in self.slow_uris else 0.01)
+            await super().respond(ws, msg)
+        finally:
+            self.in_flight -= 1
+
+
+def test_request_many_order_and_exceptions(tmp_path):
+    async def run():
+        async with InFlightSimulator(port=0) as sim:
+            sim.slow_uris.add(ep.GET_VOLUME)
+            async with connected_client(
+                tmp_path, sim, subscriptions=SUBSCRIPTIONS_MINIMAL
+            ) as (client, _):
+                sim.failing_uris.add(ep.GET_POWER_STATE)
+                requests = [ep.GET_VOLUME, ep.GET_POWER_STATE, ep.GET_SOUND_OUTPUT]
+                results = await client.request_many(requests)
+                with pytest.raises(PyLGTVCmdException):
+                    await client.request_many(requests, return_exceptions=False)
+        return results
+
+    volume, power, sound = asyncio.run(run())
+    # the slow first response still comes first
+    assert volume["volume"] == 10
+    assert isinstance(power, PyLGTVCmdException)
+    assert sound["soundOutput"] == "tv_speaker"
+
+
+def test_request_many_max_in_flight(tmp_path):
+    async def run():
+        async with InFlightSimulator(port=0) as sim:
+            async with connected_client(
+                tmp_path, sim, subscriptions=SUBSCRIPTIONS_MINIMAL
+            ) as (client, _):
+                sim.max_in_flight = 0
+                results = await client.request_many(
+                    [(ep.GET_VOLUME, None)] * 10, max_in_flight=3
+                )
+                assert sim.max_in_flight == 3
+                assert len(results) == 10
+                assert client.futures == {}
+
+                sim.max_in_flight = 0
+                await client.request_many([ep.GET_VOLUME] * 10)
+                assert sim.max_in_flight == 10
+
+    asyncio.run(run())